@@ -0,0 +1,93 @@
+"""
+Static Payload Helpers
+Pre-serialized, pre-compressed JSON bodies for the serverless handlers
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+
+# Shared HTTP helpers live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_common import ENCODING_PREFERENCE, etag_matches, negotiate_encoding, variant_etag
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Payloads are compressed once per warm instance, so the levels default to
+# the smallest output; bodies under the threshold are sent as-is
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "256"))
+PAYLOAD_GZIP_LEVEL = int(os.getenv("PAYLOAD_GZIP_LEVEL", "9"))
+PAYLOAD_BROTLI_QUALITY = int(os.getenv("PAYLOAD_BROTLI_QUALITY", "11"))
+
+# Reference payloads change only when a deploy ships a new dataset version
+# (and then get new ETags), so browsers and the CDN may reuse them and
+# revalidate in the background
+REFERENCE_CACHE_CONTROL = "public, max-age=3600, s-maxage=86400, stale-while-revalidate=86400"
+
+
+class StaticPayload:
+    """A JSON response serialized once, with gzip and brotli variants
+
+    ``etag`` defaults to a hash of the body; handlers pass one derived
+    from the reference data version instead.
+    """
+
+    def __init__(self, response, etag=None):
+        body = json.dumps(response).encode()
+        self.etag = etag or '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+        self.variants = {"identity": body}
+        if len(body) >= COMPRESSION_MIN_SIZE:
+            self.variants["gzip"] = gzip.compress(body, compresslevel=PAYLOAD_GZIP_LEVEL, mtime=0)
+            if brotli is not None:
+                self.variants["br"] = brotli.compress(body, quality=PAYLOAD_BROTLI_QUALITY)
+
+    def select(self, accept_encoding):
+        """Pick ``(encoding, body)`` for an Accept-Encoding header
+
+        The best compressed variant the client accepts wins; identity is
+        the fallback when it accepts none.
+        """
+        available = [encoding for encoding in ENCODING_PREFERENCE if encoding in self.variants]
+        best = negotiate_encoding(accept_encoding, available) or "identity"
+        return best, self.variants[best]
+
+
+def send_not_modified(handler, etag, cache_control, vary=None):
+    """Answer a matching If-None-Match with 304 and no body"""
+    handler.send_response(304)
+    handler.send_header('ETag', etag)
+    handler.send_header('Cache-Control', cache_control)
+    if vary:
+        handler.send_header('Vary', vary)
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.end_headers()
+
+
+def send_payload(handler, payload, cache_control=REFERENCE_CACHE_CONTROL, conditional=True):
+    """Write a StaticPayload from a BaseHTTPRequestHandler
+
+    With ``conditional`` (GET), a matching If-None-Match gets a 304.
+    """
+    encoding, body = payload.select(handler.headers.get('Accept-Encoding'))
+    etag = variant_etag(payload.etag, encoding)
+    vary = 'Accept-Encoding' if len(payload.variants) > 1 else None
+    if conditional and etag_matches(handler.headers.get('If-None-Match'), payload.etag):
+        send_not_modified(handler, etag, cache_control, vary=vary)
+        return
+    handler.send_response(200)
+    handler.send_header('Content-type', 'application/json')
+    if encoding != "identity":
+        handler.send_header('Content-Encoding', encoding)
+    if vary:
+        handler.send_header('Vary', vary)
+    handler.send_header('Content-Length', str(len(body)))
+    handler.send_header('ETag', etag)
+    handler.send_header('Cache-Control', cache_control)
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.end_headers()
+    handler.wfile.write(body)
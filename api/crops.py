@@ -5,8 +5,13 @@ Returns crop recommendations based on location and season
 
 from http.server import BaseHTTPRequestHandler
 import json
+import os
+import sys
 from urllib.parse import urlparse, parse_qs
 
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _payloads import REFERENCE_CACHE_CONTROL, StaticPayload, send_payload
+
 # Crop Data
 CROPS_DATA = [
     {
@@ -111,6 +116,34 @@ CROPS_DATA = [
     }
 ]
 
+SEASON_MAP = {1: "Kharif", 2: "Rabi", 3: "Zaid"}
+
+
+def crops_for_season(season):
+    """Crops for a season (plus Annual crops), best suited first"""
+    crops = CROPS_DATA
+    if season:
+        crops = [c for c in crops if c["season"].lower() == season.lower() or c["season"] == "Annual"]
+    return sorted(crops, key=lambda x: x["suitability_score"], reverse=True)
+
+
+# Responses only depend on the season, so they are serialized and
+# compressed once per warm instance and each request just picks a buffer
+GET_PAYLOADS = {}
+for _season in [None, "kharif", "rabi", "zaid", "annual"]:
+    _crops = crops_for_season(_season)
+    GET_PAYLOADS[_season] = StaticPayload({"success": True, "data": _crops, "count": len(_crops)})
+
+POST_PAYLOADS = {}
+for _season_id, _season in SEASON_MAP.items():
+    _crops = crops_for_season(_season)
+    POST_PAYLOADS[_season_id] = StaticPayload({
+        "success": True,
+        "data": _crops,
+        "count": len(_crops),
+        "season": _season
+    })
+
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
         # Parse query parameters
@@ -120,26 +153,14 @@ class handler(BaseHTTPRequestHandler):
         season = query_params.get('season', [None])[0]
         state_code = query_params.get('state_code', [None])[0]
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
+        key = season.lower() if season else None
+        payload = GET_PAYLOADS.get(key)
+        if payload is None:
+            # Unknown season names are rare; build those on demand
+            crops = crops_for_season(season)
+            payload = StaticPayload({"success": True, "data": crops, "count": len(crops)})
         
-        # Filter by season if provided
-        crops = CROPS_DATA.copy()
-        if season:
-            crops = [c for c in crops if c["season"].lower() == season.lower() or c["season"] == "Annual"]
-        
-        # Sort by suitability score
-        crops = sorted(crops, key=lambda x: x["suitability_score"], reverse=True)
-        
-        response = {
-            "success": True,
-            "data": crops,
-            "count": len(crops)
-        }
-        
-        self.wfile.write(json.dumps(response).encode())
+        send_payload(self, payload, REFERENCE_CACHE_CONTROL)
         return
     
     def do_POST(self):
@@ -147,35 +168,20 @@ class handler(BaseHTTPRequestHandler):
         content_length = int(self.headers.get('Content-Length', 0))
         post_data = self.rfile.read(content_length)
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
         try:
             request_data = json.loads(post_data) if post_data else {}
             season_id = request_data.get('season_id', 1)
             
-            # Map season_id to season name
-            season_map = {1: "Kharif", 2: "Rabi", 3: "Zaid"}
-            season = season_map.get(season_id, "Kharif")
-            
-            crops = [c for c in CROPS_DATA if c["season"].lower() == season.lower() or c["season"] == "Annual"]
-            crops = sorted(crops, key=lambda x: x["suitability_score"], reverse=True)
-            
-            response = {
-                "success": True,
-                "data": crops,
-                "count": len(crops),
-                "season": season
-            }
+            # Unknown season ids fall back to Kharif
+            payload = POST_PAYLOADS.get(season_id, POST_PAYLOADS[1])
         except Exception as e:
-            response = {
+            payload = StaticPayload({
                 "success": False,
                 "error": str(e)
-            }
+            })
         
-        self.wfile.write(json.dumps(response).encode())
+        # POST responses are not cacheable, so there is nothing to revalidate
+        send_payload(self, payload, 'no-store', conditional=False)
         return
     
     def do_OPTIONS(self):
@@ -4,9 +4,99 @@ Returns weather information for a location
 """
 
 from http.server import BaseHTTPRequestHandler
-import json
+import hashlib
+import os
+import sys
 from urllib.parse import urlparse, parse_qs
 import random
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from _payloads import StaticPayload, send_payload
+
+WEATHER_TTL_SECONDS = 600
+MAX_CACHED_DISTRICTS = 1024
+
+# Serialized, compressed reports per (state_code, district_code) for this
+# warm instance
+WEATHER_CACHE = {}
+
+
+def build_report(state_code, district_code, period):
+    """Report for a district, stable within one cache period"""
+    rng = random.Random(f"{state_code}:{district_code}:{period}")
+    
+    # Generate realistic weather data
+    base_temp = 28 + rng.randint(-5, 5)
+    humidity = 55 + rng.randint(0, 30)
+
+    conditions = ["Partly Cloudy", "Sunny", "Light Rain", "Cloudy", "Clear"]
+    warnings = [
+        "Moderate rainfall expected. Good for Kharif sowing.",
+        "Clear skies expected. Ideal for harvesting.",
+        "Light showers possible. Plan irrigation accordingly.",
+        "Hot and dry conditions. Ensure adequate irrigation.",
+        "Pleasant weather. Good for field activities."
+    ]
+
+    response = {
+        "success": True,
+        "data": {
+            "temperature": base_temp,
+            "humidity": humidity,
+            "rainfall": rng.randint(0, 20),
+            "wind_speed": rng.randint(5, 20),
+            "condition": rng.choice(conditions),
+            "warning": rng.choice(warnings),
+            "forecast": [
+                {
+                    "day": "Today",
+                    "condition": rng.choice(conditions),
+                    "temp_max": base_temp + 4,
+                    "temp_min": base_temp - 4
+                },
+                {
+                    "day": "Tomorrow",
+                    "condition": rng.choice(conditions),
+                    "temp_max": base_temp + 3,
+                    "temp_min": base_temp - 5
+                },
+                {
+                    "day": "Day 3",
+                    "condition": rng.choice(conditions),
+                    "temp_max": base_temp + 2,
+                    "temp_min": base_temp - 3
+                },
+                {
+                    "day": "Day 4",
+                    "condition": rng.choice(conditions),
+                    "temp_max": base_temp + 5,
+                    "temp_min": base_temp - 2
+                },
+                {
+                    "day": "Day 5",
+                    "condition": rng.choice(conditions),
+                    "temp_max": base_temp + 3,
+                    "temp_min": base_temp - 4
+                }
+            ]
+        }
+    }
+    return response
+
+
+def get_report(state_code, district_code, period, etag):
+    key = (state_code, district_code)
+    cached = WEATHER_CACHE.get(key)
+    if cached and cached[0] == period:
+        return cached[1]
+    
+    payload = StaticPayload(build_report(state_code, district_code, period), etag=etag)
+    if len(WEATHER_CACHE) >= MAX_CACHED_DISTRICTS:
+        WEATHER_CACHE.clear()
+    WEATHER_CACHE[key] = (period, payload)
+    return payload
+
 
 class handler(BaseHTTPRequestHandler):
     def do_GET(self):
@@ -17,69 +107,18 @@ class handler(BaseHTTPRequestHandler):
         state_code = query_params.get('state_code', ['0'])[0]
         district_code = query_params.get('district_code', ['0'])[0]
         
-        self.send_response(200)
-        self.send_header('Content-type', 'application/json')
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.end_headers()
-        
-        # Generate realistic weather data
-        base_temp = 28 + random.randint(-5, 5)
-        humidity = 55 + random.randint(0, 30)
-        
-        conditions = ["Partly Cloudy", "Sunny", "Light Rain", "Cloudy", "Clear"]
-        warnings = [
-            "Moderate rainfall expected. Good for Kharif sowing.",
-            "Clear skies expected. Ideal for harvesting.",
-            "Light showers possible. Plan irrigation accordingly.",
-            "Hot and dry conditions. Ensure adequate irrigation.",
-            "Pleasant weather. Good for field activities."
-        ]
-        
-        response = {
-            "success": True,
-            "data": {
-                "temperature": base_temp,
-                "humidity": humidity,
-                "rainfall": random.randint(0, 20),
-                "wind_speed": random.randint(5, 20),
-                "condition": random.choice(conditions),
-                "warning": random.choice(warnings),
-                "forecast": [
-                    {
-                        "day": "Today",
-                        "condition": random.choice(conditions),
-                        "temp_max": base_temp + 4,
-                        "temp_min": base_temp - 4
-                    },
-                    {
-                        "day": "Tomorrow",
-                        "condition": random.choice(conditions),
-                        "temp_max": base_temp + 3,
-                        "temp_min": base_temp - 5
-                    },
-                    {
-                        "day": "Day 3",
-                        "condition": random.choice(conditions),
-                        "temp_max": base_temp + 2,
-                        "temp_min": base_temp - 3
-                    },
-                    {
-                        "day": "Day 4",
-                        "condition": random.choice(conditions),
-                        "temp_max": base_temp + 5,
-                        "temp_min": base_temp - 2
-                    },
-                    {
-                        "day": "Day 5",
-                        "condition": random.choice(conditions),
-                        "temp_max": base_temp + 3,
-                        "temp_min": base_temp - 4
-                    }
-                ]
-            }
-        }
-        
-        self.wfile.write(json.dumps(response).encode())
+        # A report is fixed for its cache period, so its ETag only changes
+        # with the period and revalidations reuse the cached payload
+        now = time.time()
+        period = int(now // WEATHER_TTL_SECONDS)
+        expires_in = int((period + 1) * WEATHER_TTL_SECONDS - now)
+        # Hashed so arbitrary query strings never reach a header verbatim
+        etag = '"%s"' % hashlib.sha256(f"{state_code}:{district_code}:{period}".encode()).hexdigest()[:32]
+        cache_control = 'public, max-age=%d, s-maxage=%d, stale-while-revalidate=%d' % (
+            expires_in, expires_in, WEATHER_TTL_SECONDS
+        )
+        payload = get_report(state_code, district_code, period, etag)
+        send_payload(self, payload, cache_control)
         return
     
     def do_OPTIONS(self):
@@ -0,0 +1,122 @@
+"""
+Krishi Mitra - Auth Concurrency Benchmark
+Measures latency of a cheap read route while logins run concurrently
+
+Drives backend/app.py in-process through httpx's ASGI transport, once with
+bcrypt running inline on the event loop (the old behaviour), once on the
+password worker pool, and once on the pool with auth admission control on,
+where the login loops are a retry storm that ignores 429s. Usage:
+
+    cd backend
+    python benchmarks/auth_concurrency.py --logins 8 --duration 5
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+# Users go to a throwaway SQLite file, not the development database
+os.environ.setdefault("USERS_DB_PATH", os.path.join(tempfile.mkdtemp(), "users.db"))
+import app as backend
+from metrics import percentile
+from password_hasher import PasswordHasher
+from rate_limit import AuthAdmission
+
+USER = {
+    "fullName": "Bench Farmer",
+    "email": "bench@example.com",
+    "mobile": "9000000001",
+    "password": "bench-password"
+}
+
+PROBE_INTERVAL = 0.01  # seconds between states requests
+
+
+class InlinePasswordHasher(PasswordHasher):
+    """Runs bcrypt directly on the event loop, as the handlers used to"""
+
+    async def _run(self, fn, *args):
+        return fn(*args)
+
+
+async def run(mode: str, logins: int, duration: float) -> dict:
+    if mode == "inline":
+        backend.password_hasher = InlinePasswordHasher(backend.pwd_context)
+    else:
+        backend.password_hasher = PasswordHasher(backend.pwd_context)
+    backend.auth_admission = AuthAdmission(enabled=mode == "limited")
+
+    await backend.app.router.startup()
+    await backend.users_db.clear()
+    transport = httpx.ASGITransport(app=backend.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/auth/register", json=USER)
+        deadline = time.perf_counter() + duration
+        login_count = 0
+        rejected_count = 0
+        latencies = []
+
+        async def login_loop():
+            nonlocal login_count, rejected_count
+            while time.perf_counter() < deadline:
+                response = await client.post("/api/auth/login", json={"username": USER["mobile"], "password": USER["password"]})
+                if response.status_code == 429:
+                    rejected_count += 1
+                    # A rejection never suspends in-process; yield as a
+                    # network round trip would
+                    await asyncio.sleep(0)
+                else:
+                    login_count += 1
+
+        async def probe_loop():
+            # Probes follow a fixed schedule and latency is measured from the
+            # planned send time, so time spent waiting for a blocked event
+            # loop counts against the request instead of being hidden.
+            planned = time.perf_counter()
+            while planned < deadline:
+                await asyncio.sleep(max(0.0, planned - time.perf_counter()))
+                await client.get("/api/location/states")
+                latencies.append((time.perf_counter() - planned) * 1000)
+                planned = max(planned + PROBE_INTERVAL, time.perf_counter())
+
+        await asyncio.gather(probe_loop(), *(login_loop() for _ in range(logins)))
+    await backend.app.router.shutdown()
+
+    return {
+        "mode": mode,
+        "logins": login_count,
+        "rejected": rejected_count,
+        "probes": len(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": max(latencies)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--logins", type=int, default=8, help="concurrent login loops")
+    parser.add_argument("--duration", type=float, default=5.0, help="seconds per mode")
+    parser.add_argument("--mode", choices=["inline", "pool", "limited", "all"], default="all")
+    args = parser.parse_args()
+
+    modes = ["inline", "pool", "limited"] if args.mode == "all" else [args.mode]
+    print(f"{'mode':<8}{'logins':>8}{'429s':>8}{'probes':>8}{'p50 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for mode in modes:
+        result = asyncio.run(run(mode, args.logins, args.duration))
+        print(
+            f"{result['mode']:<8}{result['logins']:>8}{result['rejected']:>8}{result['probes']:>8}"
+            f"{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}{result['max_ms']:>10.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
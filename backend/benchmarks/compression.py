@@ -0,0 +1,78 @@
+"""
+Krishi Mitra - Compression Benchmark
+Bytes on the wire and CPU cost of gzip / brotli per response, by level
+
+Bodies come from backend/app.py's reference data routes. For each payload
+the script reports the identity size, the compressed size and mean CPU
+microseconds at the per-request levels (COMPRESSION_GZIP_LEVEL,
+COMPRESSION_BROTLI_QUALITY) and at the static levels used for bodies
+with a strong ETag, plus the cost of a compressed-cache hit. Usage:
+
+    cd backend
+    python benchmarks/compression.py --iterations 200
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import app as backend
+import compression
+from fast_json import dumps
+
+
+def cpu_us_per_call(func, iterations: int) -> float:
+    """Mean CPU microseconds per call (thread time, as the middleware records)"""
+    func()
+    start = time.thread_time()
+    for _ in range(iterations):
+        func()
+    return (time.thread_time() - start) / iterations * 1e6
+
+
+async def run(iterations: int):
+    await backend.app.router.startup()
+    store = backend.location_store
+    largest_state = max(store.states(), key=lambda state: state["districts_count"])
+    all_districts = [district for state in store.states() for district in store.districts(state["code"])]
+
+    cases = [
+        ("states", {"success": True, "data": store.states()}),
+        (f"districts ({largest_state['name']})", {"success": True, "data": store.districts(largest_state["code"])}),
+        ("districts (all states)", {"success": True, "data": all_districts})
+    ]
+    encodings = ["gzip"] + (["br"] if compression.brotli is not None else [])
+
+    print(f"dynamic levels: gzip {compression.COMPRESSION_GZIP_LEVEL}, br {compression.COMPRESSION_BROTLI_QUALITY}; "
+          f"static levels: gzip 9, br 11")
+    print(f"{'payload':<32}{'enc':>6}{'identity B':>12}{'dynamic B':>11}{'dyn us':>9}"
+          f"{'static B':>10}{'static us':>11}{'cached us':>11}")
+    for name, content in cases:
+        body = dumps(content)
+        for encoding in encodings:
+            dynamic = compression.compress(body, encoding)
+            static = compression.compress(body, encoding, static=True)
+            dynamic_us = cpu_us_per_call(lambda: compression.compress(body, encoding), iterations)
+            static_us = cpu_us_per_call(lambda: compression.compress(body, encoding, static=True), max(1, iterations // 10))
+            key = ('"bench"', encoding)
+            compression.compressed_cache.set(key, static)
+            cached_us = cpu_us_per_call(lambda: compression.compressed_cache.get(key), iterations)
+            print(f"{name:<32}{encoding:>6}{len(body):>12}{len(dynamic):>11}{dynamic_us:>9.1f}"
+                  f"{len(static):>10}{static_us:>11.1f}{cached_us:>11.2f}")
+    compression.compressed_cache.clear()
+    await backend.app.router.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=200, help="compressions timed per case")
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
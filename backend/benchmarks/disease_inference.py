@@ -0,0 +1,113 @@
+"""
+Krishi Mitra - Disease Inference Benchmark
+Throughput and latency of leaf photo diagnosis under an upload burst
+
+Sends ``--requests`` synthetic phone-sized JPEG photos through the same
+DiseaseDiagnosisService backend/app.py uses, ``--concurrency`` at a time,
+once with micro-batching and once with one image per model call. The
+reference model is nearly free, so ``--call-overhead-ms`` adds a fixed
+cost to every model call, standing in for a real network's per-call
+setup. Usage:
+
+    cd backend
+    python benchmarks/disease_inference.py --requests 400 --concurrency 64
+"""
+
+import argparse
+import asyncio
+import io
+import os
+import statistics
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from PIL import Image
+
+from disease_inference import DiseaseDiagnosisService
+from disease_model import ReferenceDiseaseModel
+from metrics import percentile
+
+
+class OverheadModel(ReferenceDiseaseModel):
+    """Reference model with a fixed cost per call"""
+
+    def __init__(self, call_overhead_ms: float):
+        self.call_overhead = call_overhead_ms / 1000
+
+    def predict(self, images):
+        time.sleep(self.call_overhead)
+        return super().predict(images)
+
+
+def photos(count: int, width: int = 1600, height: int = 1200):
+    rng = np.random.default_rng(7)
+    result = []
+    for i in range(count):
+        pixels = np.empty((height, width, 3), dtype=np.uint8)
+        pixels[:] = (40, 140, 40)
+        pixels[::7, ::5] = rng.integers(0, 255, 3)
+        pixels[300:900, 400:1200] = [(120, 80, 40), (200, 110, 30), (220, 225, 220), (40, 140, 40)][i % 4]
+        buffer = io.BytesIO()
+        Image.fromarray(pixels).save(buffer, "JPEG", quality=85)
+        result.append(buffer.getvalue())
+    return result
+
+
+async def run_mode(service: DiseaseDiagnosisService, uploads, concurrency: int) -> dict:
+    await service.start()
+    latencies = []
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < len(uploads):
+            data = uploads[next_index]
+            next_index += 1
+            start = time.perf_counter()
+            await service.diagnose(data)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stats = service.stats()
+    service.shutdown()
+    return {
+        "images_per_s": len(uploads) / elapsed,
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": percentile(latencies, 99),
+        "mean_batch": stats["mean_batch_size"]
+    }
+
+
+async def run(requests: int, concurrency: int, workers: int, batch_size: int, call_overhead_ms: float):
+    uploads = photos(min(requests, 32))
+    uploads = [uploads[i % len(uploads)] for i in range(requests)]
+    print(f"{requests} photos ({len(uploads[0]) // 1024} KB each), concurrency {concurrency}, "
+          f"{workers} decode processes, {call_overhead_ms} ms per model call")
+    print(f"{'mode':<12}{'images/s':>10}{'p50 ms':>10}{'p99 ms':>10}{'batch':>8}")
+    for mode, max_batch in (("unbatched", 1), ("batched", batch_size)):
+        service = DiseaseDiagnosisService(
+            OverheadModel(call_overhead_ms), decode_workers=workers, max_batch_size=max_batch, max_pending=requests
+        )
+        result = await run_mode(service, uploads, concurrency)
+        print(f"{mode:<12}{result['images_per_s']:>10.1f}{result['p50_ms']:>10.1f}{result['p99_ms']:>10.1f}{result['mean_batch']:>8.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=400, help="photos uploaded per mode")
+    parser.add_argument("--concurrency", type=int, default=64, help="uploads in flight at once")
+    parser.add_argument("--workers", type=int, default=min(4, os.cpu_count() or 1), help="decoding processes")
+    parser.add_argument("--batch-size", type=int, default=16, help="largest batch in batched mode")
+    parser.add_argument("--call-overhead-ms", type=float, default=10.0, help="fixed cost added to each model call")
+    args = parser.parse_args()
+    asyncio.run(run(args.requests, args.concurrency, args.workers, args.batch_size, args.call_overhead_ms))
+
+
+if __name__ == "__main__":
+    main()
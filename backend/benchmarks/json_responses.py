@@ -0,0 +1,83 @@
+"""
+Krishi Mitra - JSON Response Benchmark
+Cost of building the states and districts responses, model path vs fast path
+
+The model path is what FastAPI does for a route that returns plain data with
+a ``response_model``: validate every item, serialize it back and encode with
+the stdlib json module. The fast path is FastJSONResponse (orjson when
+installed). Payloads come from backend/app.py's LocationStore. Usage:
+
+    cd backend
+    python benchmarks/json_responses.py --iterations 2000
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+
+import app as backend
+import fast_json
+from fast_json import FastJSONResponse
+
+
+def response_field(path: str):
+    route = next(route for route in backend.app.routes if getattr(route, "path", None) == path)
+    return route.secure_cloned_response_field
+
+
+async def model_path(field, content):
+    return JSONResponse(await serialize_response(field=field, response_content=content)).body
+
+
+async def fast_path(field, content):
+    return FastJSONResponse(content).body
+
+
+async def time_per_call(build, field, content, iterations: int) -> float:
+    """Mean microseconds per response"""
+    await build(field, content)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        await build(field, content)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def run(iterations: int):
+    await backend.app.router.startup()
+    store = backend.location_store
+    largest_state = max(store.states(), key=lambda state: state["districts_count"])
+    districts_field = response_field("/api/location/districts/{state_code}")
+    all_districts = [district for state in store.states() for district in store.districts(state["code"])]
+
+    cases = [
+        ("states", response_field("/api/location/states"), store.states()),
+        (f"districts ({largest_state['name']})", districts_field, store.districts(largest_state["code"])),
+        ("districts (all states)", districts_field, all_districts)
+    ]
+
+    encoder = "orjson" if fast_json.orjson is not None else "json"
+    print(f"fast path encoder: {encoder}")
+    print(f"{'payload':<32}{'items':>7}{'model us':>12}{'fast us':>12}{'speedup':>10}")
+    for name, field, content in cases:
+        model_us = await time_per_call(model_path, field, content, iterations)
+        fast_us = await time_per_call(fast_path, field, content, iterations)
+        print(f"{name:<32}{len(content):>7}{model_us:>12.1f}{fast_us:>12.1f}{model_us / fast_us:>9.1f}x")
+    await backend.app.router.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=2000, help="responses built per case")
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations))
+
+
+if __name__ == "__main__":
+    main()
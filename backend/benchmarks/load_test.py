@@ -0,0 +1,234 @@
+"""
+Krishi Mitra - Load Test
+Per-route throughput and latency percentiles with a recorded baseline
+
+Drives a backend in-process through httpx's ASGI transport: ``app`` is
+backend/app.py as-is, ``main`` is backend/main.py on an in-memory MongoDB
+stand-in (mongomock-motor, a development-only dependency). Each route is
+hit by ``--concurrency`` closed-loop clients in turn. Usage:
+
+    cd backend
+    python benchmarks/load_test.py --target app --write-baseline
+    python benchmarks/load_test.py --target app        # compare, exit 1 on regression
+    python benchmarks/load_test.py --target main --concurrency 32
+
+A route regresses when its p95 grows, or its throughput drops, by more than
+``--threshold`` (a fraction) relative to the baseline. Differences smaller
+than ``--min-delta-ms`` are ignored so sub-millisecond routes do not flap.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from metrics import percentile
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+
+STATE_CODE = 9        # Uttar Pradesh: present in every dataset
+DISTRICT_CODE = 153   # Agra
+PASSWORD = "bench-password"
+
+
+def bench_user(i: int) -> dict:
+    return {
+        "fullName": f"Bench Farmer {i}",
+        "email": f"bench{i}@example.com",
+        "mobile": f"9{i:09d}",
+        "password": PASSWORD
+    }
+
+
+def load_backend(target: str):
+    """Import the backend module, pointing main.py at an in-memory MongoDB.
+
+    Auth admission control is switched off: every request comes from one
+    client address, and the point is to measure the routes themselves.
+    """
+    if target == "app":
+        # A fresh SQLite user database, so registrations never collide
+        os.environ.setdefault("USERS_DB_PATH", os.path.join(tempfile.mkdtemp(), "users.db"))
+        import app as backend
+        backend.auth_admission.enabled = False
+        return backend
+
+    try:
+        from mongomock_motor import AsyncMongoMockClient
+    except ImportError:
+        sys.exit("--target main needs mongomock-motor: pip install mongomock-motor")
+
+    import main as backend
+
+    # Pool sizing and event listeners only apply to a real server
+    backend.AsyncIOMotorClient = lambda url, **kwargs: AsyncMongoMockClient()
+    backend.SEED_ON_STARTUP = True
+    backend.auth_admission.enabled = False
+    return backend
+
+
+def build_routes(auth_requests: int, requests: int):
+    """``name -> (request count, request factory)``; factories take (i, token)"""
+    crop_body = {
+        "state_code": STATE_CODE,
+        "district_code": DISTRICT_CODE,
+        "season_id": 1,
+        "lat": 27.18,
+        "lon": 78.01
+    }
+    return {
+        "register": (auth_requests, lambda i, token: (
+            "POST", "/api/auth/register", bench_user(1000 + i), None
+        )),
+        "login": (auth_requests, lambda i, token: (
+            "POST", "/api/auth/login", {"username": bench_user(0)["mobile"], "password": PASSWORD}, None
+        )),
+        "states": (requests, lambda i, token: (
+            "GET", "/api/location/states", None, None
+        )),
+        "districts": (requests, lambda i, token: (
+            "GET", f"/api/location/districts/{STATE_CODE}", None, None
+        )),
+        "crop_recommendations": (requests, lambda i, token: (
+            "POST", "/api/crops/recommendations", crop_body, token
+        )),
+        "weather": (requests, lambda i, token: (
+            "GET", f"/api/weather/{STATE_CODE}/{DISTRICT_CODE}", None, token
+        ))
+    }
+
+
+async def run_route(client, count: int, factory, token: str, concurrency: int) -> dict:
+    latencies = []
+    errors = 0
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index, errors
+        while next_index < count:
+            i = next_index
+            next_index += 1
+            method, path, body, bearer = factory(i, token)
+            headers = {"Authorization": f"Bearer {bearer}"} if bearer else None
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body, headers=headers)
+            latencies.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(min(concurrency, count))))
+    elapsed = time.perf_counter() - started
+
+    return {
+        "requests": count,
+        "errors": errors,
+        "rps": round(count / elapsed, 1),
+        "p50_ms": round(statistics.median(latencies), 3),
+        "p95_ms": round(percentile(latencies, 95), 3),
+        "p99_ms": round(percentile(latencies, 99), 3)
+    }
+
+
+async def run(target: str, concurrency: int, auth_requests: int, requests: int, only) -> dict:
+    backend = load_backend(target)
+    routes = build_routes(auth_requests, requests)
+    results = {}
+
+    await backend.app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=backend.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post("/api/auth/register", json=bench_user(0))
+            response.raise_for_status()
+            token = response.json()["access_token"]
+
+            for name, (count, factory) in routes.items():
+                if only and name not in only:
+                    continue
+                if name != "register":
+                    # Untimed first request fills per-route caches (weather, user cache)
+                    method, path, body, bearer = factory(0, token)
+                    await client.request(method, path, json=body, headers={"Authorization": f"Bearer {bearer}"} if bearer else None)
+                results[name] = await run_route(client, count, factory, token, concurrency)
+    finally:
+        await backend.app.router.shutdown()
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float, min_delta_ms: float) -> list:
+    """Human-readable regressions of ``results`` against ``baseline``"""
+    regressions = []
+    for name, current in results.items():
+        previous = baseline.get(name)
+        if previous is None:
+            continue
+        if current["errors"] > previous.get("errors", 0):
+            regressions.append(f"{name}: {current['errors']} errors (baseline {previous.get('errors', 0)})")
+        p95_delta = current["p95_ms"] - previous["p95_ms"]
+        if p95_delta > min_delta_ms and current["p95_ms"] > previous["p95_ms"] * (1 + threshold):
+            regressions.append(f"{name}: p95 {current['p95_ms']:.2f} ms (baseline {previous['p95_ms']:.2f} ms)")
+        # With a closed loop, concurrency / rps is the mean time per request
+        mean_delta_ms = current["concurrency"] * 1000 * (1 / current["rps"] - 1 / previous["rps"])
+        if current["rps"] < previous["rps"] * (1 - threshold) and mean_delta_ms > min_delta_ms:
+            regressions.append(f"{name}: {current['rps']:.0f} req/s (baseline {previous['rps']:.0f} req/s)")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--target", choices=["app", "main"], default="app")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients per route")
+    parser.add_argument("--requests", type=int, default=2000, help="requests per read route")
+    parser.add_argument("--auth-requests", type=int, default=48, help="requests for register and login (bcrypt-bound)")
+    parser.add_argument("--routes", nargs="*", help="only run these routes")
+    parser.add_argument("--baseline", help="baseline file (default: benchmarks/baselines/<target>.json)")
+    parser.add_argument("--write-baseline", action="store_true", help="record this run as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25, help="allowed fractional regression")
+    parser.add_argument("--min-delta-ms", type=float, default=1.0, help="ignore p95 changes smaller than this")
+    args = parser.parse_args()
+
+    baseline_path = args.baseline or os.path.join(BASELINE_DIR, f"{args.target}.json")
+    results = asyncio.run(run(args.target, args.concurrency, args.auth_requests, args.requests, args.routes))
+    for stats in results.values():
+        stats["concurrency"] = args.concurrency
+
+    print(f"{'route':<22}{'requests':>10}{'errors':>8}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for name, stats in results.items():
+        print(
+            f"{name:<22}{stats['requests']:>10}{stats['errors']:>8}{stats['rps']:>10.1f}"
+            f"{stats['p50_ms']:>10.2f}{stats['p95_ms']:>10.2f}{stats['p99_ms']:>10.2f}"
+        )
+
+    if args.write_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Baseline written to {baseline_path}")
+        return
+
+    if not os.path.exists(baseline_path):
+        print(f"No baseline at {baseline_path}; run with --write-baseline to record one")
+        return
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = compare(results, baseline, args.threshold, args.min_delta_ms)
+    if regressions:
+        print("Regressions against baseline:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    print(f"No regressions against {baseline_path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Krishi Mitra - Location Search Benchmark
+Per-keystroke latency of the state and district autocomplete index
+
+Builds the index backend/app.py uses at startup and replays typing of
+each query one character at a time (every prefix is a search, as the
+dashboard autocomplete sends one per keystroke). Queries cover exact
+names, typos, old names and Devanagari, Gurmukhi and Tamil spellings.
+Usage:
+
+    cd backend
+    python benchmarks/location_search.py --rounds 50
+"""
+
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+from location_search import LocationSearchIndex
+from metrics import percentile
+from reference_data import load_location_aliases, load_reference_data
+
+QUERIES = [
+    "Ludhiana", "Ludhiyana", "Bangalore", "Gurgaon", "Trivandram", "Calcuta", "Coimbatur",
+    "Maharashtra", "Uttar Pradesh", "Ahmedabad", "Vishakapatnam", "Nashik",
+    "लुधियाना", "गुड़गांव", "पंजाब", "ਜਲੰਧਰ", "ਪੰਜਾਬ", "சென்னை", "கோயம்புத்தூர்"
+]
+
+TARGET_MS = 5.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rounds", type=int, default=50, help="times each query is typed")
+    parser.add_argument("--limit", type=int, default=10, help="results per search")
+    args = parser.parse_args()
+
+    reference = load_reference_data()
+    start = time.perf_counter()
+    index = LocationSearchIndex(reference.states(), reference.districts(), load_location_aliases())
+    print(f"index built in {(time.perf_counter() - start) * 1000:.1f} ms")
+
+    latencies = []
+    for _ in range(args.rounds):
+        for query in QUERIES:
+            for length in range(1, len(query) + 1):
+                start = time.perf_counter()
+                index.search(query[:length], args.limit)
+                latencies.append((time.perf_counter() - start) * 1000)
+
+    p99 = percentile(latencies, 99)
+    print(f"{len(latencies)} keystrokes")
+    print(f"p50 {statistics.median(latencies):.3f} ms  p99 {p99:.3f} ms  max {max(latencies):.3f} ms")
+    print(f"target p99 < {TARGET_MS} ms: {'ok' if p99 < TARGET_MS else 'MISSED'}")
+    for query in QUERIES:
+        top = index.search(query, 1)
+        print(f"  {query:<16} -> {top[0]['name'] if top else '-'}")
+
+
+if __name__ == "__main__":
+    main()
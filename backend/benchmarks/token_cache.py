@@ -0,0 +1,101 @@
+"""
+Krishi Mitra - Token Cache Benchmark
+Per-request authentication overhead with and without the verified-token cache
+
+Times ``decode_token`` on its own, then a protected route end to end
+(backend/main.py on mongomock-motor, through httpx's ASGI transport), once
+with every lookup missing the cache and once with the cache enabled.
+Usage:
+
+    cd backend
+    python benchmarks/token_cache.py --iterations 20000 --requests 2000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+import main as backend
+from metrics import percentile
+from ttl_cache import TTLCache
+
+USER = {
+    "fullName": "Bench Farmer",
+    "email": "bench@example.com",
+    "mobile": "9000000001",
+    "password": "bench-password"
+}
+
+
+class DisabledCache(TTLCache):
+    """Never returns a hit, so every request verifies the signature"""
+
+    def get(self, key, default=None):
+        self.misses += 1
+        return default
+
+
+def time_decode(token: str, iterations: int) -> float:
+    """Mean microseconds per decode_token call"""
+    backend.decode_token(token)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        backend.decode_token(token)
+    return (time.perf_counter() - start) / iterations * 1e6
+
+
+async def time_route(client, token: str, requests: int) -> list:
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        response = await client.get("/api/weather/9/153", headers=headers)
+        latencies.append((time.perf_counter() - start) * 1000)
+        response.raise_for_status()
+    return latencies
+
+
+async def run(iterations: int, requests: int):
+    from mongomock_motor import AsyncMongoMockClient
+
+    backend.AsyncIOMotorClient = lambda url, **kwargs: AsyncMongoMockClient()
+    await backend.app.router.startup()
+    try:
+        transport = httpx.ASGITransport(app=backend.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            response = await client.post("/api/auth/register", json=USER)
+            response.raise_for_status()
+            token = response.json()["access_token"]
+            await time_route(client, token, 10)
+
+            print(f"{'mode':<10}{'decode us':>12}{'route p50 ms':>14}{'route p99 ms':>14}")
+            for mode in ("uncached", "cached"):
+                cache_type = DisabledCache if mode == "uncached" else TTLCache
+                backend.token_cache = cache_type(maxsize=backend.TOKEN_CACHE_SIZE, ttl_seconds=3600)
+                decode_us = time_decode(token, iterations)
+                latencies = await time_route(client, token, requests)
+                print(
+                    f"{mode:<10}{decode_us:>12.2f}"
+                    f"{statistics.median(latencies):>14.3f}{percentile(latencies, 99):>14.3f}"
+                )
+    finally:
+        await backend.app.router.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20000, help="decode_token calls per mode")
+    parser.add_argument("--requests", type=int, default=2000, help="protected-route requests per mode")
+    args = parser.parse_args()
+    asyncio.run(run(args.iterations, args.requests))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Krishi Mitra - User Store Benchmark
+Insert and lookup cost of the in-memory and SQLite user stores
+
+Runs the operations backend/app.py performs per register and login call
+against each engine: ``memory`` (dict indexes) and ``sqlite`` (WAL file in
+a temporary directory, queries on the connection pool), with
+``--concurrency`` callers at a time. Bcrypt is left out, so the numbers
+are storage overhead only. Usage:
+
+    cd backend
+    python benchmarks/user_store.py --users 5000 --lookups 20000
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from metrics import percentile
+from sqlite_user_store import SQLiteUserStore
+from user_store import AsyncUserStore
+
+PASSWORD_HASH = "$2b$12$" + "x" * 53
+
+
+async def timed(concurrency: int, count: int, operation) -> dict:
+    """Run ``operation(i)`` for i in range(count), ``concurrency`` at a time"""
+    latencies = []
+    next_index = 0
+
+    async def worker():
+        nonlocal next_index
+        while next_index < count:
+            i = next_index
+            next_index += 1
+            start = time.perf_counter()
+            await operation(i)
+            latencies.append((time.perf_counter() - start) * 1e6)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return {
+        "ops_per_s": count / elapsed,
+        "p50_us": statistics.median(latencies),
+        "p99_us": percentile(latencies, 99)
+    }
+
+
+async def run_engine(store, users: int, lookups: int, concurrency: int) -> dict:
+    await store.open()
+    await store.clear()
+    results = {}
+    results["register"] = await timed(concurrency, users, lambda i: store.add(
+        f"Bench Farmer {i}", f"bench{i}@example.com", f"9{i:09d}", PASSWORD_HASH
+    ))
+    # Login looks users up by mobile number or email, half each
+    results["login lookup"] = await timed(concurrency, lookups, lambda i: store.find(
+        f"9{i % users:09d}" if i % 2 else f"bench{i % users}@example.com"
+    ))
+    results["duplicate check"] = await timed(concurrency, lookups, lambda i: store.by_email(f"new{i}@example.com"))
+    results["count"] = await timed(concurrency, min(lookups, 1000), lambda i: store.count())
+    store.close()
+    return results
+
+
+async def run(users: int, lookups: int, concurrency: int):
+    with tempfile.TemporaryDirectory() as directory:
+        engines = [
+            ("memory", AsyncUserStore()),
+            ("sqlite", SQLiteUserStore(os.path.join(directory, "users.db")))
+        ]
+        print(f"{users} users, {lookups} lookups, concurrency {concurrency}")
+        print(f"{'engine':<8}{'operation':<18}{'ops/s':>12}{'p50 us':>10}{'p99 us':>10}")
+        for name, store in engines:
+            for operation, result in (await run_engine(store, users, lookups, concurrency)).items():
+                print(f"{name:<8}{operation:<18}{result['ops_per_s']:>12.0f}{result['p50_us']:>10.1f}{result['p99_us']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--users", type=int, default=5000, help="users registered per engine")
+    parser.add_argument("--lookups", type=int, default=20000, help="lookups per operation")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent callers")
+    args = parser.parse_args()
+    asyncio.run(run(args.users, args.lookups, args.concurrency))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+"""
+Krishi Mitra - Response Compression
+Negotiated gzip / brotli compression with cached variants for static bodies
+"""
+
+import gzip
+import os
+import sys
+import time
+import zlib
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+
+from http_caching import reference_cache_control
+from metrics import compression_duration_seconds, http_response_bytes_total, http_response_uncompressed_bytes_total, route_label
+from ttl_cache import TTLCache
+
+# Negotiation and ETag helpers shared with api/ live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_common import ENCODING_PREFERENCE, negotiate_encoding, variant_etag
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+# Bodies smaller than this gain little and can even grow when compressed
+COMPRESSION_MIN_SIZE = int(os.getenv("COMPRESSION_MIN_SIZE", "256"))
+# Levels for per-request bodies, where compression time adds to latency
+COMPRESSION_GZIP_LEVEL = int(os.getenv("COMPRESSION_GZIP_LEVEL", "6"))
+COMPRESSION_BROTLI_QUALITY = int(os.getenv("COMPRESSION_BROTLI_QUALITY", "4"))
+# Bodies with a strong ETag are compressed once and reused, so later
+# requests pay nothing for compression. Reference data (sent with the
+# reference Cache-Control) only changes with the dataset and is compressed
+# at the highest level; other bodies, like per-district weather, change
+# often and use the per-request levels above
+COMPRESSION_CACHE_SIZE = int(os.getenv("COMPRESSION_CACHE_SIZE", "512"))
+COMPRESSION_CACHE_TTL_SECONDS = 24 * 3600
+
+COMPRESSIBLE_TYPES = ("application/json", "application/x-ndjson", "text/")
+# Brotli is only offered when the module is installed
+ENCODINGS = ENCODING_PREFERENCE if brotli is not None else ("gzip",)
+
+REFERENCE_CACHE_CONTROLS = (reference_cache_control(), reference_cache_control(private=True))
+
+# Compressed bodies by (ETag, encoding); an ETag identifies the exact body
+compressed_cache = TTLCache(maxsize=COMPRESSION_CACHE_SIZE, ttl_seconds=COMPRESSION_CACHE_TTL_SECONDS)
+
+
+def compress(body: bytes, encoding: str, static: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if static else COMPRESSION_BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9 if static else COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+class _StreamCompressor:
+    """Incremental compressor that flushes each chunk so streams stay live"""
+
+    def __init__(self, encoding: str):
+        self.encoding = encoding
+        if encoding == "br":
+            self._compressor = brotli.Compressor(quality=COMPRESSION_BROTLI_QUALITY)
+        else:
+            self._compressor = zlib.compressobj(COMPRESSION_GZIP_LEVEL, zlib.DEFLATED, 31)
+
+    def chunk(self, data: bytes) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.process(data) + self._compressor.flush()
+        return self._compressor.compress(data) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._compressor.finish()
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Pure ASGI middleware compressing JSON and text responses.
+
+    Responses that already carry a Content-Encoding, are not compressible
+    or are smaller than COMPRESSION_MIN_SIZE pass through unchanged.
+    Bodies with a strong ETag are compressed once and served from
+    ``compressed_cache``. Whenever the client negotiates an encoding, a
+    strong ETag is sent weak, on 304s and small uncompressed bodies too,
+    so one representation always has one validator; If-None-Match still
+    matches it. Streaming responses are compressed chunk by chunk.
+    Wire bytes and compression CPU time are recorded per route.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"), ENCODINGS)
+        start_message = None
+        stream = None
+        passthrough = False
+
+        async def send_body(message, body: bytes, body_encoding: str):
+            http_response_bytes_total.inc(route_label(scope), body_encoding, amount=len(body))
+            await send({**message, "body": body})
+
+        def weaken_etag(headers: MutableHeaders) -> Optional[str]:
+            # The strong ETag, now sent weak; None if there was none
+            etag = headers.get("etag")
+            if etag is None or variant_etag(etag, encoding) == etag:
+                return None
+            headers["ETag"] = variant_etag(etag, encoding)
+            return etag
+
+        async def send_wrapper(message):
+            nonlocal start_message, stream, passthrough
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if message["status"] == 304 and "content-encoding" not in headers:
+                    # Same validator as the 200 this revalidates would carry
+                    mutable = MutableHeaders(raw=message["headers"])
+                    if weaken_etag(mutable) is not None:
+                        mutable.add_vary_header("Accept-Encoding")
+                passthrough = (
+                    "content-encoding" in headers
+                    or message["status"] in (204, 304)
+                    or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+                )
+                start_message = message
+                if passthrough:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            more_body = message.get("more_body", False)
+            route = route_label(scope)
+            http_response_uncompressed_bytes_total.inc(route, amount=len(body))
+            if passthrough:
+                await send_body(message, body, "identity")
+                return
+
+            if stream is not None:
+                started = time.thread_time()
+                chunk = stream.chunk(body) + (b"" if more_body else stream.finish())
+                compression_duration_seconds.observe(time.thread_time() - started, route, stream.encoding)
+                await send_body(message, chunk, stream.encoding)
+                return
+
+            # First body message: decide how the whole response is sent
+            headers = MutableHeaders(raw=start_message["headers"])
+            passthrough = not more_body and len(body) < COMPRESSION_MIN_SIZE
+            if passthrough:
+                if weaken_etag(headers) is not None:
+                    headers.add_vary_header("Accept-Encoding")
+            else:
+                headers.add_vary_header("Accept-Encoding")
+                passthrough = encoding is None
+            if passthrough:
+                await send(start_message)
+                await send_body(message, body, "identity")
+                return
+
+            strong_etag = weaken_etag(headers)
+            headers["Content-Encoding"] = encoding
+
+            started = time.thread_time()
+            if more_body:
+                del headers["Content-Length"]
+                stream = _StreamCompressor(encoding)
+                chunk = stream.chunk(body)
+            else:
+                chunk = compressed_cache.get((strong_etag, encoding)) if strong_etag is not None else None
+                if chunk is None:
+                    static = headers.get("cache-control") in REFERENCE_CACHE_CONTROLS
+                    chunk = compress(body, encoding, static=static)
+                    if strong_etag is not None:
+                        compressed_cache.set((strong_etag, encoding), chunk)
+                headers["Content-Length"] = str(len(chunk))
+            compression_duration_seconds.observe(time.thread_time() - started, route, encoding)
+
+            await send(start_message)
+            await send_body(message, chunk, encoding)
+
+        await self.app(scope, receive, send_wrapper)
@@ -0,0 +1,66 @@
+"""
+Krishi Mitra - Crop Scoring
+Season-based crop suitability scoring, vectorized with NumPy for batches
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+KHARIF = 1
+RABI = 2
+ZAID = 3
+
+SEASON_BOOST = 5
+MAX_SUITABILITY_SCORE = 95
+
+
+class CropScorer:
+    """Scores a fixed crop catalog for many (location, season) rows at once.
+
+    ``season_preferences`` maps a season id to the crop names that get the
+    season boost. Season ids missing from the mapping fall back to
+    ``default_season``, mirroring the single-request endpoint.
+    """
+
+    def __init__(self, crops: Sequence[dict], season_preferences: Dict[int, Sequence[str]], default_season: int = ZAID):
+        self.crops = list(crops)
+        self._season_ids = sorted(season_preferences)
+        self._default_row = self._season_ids.index(default_season)
+
+        base = np.array([crop["suitability_score"] for crop in self.crops], dtype=np.int32)
+        boosted = np.minimum(MAX_SUITABILITY_SCORE, base + SEASON_BOOST)
+        preferred = np.array([
+            [crop["crop_name"] in season_preferences[season_id] for crop in self.crops]
+            for season_id in self._season_ids
+        ])
+        # One row of final scores per known season: (n_seasons, n_crops)
+        self._season_scores = np.where(preferred, boosted, base)
+
+    def season_rows(self, season_ids: Sequence[int]) -> np.ndarray:
+        """Map raw season ids to rows of the season score table"""
+        season_ids = np.asarray(season_ids, dtype=np.int64)
+        rows = np.full(season_ids.shape, self._default_row, dtype=np.intp)
+        for row, season_id in enumerate(self._season_ids):
+            rows[season_ids == season_id] = row
+        return rows
+
+    def score(self, season_ids: Sequence[int], top_k: Optional[int] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """Rank the catalog for every row.
+
+        Returns ``(crop_index, scores)``, both shaped ``(rows, k)``, ordered
+        by descending score. Ties keep catalog order, like ``list.sort``.
+        """
+        scores = self._season_scores[self.season_rows(season_ids)]
+        order = np.argsort(-scores, axis=1, kind="stable")
+        if top_k is not None:
+            order = order[:, :top_k]
+        return order, np.take_along_axis(scores, order, axis=1)
+
+    def recommend(self, season_id: int, top_k: Optional[int] = None) -> List[dict]:
+        """Ranked crop dicts for a single season, in the response shape"""
+        order, scores = self.score([season_id], top_k)
+        return [
+            {**self.crops[index], "suitability_score": score}
+            for index, score in zip(order[0].tolist(), scores[0].tolist())
+        ]
@@ -0,0 +1,93 @@
+"""
+Krishi Mitra - Database Pool Monitor
+Connection pool statistics collected from PyMongo pool events
+"""
+
+import threading
+from collections import deque
+
+from pymongo import monitoring
+
+from metrics import percentile
+
+CHECKOUT_SAMPLE_SIZE = 1024
+
+
+class PoolMonitor(monitoring.ConnectionPoolListener):
+    """Tracks open and in-use connections and recent checkout wait times.
+
+    PyMongo emits these events from Motor's worker threads, so counters are
+    updated under a lock. Wait times keep the last CHECKOUT_SAMPLE_SIZE
+    checkouts for percentile reporting.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._waits_ms = deque(maxlen=CHECKOUT_SAMPLE_SIZE)
+        self.open = 0
+        self.in_use = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self._waits_ms)
+            stats = {
+                "open_connections": self.open,
+                "in_use_connections": self.in_use,
+                "checkouts": self.checkouts,
+                "checkout_failures": self.checkout_failures,
+                "pool_clears": self.pool_clears
+            }
+        if waits:
+            stats["checkout_wait_ms"] = {
+                "samples": len(waits),
+                "p50": round(percentile(waits, 50), 3),
+                "p95": round(percentile(waits, 95), 3),
+                "p99": round(percentile(waits, 99), 3),
+                "max": round(waits[-1], 3)
+            }
+        return stats
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            self.in_use += 1
+            self.checkouts += 1
+            if event.duration is not None:
+                self._waits_ms.append(event.duration * 1000)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.in_use -= 1
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self.checkout_failures += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def connection_check_out_started(self, event):
+        pass
+
+    def connection_ready(self, event):
+        pass
+
+    def pool_created(self, event):
+        pass
+
+    def pool_ready(self, event):
+        pass
+
+    def pool_closed(self, event):
+        pass
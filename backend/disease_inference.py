@@ -0,0 +1,258 @@
+"""
+Krishi Mitra - Disease Inference
+Leaf photo diagnosis: pooled image decoding and micro-batched model calls
+"""
+
+import asyncio
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+from fastapi import Request
+
+from disease_model import DiseaseModel, Image, InvalidImage, decode_image, load_disease_model
+from errors import RetryLater
+from metrics import inference_batch_duration_seconds, inference_batch_size, inference_queue_depth, operation_duration_seconds
+
+DISEASE_MAX_UPLOAD_BYTES = int(os.getenv("DISEASE_MAX_UPLOAD_BYTES", str(8 * 1024 * 1024)))
+# Processes decoding and resizing uploads
+DISEASE_DECODE_WORKERS = int(os.getenv("DISEASE_DECODE_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Largest batch per model call, and how long the first image of a batch may
+# wait for others to join it when the model is idle
+DISEASE_MAX_BATCH_SIZE = int(os.getenv("DISEASE_MAX_BATCH_SIZE", "16"))
+DISEASE_MAX_BATCH_DELAY_MS = float(os.getenv("DISEASE_MAX_BATCH_DELAY_MS", "10"))
+# Uploads being decoded or waiting for the model before new ones get a 503
+DISEASE_MAX_PENDING = int(os.getenv("DISEASE_MAX_PENDING", "256"))
+
+IMAGE_CONTENT_TYPES = ("image/jpeg", "image/png", "image/webp")
+
+
+class ImageTooLarge(Exception):
+    """The upload is over DISEASE_MAX_UPLOAD_BYTES"""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"Image is larger than {max_bytes // (1024 * 1024)} MB")
+        self.max_bytes = max_bytes
+
+
+class DiagnosisBusy(RetryLater):
+    """Raised when too many uploads are already being diagnosed"""
+
+    detail = "Too many images are being analyzed, please retry shortly"
+    retry_after = 2
+
+
+class DiagnosisUnavailable(Exception):
+    """Image diagnosis needs Pillow, which is not installed"""
+
+
+async def read_upload(request: Request, max_bytes: int = DISEASE_MAX_UPLOAD_BYTES) -> bytes:
+    """The request body, read as it streams in and abandoned past ``max_bytes``"""
+    declared = request.headers.get("content-length", "")
+    if declared.isdigit() and int(declared) > max_bytes:
+        raise ImageTooLarge(max_bytes)
+    body = bytearray()
+    async for chunk in request.stream():
+        body.extend(chunk)
+        if len(body) > max_bytes:
+            raise ImageTooLarge(max_bytes)
+    if not body:
+        raise InvalidImage("The request body is empty")
+    return bytes(body)
+
+
+def _warm_up():
+    # Runs once per new decoding process so the first upload does not pay
+    # for starting the interpreter and importing Pillow and numpy
+    return os.getpid()
+
+
+class MicroBatcher:
+    """Groups concurrent predictions into one model call.
+
+    Callers queue a decoded image and wait for its row of probabilities.
+    A single task takes up to ``max_batch_size`` queued images, stacks them
+    and runs the model once on a dedicated thread. While the model is
+    busy, new images pile up and form the next batch, so under load
+    batches fill without any added delay; when the model is idle the
+    first image waits at most ``max_delay_ms`` for company.
+    """
+
+    def __init__(self, model: DiseaseModel, max_batch_size: int = DISEASE_MAX_BATCH_SIZE, max_delay_ms: float = DISEASE_MAX_BATCH_DELAY_MS):
+        self.model = model
+        self.max_batch_size = max_batch_size
+        self.max_delay = max_delay_ms / 1000
+        self._queue: List[tuple] = []
+        self._arrived = asyncio.Event()
+        self._filled = asyncio.Event()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self.batches = 0
+        self.images = 0
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def _queue_changed(self):
+        for event, is_set in ((self._arrived, bool(self._queue)), (self._filled, len(self._queue) >= self.max_batch_size)):
+            if is_set:
+                event.set()
+            else:
+                event.clear()
+        inference_queue_depth.set(len(self._queue), self.model.name)
+
+    def start(self):
+        if self._task is None:
+            self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="disease-model")
+            self._task = asyncio.create_task(self._run())
+
+    async def predict(self, image: np.ndarray) -> np.ndarray:
+        future = asyncio.get_running_loop().create_future()
+        self._queue.append((image, future))
+        self._queue_changed()
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._arrived.wait()
+            if not self._filled.is_set():
+                try:
+                    await asyncio.wait_for(self._filled.wait(), self.max_delay)
+                except asyncio.TimeoutError:
+                    pass
+            batch = self._queue[:self.max_batch_size]
+            del self._queue[:self.max_batch_size]
+            self._queue_changed()
+            # Requests whose client went away no longer need a prediction
+            batch = [(image, future) for image, future in batch if not future.done()]
+            if not batch:
+                continue
+
+            start = time.perf_counter()
+            try:
+                probabilities = await loop.run_in_executor(
+                    self._executor, self.model.predict, np.stack([image for image, _ in batch])
+                )
+            except Exception as exc:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+            inference_batch_duration_seconds.observe(time.perf_counter() - start, self.model.name)
+            inference_batch_size.observe(len(batch), self.model.name)
+            self.batches += 1
+            self.images += len(batch)
+            for (_, future), row in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(row)
+
+    def shutdown(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        for _, future in self._queue:
+            future.cancel()
+        self._queue.clear()
+
+
+class DiseaseDiagnosisService:
+    """Diagnoses leaf photos without blocking the event loop.
+
+    Uploads are decoded and resized in a process pool, since Pillow holds
+    the GIL for much of that work, then go through the MicroBatcher to the
+    model. At most ``max_pending`` uploads may be in either stage; beyond
+    that callers get DiagnosisBusy instead of an ever-growing backlog.
+    """
+
+    def __init__(
+        self,
+        model: DiseaseModel,
+        decode_workers: int = DISEASE_DECODE_WORKERS,
+        max_batch_size: int = DISEASE_MAX_BATCH_SIZE,
+        max_delay_ms: float = DISEASE_MAX_BATCH_DELAY_MS,
+        max_pending: int = DISEASE_MAX_PENDING
+    ):
+        self.model = model
+        self.decode_workers = decode_workers
+        self.max_pending = max_pending
+        self._batcher = MicroBatcher(model, max_batch_size, max_delay_ms)
+        self._decoders: Optional[ProcessPoolExecutor] = None
+        self._pending = 0
+
+    async def start(self):
+        """Start the decoding processes and the batching task"""
+        if Image is None:
+            return
+        if self._decoders is None:
+            # Spawned rather than forked: the server already runs threads
+            self._decoders = ProcessPoolExecutor(
+                max_workers=self.decode_workers, mp_context=multiprocessing.get_context("spawn")
+            )
+            loop = asyncio.get_running_loop()
+            await asyncio.gather(*(loop.run_in_executor(self._decoders, _warm_up) for _ in range(self.decode_workers)))
+        self._batcher.start()
+
+    async def diagnose(self, data: bytes) -> dict:
+        """Most likely diagnosis for an encoded photo; InvalidImage if it cannot be decoded"""
+        if Image is None or self._decoders is None:
+            raise DiagnosisUnavailable("Image diagnosis is not available on this server")
+        # Only touched from the event loop thread, so a plain counter is safe
+        if self._pending >= self.max_pending:
+            raise DiagnosisBusy()
+        self._pending += 1
+        try:
+            with operation_duration_seconds.time("disease_decode"):
+                image = await asyncio.get_running_loop().run_in_executor(
+                    self._decoders, decode_image, data, self.model.input_size
+                )
+            with operation_duration_seconds.time("disease_predict"):
+                probabilities = await self._batcher.predict(image)
+        finally:
+            self._pending -= 1
+        return self._result(probabilities)
+
+    def _result(self, probabilities: np.ndarray) -> dict:
+        ranked = np.argsort(probabilities)[::-1][:3]
+        predictions = [
+            {
+                "disease": self.model.labels[i],
+                "name": self.model.label_names.get(self.model.labels[i], self.model.labels[i]),
+                "confidence": round(float(probabilities[i]), 4)
+            }
+            for i in ranked
+        ]
+        return {
+            **predictions[0],
+            "healthy": predictions[0]["disease"] == self.model.healthy_label,
+            "predictions": predictions,
+            "model": self.model.name
+        }
+
+    def stats(self) -> dict:
+        return {
+            "available": self._decoders is not None,
+            "model": self.model.name,
+            "pending": self._pending,
+            "queue_depth": self._batcher.depth,
+            "batches": self._batcher.batches,
+            "mean_batch_size": round(self._batcher.images / self._batcher.batches, 2) if self._batcher.batches else 0
+        }
+
+    def shutdown(self):
+        self._batcher.shutdown()
+        if self._decoders is not None:
+            self._decoders.shutdown(wait=False, cancel_futures=True)
+            self._decoders = None
+
+
+def create_disease_service() -> DiseaseDiagnosisService:
+    """Diagnosis service for the configured model (DISEASE_MODEL or the reference model)"""
+    return DiseaseDiagnosisService(load_disease_model())
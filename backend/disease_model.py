@@ -0,0 +1,125 @@
+"""
+Krishi Mitra - Disease Model
+Leaf photo preprocessing and the pluggable crop-disease classifier
+"""
+
+import importlib
+import io
+import os
+from abc import ABC, abstractmethod
+from typing import Dict, Sequence
+
+import numpy as np
+
+try:
+    from PIL import Image, ImageOps, UnidentifiedImageError
+except ImportError:  # Pillow is optional; without it image diagnosis is unavailable
+    Image = None
+
+# Photos larger than this are rejected before their pixels are decoded
+DISEASE_MAX_IMAGE_PIXELS = int(os.getenv("DISEASE_MAX_IMAGE_PIXELS", str(40_000_000)))
+# "package.module:factory" returning a DiseaseModel; empty for the reference model
+DISEASE_MODEL = os.getenv("DISEASE_MODEL", "")
+
+IMAGE_FORMATS = ("JPEG", "PNG", "WEBP")
+
+
+class InvalidImage(ValueError):
+    """The upload is not a JPEG, PNG or WebP image that can be decoded"""
+
+
+def decode_image(data: bytes, size: int) -> np.ndarray:
+    """Decode an uploaded photo to a ``size`` x ``size`` RGB uint8 array.
+
+    Runs in the decoding process pool, so it only depends on Pillow and
+    numpy. The photo is centre-cropped to a square before resizing.
+    """
+    try:
+        with Image.open(io.BytesIO(data)) as image:
+            if image.format not in IMAGE_FORMATS:
+                raise InvalidImage(f"Unsupported image format {image.format}; use JPEG, PNG or WebP")
+            width, height = image.size
+            if width * height > DISEASE_MAX_IMAGE_PIXELS:
+                raise InvalidImage(f"Image is {width}x{height}; at most {DISEASE_MAX_IMAGE_PIXELS} pixels are accepted")
+            # JPEG decodes directly at 1/2, 1/4 or 1/8 scale, which is far
+            # cheaper than decoding a phone photo at full size
+            image.draft("RGB", (size, size))
+            rgb = ImageOps.fit(image.convert("RGB"), (size, size), Image.Resampling.BILINEAR)
+            return np.asarray(rgb, dtype=np.uint8)
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise InvalidImage("Could not decode the image")
+
+
+class DiseaseModel(ABC):
+    """A CPU classifier over batches of leaf photos.
+
+    ``predict`` takes an (N, input_size, input_size, 3) uint8 array and
+    returns an (N, len(labels)) array of class probabilities. It is called
+    with whole batches, so it should be vectorized over the first axis.
+    """
+
+    name = "base"
+    input_size = 96
+    labels: Sequence[str] = ()
+    label_names: Dict[str, str] = {}
+    healthy_label = "healthy"
+
+    @abstractmethod
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        """Class probabilities, one row per image"""
+
+
+class ReferenceDiseaseModel(DiseaseModel):
+    """Tiny colour-based classifier standing in for a trained network.
+
+    Each photo is reduced to the share of pixels in five colour classes
+    (green leaf, brown lesions, orange rust pustules, white mildew and
+    yellow mosaic) and scored with one fixed linear layer and a softmax.
+    It is deterministic and cheap enough for tests and benchmarks; it is
+    not a substitute for a model trained on labelled field photos.
+    """
+
+    name = "reference"
+    input_size = 64
+    labels = ("healthy", "leaf_blight", "rust", "powdery_mildew", "yellow_mosaic")
+    label_names = {
+        "healthy": "Healthy",
+        "leaf_blight": "Leaf blight",
+        "rust": "Rust",
+        "powdery_mildew": "Powdery mildew",
+        "yellow_mosaic": "Yellow mosaic",
+    }
+
+    # Rows are the colour shares, columns the labels: each lesion colour
+    # votes for its disease and against "healthy"
+    WEIGHTS = np.array([
+        [6.0, -2.0, -2.0, -2.0, -2.0],
+        [-8.0, 12.0, 3.0, 0.0, 0.0],
+        [-8.0, 3.0, 14.0, 0.0, 1.0],
+        [-8.0, 0.0, 0.0, 12.0, 0.0],
+        [-8.0, 0.0, 1.0, 0.0, 12.0],
+    ], dtype=np.float32)
+    BIAS = np.array([1.0, 0.0, 0.0, 0.0, 0.0], dtype=np.float32)
+
+    def predict(self, images: np.ndarray) -> np.ndarray:
+        pixels = images.reshape(len(images), -1, 3).astype(np.float32) / 255.0
+        r, g, b = pixels[..., 0], pixels[..., 1], pixels[..., 2]
+        spread = pixels.max(axis=2) - pixels.min(axis=2)
+        yellow = (r > 0.55) & (g > 0.55) & (b < 0.4) & (np.abs(r - g) < 0.2)
+        orange = (r > 0.6) & (g > 0.25) & (g < 0.55) & (b < 0.3)
+        brown = (r > g) & (g > b) & (r < 0.65) & (r - b > 0.12) & ~orange
+        white = (pixels.min(axis=2) > 0.7) & (spread < 0.12)
+        green = (g > r) & (g > b) & ~yellow & ~white
+        features = np.stack([mask.mean(axis=1) for mask in (green, brown, orange, white, yellow)], axis=1)
+        logits = features @ self.WEIGHTS + self.BIAS
+        logits -= logits.max(axis=1, keepdims=True)
+        scores = np.exp(logits)
+        return scores / scores.sum(axis=1, keepdims=True)
+
+
+def load_disease_model(spec: str = DISEASE_MODEL) -> DiseaseModel:
+    """The model named by ``spec`` ("module:factory"), or the reference model"""
+    if not spec:
+        return ReferenceDiseaseModel()
+    module_name, _, factory = spec.partition(":")
+    return getattr(importlib.import_module(module_name), factory or "create_model")()
@@ -0,0 +1,34 @@
+"""
+Krishi Mitra - Errors
+Overload errors that ask the client to retry, and their JSON handler
+"""
+
+from typing import Optional
+
+from fastapi.responses import JSONResponse
+
+
+class RetryLater(Exception):
+    """Base for requests turned away under load.
+
+    Subclasses set ``status_code``, ``detail`` and a default
+    ``retry_after`` in seconds; ``retry_later_handler`` answers all of
+    them with that status, a ``{"detail": ...}`` body and Retry-After.
+    """
+
+    status_code = 503
+    detail = "Service busy, please retry shortly"
+    retry_after = 1
+
+    def __init__(self, retry_after: Optional[int] = None):
+        super().__init__(self.detail)
+        if retry_after is not None:
+            self.retry_after = retry_after
+
+
+async def retry_later_handler(request, exc: RetryLater) -> JSONResponse:
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"detail": exc.detail},
+        headers={"Retry-After": str(exc.retry_after)}
+    )
@@ -0,0 +1,33 @@
+"""
+Krishi Mitra - Fast JSON Responses
+Serialization path for routes that return plain, already-valid data
+"""
+
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:  # orjson is optional; the stdlib encoder is the fallback
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSON response encoded with orjson when it is installed.
+
+    Returning a Response instance makes FastAPI skip ``response_model``
+    validation and serialization for that call, while the route's declared
+    model still documents the schema in OpenAPI. Only use it for data that
+    already matches the model, such as the indexed reference data.
+    """
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,94 @@
+"""
+Krishi Mitra - Geo Index
+Nearest-district lookup over district centroids using a k-d tree
+"""
+
+import math
+from typing import List, Optional, Sequence, Tuple
+
+EARTH_RADIUS_KM = 6371.0088
+
+
+def _to_unit_vector(lat: float, lon: float) -> Tuple[float, float, float]:
+    # Points on the unit sphere: straight-line (chord) distance between them
+    # grows monotonically with great-circle distance, so a plain Euclidean
+    # k-d tree returns the geographically nearest centroid.
+    phi = math.radians(lat)
+    lam = math.radians(lon)
+    cos_phi = math.cos(phi)
+    return (cos_phi * math.cos(lam), cos_phi * math.sin(lam), math.sin(phi))
+
+
+def _chord_to_km(chord_sq: float) -> float:
+    chord = math.sqrt(chord_sq)
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, chord / 2))
+
+
+class DistrictSpatialIndex:
+    """Static k-d tree over district centroids.
+
+    Built once from district records carrying ``lat``/``lon``; each query
+    visits O(log n) nodes on average, which keeps a lookup over the full
+    LGD district list in the tens of microseconds.
+    """
+
+    def __init__(self, districts: Sequence[dict]):
+        self._districts = list(districts)
+        points = [
+            (_to_unit_vector(d["lat"], d["lon"]), i)
+            for i, d in enumerate(self._districts)
+        ]
+        self._root = self._build(points, 0)
+
+    def __len__(self) -> int:
+        return len(self._districts)
+
+    def _build(self, points: list, depth: int):
+        if not points:
+            return None
+        axis = depth % 3
+        points.sort(key=lambda p: p[0][axis])
+        mid = len(points) // 2
+        point, index = points[mid]
+        # Node layout: (xyz, district index, split axis, left, right)
+        return (
+            point,
+            index,
+            axis,
+            self._build(points[:mid], depth + 1),
+            self._build(points[mid + 1:], depth + 1)
+        )
+
+    def nearest(self, lat: float, lon: float) -> Optional[Tuple[dict, float]]:
+        """Return ``(district, distance_km)`` for the closest centroid"""
+        if self._root is None:
+            return None
+
+        target = _to_unit_vector(lat, lon)
+        best = [float("inf"), -1]
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            if node is None:
+                continue
+            point, index, axis, left, right = node
+            dx = point[0] - target[0]
+            dy = point[1] - target[1]
+            dz = point[2] - target[2]
+            dist_sq = dx * dx + dy * dy + dz * dz
+            if dist_sq < best[0]:
+                best[0] = dist_sq
+                best[1] = index
+
+            diff = target[axis] - point[axis]
+            near, far = (left, right) if diff < 0 else (right, left)
+            # Visit the far side only if the splitting plane is closer than
+            # the best match so far; it is pushed first so it pops last.
+            if diff * diff < best[0]:
+                stack.append(far)
+            stack.append(near)
+
+        return self._districts[best[1]], _chord_to_km(best[0])
+
+    def nearest_many(self, points: Sequence[Tuple[float, float]]) -> List[Optional[Tuple[dict, float]]]:
+        return [self.nearest(lat, lon) for lat, lon in points]
@@ -0,0 +1,72 @@
+"""
+Krishi Mitra - HTTP Caching
+ETag validators, conditional requests and Cache-Control policies
+"""
+
+import os
+import sys
+from typing import Callable, Optional
+
+from fastapi import Request
+from fastapi.responses import Response
+
+# Negotiation and ETag helpers shared with api/ live at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from http_common import etag_matches
+
+# Reference data only changes with a new dataset version, and every change
+# gets a new ETag, so clients and CDNs may keep it for a while and then
+# revalidate in the background
+REFERENCE_MAX_AGE_SECONDS = int(os.getenv("REFERENCE_MAX_AGE_SECONDS", "3600"))
+REFERENCE_STALE_SECONDS = int(os.getenv("REFERENCE_STALE_SECONDS", "86400"))
+
+
+def cache_control(max_age: int, stale_while_revalidate: int = 0, private: bool = False) -> str:
+    """Cache-Control value; ``private`` for per-user (authenticated) responses"""
+    value = f"{'private' if private else 'public'}, max-age={max(0, int(max_age))}"
+    if stale_while_revalidate:
+        value += f", stale-while-revalidate={int(stale_while_revalidate)}"
+    return value
+
+
+def reference_cache_control(private: bool = False) -> str:
+    return cache_control(REFERENCE_MAX_AGE_SECONDS, REFERENCE_STALE_SECONDS, private)
+
+
+def reference_etag(version: str, *parts) -> str:
+    """Strong ETag for a resource derived from the reference data version"""
+    return '"%s"' % "-".join([version, *(str(part) for part in parts)])
+
+
+def _validator_headers(etag: Optional[str], cache_control_value: str) -> dict:
+    headers = {"Cache-Control": cache_control_value}
+    if etag is not None:
+        headers["ETag"] = etag
+    return headers
+
+
+def not_modified(request: Request, etag: Optional[str], cache_control_value: str) -> Optional[Response]:
+    """A 304 response if the client already holds ``etag``, else None"""
+    if etag is None or not etag_matches(request.headers.get("if-none-match"), etag):
+        return None
+    return Response(status_code=304, headers=_validator_headers(etag, cache_control_value))
+
+
+def add_validators(response: Response, etag: Optional[str], cache_control_value: str) -> Response:
+    response.headers.update(_validator_headers(etag, cache_control_value))
+    return response
+
+
+def conditional_response(
+    request: Request,
+    etag: Optional[str],
+    cache_control_value: str,
+    build: Callable[[], Response]
+) -> Response:
+    """304 when the client already holds ``etag``, else ``build()`` with validators.
+
+    ``build`` is only called for a full response, so a revalidation costs
+    no serialization. Without an ETag the response is built as usual and
+    just gets the Cache-Control header.
+    """
+    return not_modified(request, etag, cache_control_value) or add_validators(build(), etag, cache_control_value)
@@ -0,0 +1,163 @@
+"""
+Krishi Mitra - Produce Listings
+Marketplace listing search: compound indexes, keyset cursors and projections
+"""
+
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+CATEGORIES = ("cereals", "pulses", "oilseeds", "vegetables", "fruits", "spices")
+SEASONS = ("kharif", "rabi", "zaid")
+STATUSES = ("active", "sold", "withdrawn")
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Fields a search may ask for with ``fields=``; "id" is always returned
+LISTING_FIELDS = (
+    "seller_id", "seller_name", "category", "crop", "variety", "quantity_quintals",
+    "price_per_quintal", "harvest_month", "season", "quality", "state_code",
+    "district_code", "collection_point", "details", "status", "created_at", "updated_at"
+)
+
+# Sort key -> MongoDB sort; _id breaks ties so every position is unique
+SORTS = {
+    "newest": [("_id", DESCENDING)],
+    "price_asc": [("price_per_quintal", ASCENDING), ("_id", ASCENDING)],
+    "price_desc": [("price_per_quintal", DESCENDING), ("_id", DESCENDING)],
+}
+
+# Searches only ever show active listings. Each index puts the equality
+# filters first, then the sort keys, so a page is read in index order and
+# the price range narrows the same index scan (equality, sort, range):
+#   district [+ category | crop], by price  -> the three district_*_price
+#   district, newest first                  -> district_newest
+#   category or crop across districts       -> category_price, crop_price
+#   no filters, by price or newest first    -> price, newest
+LISTING_INDEXES = [
+    IndexModel([("status", ASCENDING), ("state_code", ASCENDING), ("district_code", ASCENDING),
+                ("category", ASCENDING), ("price_per_quintal", ASCENDING), ("_id", ASCENDING)],
+               name="district_category_price"),
+    IndexModel([("status", ASCENDING), ("state_code", ASCENDING), ("district_code", ASCENDING),
+                ("crop_key", ASCENDING), ("price_per_quintal", ASCENDING), ("_id", ASCENDING)],
+               name="district_crop_price"),
+    IndexModel([("status", ASCENDING), ("state_code", ASCENDING), ("district_code", ASCENDING),
+                ("price_per_quintal", ASCENDING), ("_id", ASCENDING)],
+               name="district_price"),
+    IndexModel([("status", ASCENDING), ("state_code", ASCENDING), ("district_code", ASCENDING),
+                ("_id", DESCENDING)],
+               name="district_newest"),
+    IndexModel([("status", ASCENDING), ("category", ASCENDING), ("price_per_quintal", ASCENDING), ("_id", ASCENDING)],
+               name="category_price"),
+    IndexModel([("status", ASCENDING), ("crop_key", ASCENDING), ("price_per_quintal", ASCENDING), ("_id", ASCENDING)],
+               name="crop_price"),
+    IndexModel([("status", ASCENDING), ("price_per_quintal", ASCENDING), ("_id", ASCENDING)], name="price"),
+    IndexModel([("status", ASCENDING), ("_id", DESCENDING)], name="newest"),
+]
+
+
+def crop_key(crop: str) -> str:
+    """Case- and space-insensitive form of a crop name used for filtering"""
+    return " ".join(crop.lower().split())
+
+
+def encode_cursor(sort: str, listing: dict) -> str:
+    """Opaque cursor for the position just after ``listing``"""
+    position = [sort, str(listing["_id"])]
+    if sort != "newest":
+        position.append(listing["price_per_quintal"])
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode().rstrip("=")
+
+
+def decode_cursor(sort: str, cursor: str) -> Tuple[ObjectId, Optional[int]]:
+    """``(last _id, last price)`` from a cursor; ValueError if it is invalid"""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        position = json.loads(raw)
+        cursor_sort, last_id = position[0], ObjectId(position[1])
+        last_price = position[2] if cursor_sort != "newest" else None
+    except (ValueError, TypeError, IndexError, KeyError, InvalidId):
+        raise ValueError("Invalid cursor")
+    if cursor_sort != sort:
+        raise ValueError("Cursor belongs to a different sort order")
+    if last_price is not None and not isinstance(last_price, int):
+        raise ValueError("Invalid cursor")
+    return last_id, last_price
+
+
+def after_cursor(sort: str, last_id: ObjectId, last_price: Optional[int]) -> dict:
+    """Filter for the documents after a cursor position in ``sort`` order"""
+    if sort == "newest":
+        return {"_id": {"$lt": last_id}}
+    op = "$gt" if sort == "price_asc" else "$lt"
+    return {"$or": [
+        {"price_per_quintal": {op: last_price}},
+        {"price_per_quintal": last_price, "_id": {op: last_id}}
+    ]}
+
+
+def search_query(
+    category: Optional[str] = None,
+    crop: Optional[str] = None,
+    state_code: Optional[int] = None,
+    district_code: Optional[int] = None,
+    min_price: Optional[int] = None,
+    max_price: Optional[int] = None,
+    sort: str = "newest",
+    cursor: Optional[str] = None
+) -> dict:
+    """MongoDB filter for one page of a listing search"""
+    query: dict = {"status": "active"}
+    if state_code is not None:
+        query["state_code"] = state_code
+    if district_code is not None:
+        query["district_code"] = district_code
+    if category is not None:
+        query["category"] = category
+    if crop is not None:
+        query["crop_key"] = crop_key(crop)
+    price = {}
+    if min_price is not None:
+        price["$gte"] = min_price
+    if max_price is not None:
+        price["$lte"] = max_price
+    if price:
+        query["price_per_quintal"] = price
+    if cursor is not None:
+        query = {"$and": [query, after_cursor(sort, *decode_cursor(sort, cursor))]}
+    return query
+
+
+def parse_fields(fields: Optional[str]) -> Optional[List[str]]:
+    """Requested fields from a comma-separated list (None means all)"""
+    if not fields:
+        return None
+    requested = [field.strip() for field in fields.split(",") if field.strip()]
+    unknown = [field for field in requested if field != "id" and field not in LISTING_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return [field for field in requested if field != "id"]
+
+
+def search_projection(fields: Optional[List[str]], sort: str) -> dict:
+    """Projection for the requested fields plus what the cursor needs"""
+    selected = LISTING_FIELDS if fields is None else fields
+    projection = {"_id": 1, **{field: 1 for field in selected}}
+    if sort != "newest":
+        projection["price_per_quintal"] = 1
+    return projection
+
+
+def public_listing(listing: dict, fields: Optional[List[str]] = None) -> dict:
+    """A listing document as returned by the API"""
+    selected = LISTING_FIELDS if fields is None else fields
+    result = {"id": str(listing["_id"])}
+    for field in selected:
+        if field in listing:
+            result[field] = listing[field]
+    return result
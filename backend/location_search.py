@@ -0,0 +1,342 @@
+"""
+Krishi Mitra - Location Search
+Typo- and script-tolerant autocomplete over state and district names
+"""
+
+import re
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+
+# Romanization tables for the scripts of the UI languages (config.js
+# LANGUAGES): Devanagari (hi, mr), Gurmukhi (pa) and Tamil (ta). Only the
+# letters found in place names are needed; the output feeds phonetic_key,
+# so it does not need to be a standard transliteration.
+_SCRIPTS = {
+    "devanagari": {
+        "vowels": {
+            "अ": "a", "आ": "aa", "इ": "i", "ई": "ii", "उ": "u", "ऊ": "uu", "ऋ": "ri",
+            "ए": "e", "ऐ": "ai", "ओ": "o", "औ": "au", "ऑ": "o", "ऍ": "e"
+        },
+        "signs": {
+            "ा": "aa", "ि": "i", "ी": "ii", "ु": "u", "ू": "uu", "ृ": "ri",
+            "े": "e", "ै": "ai", "ो": "o", "ौ": "au", "ॉ": "o", "ॅ": "e"
+        },
+        "consonants": {
+            "क": "k", "ख": "kh", "ग": "g", "घ": "gh", "ङ": "n", "च": "ch", "छ": "chh", "ज": "j",
+            "झ": "jh", "ञ": "n", "ट": "t", "ठ": "th", "ड": "d", "ढ": "dh", "ण": "n", "त": "t",
+            "थ": "th", "द": "d", "ध": "dh", "न": "n", "प": "p", "फ": "ph", "ब": "b", "भ": "bh",
+            "म": "m", "य": "y", "र": "r", "ल": "l", "ळ": "l", "व": "v", "श": "sh", "ष": "sh",
+            "स": "s", "ह": "h"
+        },
+        "nukta_forms": {"क": "q", "ख": "kh", "ग": "g", "ज": "z", "ड": "r", "ढ": "rh", "फ": "f"},
+        "nasals": {"ं": "n", "ँ": "n"},
+        "virama": "्", "nukta": "़", "visarga": "ः",
+        "schwa_deletion": True
+    },
+    "gurmukhi": {
+        "vowels": {
+            "ਅ": "a", "ਆ": "aa", "ਇ": "i", "ਈ": "ii", "ਉ": "u", "ਊ": "uu",
+            "ਏ": "e", "ਐ": "ai", "ਓ": "o", "ਔ": "au"
+        },
+        "signs": {
+            "ਾ": "aa", "ਿ": "i", "ੀ": "ii", "ੁ": "u", "ੂ": "uu", "ੇ": "e", "ੈ": "ai", "ੋ": "o", "ੌ": "au"
+        },
+        "consonants": {
+            "ਕ": "k", "ਖ": "kh", "ਗ": "g", "ਘ": "gh", "ਙ": "n", "ਚ": "ch", "ਛ": "chh", "ਜ": "j",
+            "ਝ": "jh", "ਞ": "n", "ਟ": "t", "ਠ": "th", "ਡ": "d", "ਢ": "dh", "ਣ": "n", "ਤ": "t",
+            "ਥ": "th", "ਦ": "d", "ਧ": "dh", "ਨ": "n", "ਪ": "p", "ਫ": "ph", "ਬ": "b", "ਭ": "bh",
+            "ਮ": "m", "ਯ": "y", "ਰ": "r", "ਲ": "l", "ਲ਼": "l", "ਵ": "v", "ੜ": "r", "ਸ": "s",
+            "ਸ਼": "sh", "ਹ": "h", "ਖ਼": "kh", "ਗ਼": "g", "ਜ਼": "z", "ਫ਼": "f"
+        },
+        "nukta_forms": {"ਸ": "sh", "ਖ": "kh", "ਗ": "g", "ਜ": "z", "ਫ": "f", "ਲ": "l"},
+        "nasals": {"ਂ": "n", "ੰ": "n"},
+        "virama": "੍", "nukta": "਼", "visarga": "ਃ",
+        # Addak doubles the next consonant; phonetic_key drops doubling anyway
+        "ignored": "ੱ",
+        "schwa_deletion": True
+    },
+    "tamil": {
+        "vowels": {
+            "அ": "a", "ஆ": "aa", "இ": "i", "ஈ": "ii", "உ": "u", "ஊ": "uu",
+            "எ": "e", "ஏ": "ee", "ஐ": "ai", "ஒ": "o", "ஓ": "oo", "ஔ": "au"
+        },
+        "signs": {
+            "ா": "aa", "ி": "i", "ீ": "ii", "ு": "u", "ூ": "uu", "ெ": "e", "ே": "ee",
+            "ை": "ai", "ொ": "o", "ோ": "oo", "ௌ": "au"
+        },
+        "consonants": {
+            "க": "k", "ங": "n", "ச": "ch", "ஞ": "n", "ட": "t", "ண": "n", "த": "t", "ந": "n",
+            "ப": "p", "ம": "m", "ய": "y", "ர": "r", "ல": "l", "வ": "v", "ழ": "zh", "ள": "l",
+            "ற": "r", "ன": "n", "ஜ": "j", "ஷ": "sh", "ஸ": "s", "ஹ": "h"
+        },
+        "nukta_forms": {},
+        "nasals": {},
+        # Tamil marks every vowelless consonant with the pulli (virama)
+        "virama": "்", "nukta": "", "visarga": "ஃ",
+        "schwa_deletion": False
+    }
+}
+
+_CHAR_SCRIPT = {
+    char: script
+    for script, table in _SCRIPTS.items()
+    for group in ("vowels", "signs", "consonants", "nasals")
+    for char in table[group]
+}
+for _script, _table in _SCRIPTS.items():
+    for _char in (_table["virama"], _table["nukta"], _table["visarga"], _table.get("ignored", "")):
+        if _char:
+            _CHAR_SCRIPT[_char] = _script
+
+
+def _romanize_word(chars: str, table: dict) -> str:
+    # Syllables as [consonant, vowel, vowel is the inherent "a"]
+    syllables: List[list] = []
+    i = 0
+    while i < len(chars):
+        char = chars[i]
+        if char in table["consonants"]:
+            consonant = table["consonants"][char]
+            if i + 1 < len(chars) and chars[i + 1] == table["nukta"]:
+                consonant = table["nukta_forms"].get(char, consonant)
+                i += 1
+            syllables.append([consonant, "a", True])
+        elif char in table["signs"] and syllables:
+            syllables[-1][1:] = [table["signs"][char], False]
+        elif char == table["virama"] and syllables:
+            syllables[-1][1:] = ["", False]
+        elif char in table["vowels"]:
+            syllables.append(["", table["vowels"][char], False])
+        elif (char in table["nasals"] or char == table["visarga"]) and syllables:
+            # Nasalisation and visarga close the syllable they follow
+            syllables[-1][1:] = [syllables[-1][1] + ("n" if char in table["nasals"] else "h"), False]
+        i += 1
+
+    if table["schwa_deletion"]:
+        # Hindi and Punjabi drop the inherent "a" at the end of a word and
+        # between a vowel and a following consonant-vowel syllable, except
+        # after a consonant cluster ("uttar", "jaypur", but "maharashtra")
+        for i in range(len(syllables) - 1, 0, -1):
+            consonant, vowel, inherent = syllables[i]
+            if not inherent or not syllables[i - 1][1]:
+                continue
+            last = i == len(syllables) - 1
+            if last or (syllables[i + 1][0] and syllables[i + 1][1]):
+                syllables[i][1] = ""
+    return "".join(consonant + vowel for consonant, vowel, _ in syllables)
+
+
+def romanize(text: str) -> str:
+    """Latin approximation of Devanagari, Gurmukhi and Tamil text; other
+    characters pass through unchanged"""
+    text = unicodedata.normalize("NFC", text)
+    out = []
+    word, word_script = [], None
+    for char in text + " ":
+        script = _CHAR_SCRIPT.get(char)
+        if script is not None and script == word_script:
+            word.append(char)
+            continue
+        if word:
+            out.append(_romanize_word("".join(word), _SCRIPTS[word_script]))
+            word = []
+        if script is not None:
+            word, word_script = [char], script
+        else:
+            word_script = None
+            out.append(char)
+    return "".join(out).strip()
+
+
+# Spelling variants that romanized Indian place names drift between, applied
+# in order: aspirates and sibilants first, then long vowels, then voicing.
+# Tamil script writes k/g, ch/j, t/d and p/b with the same letters, so those
+# pairs are merged as well.
+_PHONETIC_RULES = [
+    (re.compile(pattern), replacement) for pattern, replacement in [
+        (r"[^a-z0-9]+", ""),
+        # "C" marks the ch sound; an English c is a k ("Calicut", "Cuttack")
+        (r"chh|ch", "C"),
+        (r"c", "k"),
+        (r"zh", "j"),
+        (r"sh", "s"),
+        (r"([kgjtdpbr])h", r"\1"),
+        (r"q", "k"),
+        (r"x", "ks"),
+        (r"w", "v"),
+        (r"z", "j"),
+        (r"ee|ii", "i"),
+        (r"oo|uu", "u"),
+        (r"aa", "a"),
+        (r"iy", "i"),
+        (r"g", "k"),
+        (r"j", "C"),
+        (r"d", "t"),
+        (r"b", "p"),
+        (r"(.)\1+", r"\1"),
+    ]
+]
+
+
+def phonetic_key(text: str) -> str:
+    """Spelling- and script-insensitive key ("Ludhiyana", "ਲੁਧਿਆਣਾ" and
+    "Ludhiana" all become "lutiana")"""
+    key = romanize(text).lower()
+    for pattern, replacement in _PHONETIC_RULES:
+        key = pattern.sub(replacement, key)
+    return key
+
+
+def _trigrams(key: str, complete: bool = True) -> set:
+    # "$$" anchors the start so short prefixes still have trigrams; a query
+    # is a prefix still being typed, so only indexed names get an end anchor
+    padded = "$$" + key + ("$" if complete else "")
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _last_row(a: str, b: str, limit: int) -> Optional[List[int]]:
+    # Last row of the Levenshtein table: distances from ``a`` to every
+    # prefix of ``b``; None once every entry is known to exceed ``limit``
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        left = i
+        for j, char_b in enumerate(b, 1):
+            diagonal = previous[j - 1] + (char_a != char_b)
+            up = previous[j] + 1
+            left = min(diagonal, up, left + 1)
+            current.append(left)
+        if min(current) > limit:
+            return None
+        previous = current
+    return previous
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """Levenshtein distance, or ``limit + 1`` once it is known to exceed ``limit``"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    row = _last_row(a, b, limit)
+    return limit + 1 if row is None else min(row[-1], limit + 1)
+
+
+def prefix_distance(query: str, key: str, limit: int) -> int:
+    """Edit distance from ``query`` to the closest prefix of ``key`` that is
+    at most one letter shorter or longer, or ``limit + 1`` if above ``limit``"""
+    row = _last_row(query, key[:len(query) + 1], limit)
+    if row is None:
+        return limit + 1
+    # A key shorter than the query is compared whole
+    return min(min(row[min(max(1, len(query) - 1), len(row) - 1):]), limit + 1)
+
+
+def max_typos(query_key: str) -> int:
+    if len(query_key) <= 2:
+        return 0
+    if len(query_key) <= 4:
+        return 1
+    return 2 if len(query_key) <= 8 else 3
+
+
+class LocationSearchIndex:
+    """Trigram index over the phonetic keys of state and district names.
+
+    Every name is indexed together with its parts ("Noida (Gautam Buddha
+    Nagar)" also as "Noida" and "Gautam Buddha Nagar") and its aliases.
+    A query is reduced to the same key, candidates sharing the most
+    trigrams are collected from the posting lists, and those are ranked
+    by edit distance to the typed prefix, then to the whole name. Each
+    result is the best-matching name of one state or district.
+    """
+
+    def __init__(self, states: Sequence[dict], districts: Sequence[dict], aliases: Sequence[dict] = (), max_candidates: int = 64):
+        self.max_candidates = max_candidates
+        state_names = {state["code"]: state["name"] for state in states}
+        # Results, and for each indexed name: (result index, key, matched text)
+        # and the state it belongs to, for state-scoped searches
+        self._results: List[dict] = []
+        self._names: List[tuple] = []
+        self._name_states: List[int] = []
+        self._postings: Dict[str, List[int]] = defaultdict(list)
+        result_index = {}
+
+        for state in states:
+            result_index[("state", state["code"], None)] = len(self._results)
+            self._results.append({"type": "state", "code": state["code"], "name": state["name"]})
+        for district in districts:
+            result_index[("district", district["state_code"], district["code"])] = len(self._results)
+            self._results.append({
+                "type": "district",
+                "code": district["code"],
+                "name": district["name"],
+                "state_code": district["state_code"],
+                "state_name": state_names.get(district["state_code"])
+            })
+
+        for i, result in enumerate(self._results):
+            for name in self._name_variants(result["name"]):
+                self._add_name(i, name)
+        for alias in aliases:
+            key = ("state", alias["state_code"], None) if alias["type"] == "state" else ("district", alias["state_code"], alias["code"])
+            if key in result_index:
+                self._add_name(result_index[key], alias["alias"])
+
+    @staticmethod
+    def _name_variants(name: str) -> List[str]:
+        variants = [name]
+        parts = [part.strip() for part in re.split(r"[()\-]", name) if part.strip()]
+        if len(parts) > 1:
+            variants.extend(parts)
+        return variants
+
+    def _add_name(self, result: int, name: str):
+        key = phonetic_key(name)
+        if not key:
+            return
+        name_id = len(self._names)
+        self._names.append((result, key, name))
+        self._name_states.append(self._results[result].get("state_code", self._results[result]["code"]))
+        for gram in _trigrams(key):
+            self._postings[gram].append(name_id)
+
+    def search(self, query: str, limit: int = 10, state_code: Optional[int] = None) -> List[dict]:
+        query_key = phonetic_key(query)
+        if not query_key:
+            return []
+        grams = _trigrams(query_key, complete=False)
+        shared = defaultdict(int)
+        for gram in grams:
+            for name_id in self._postings.get(gram, ()):
+                shared[name_id] += 1
+        # Each edit changes at most three trigrams, so a name within the
+        # allowed typos shares at least this many with the query
+        typos = max_typos(query_key)
+        min_shared = len(grams) - 3 * typos
+        # Scope to the state before the cap, so other states' names cannot
+        # crowd out its matches
+        candidates = sorted(
+            (
+                name_id for name_id, count in shared.items()
+                if count >= min_shared and (state_code is None or self._name_states[name_id] == state_code)
+            ),
+            key=shared.__getitem__, reverse=True
+        )[:self.max_candidates]
+
+        best: Dict[int, tuple] = {}
+        for name_id in candidates:
+            result, key, name = self._names[name_id]
+            # Autocomplete: compare with the prefix the user has typed so far
+            # (allowing for a missing or extra letter), then the whole name
+            distance = prefix_distance(query_key, key, typos)
+            if distance > typos:
+                continue
+            rank = (distance, edit_distance(query_key, key, len(key) + len(query_key)), len(key), name)
+            if result not in best or rank < best[result]:
+                best[result] = rank
+
+        ordered = sorted(best.items(), key=lambda item: item[1])[:limit]
+        return [
+            {**self._results[result], "matched": rank[3], "distance": rank[0]}
+            for result, rank in ordered
+        ]
@@ -0,0 +1,82 @@
+"""
+Krishi Mitra - Location Store
+Indexed in-memory view of the states and districts reference data
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+from geo_index import DistrictSpatialIndex
+
+
+class LocationStore:
+    """States and districts indexed for constant-time lookups.
+
+    Everything is built once from the raw reference lists: districts are
+    grouped by state and sorted by name, and the response lists for the
+    location routes are prepared up front. The returned lists are shared
+    between requests and must be treated as read-only.
+    """
+
+    def __init__(self, states: List[dict], districts: List[dict]):
+        self._districts_by_state: Dict[int, List[dict]] = {}
+        # District codes are only unique within a state
+        self._districts_by_code: Dict[Tuple[int, int], dict] = {}
+
+        for district in sorted(districts, key=lambda x: x["name"]):
+            record = {
+                "code": district["code"],
+                "name": district["name"],
+                "state_code": district["state_code"],
+                "lat": district["lat"],
+                "lon": district["lon"]
+            }
+            self._districts_by_state.setdefault(record["state_code"], []).append(record)
+            self._districts_by_code[(record["state_code"], record["code"])] = record
+
+        self._states = [
+            {
+                "code": state["code"],
+                "name": state["name"],
+                "districts_count": len(self._districts_by_state.get(state["code"], ()))
+            }
+            for state in sorted(states, key=lambda x: x["name"])
+        ]
+        self._states_by_code = {state["code"]: state for state in self._states}
+        self._spatial_index = DistrictSpatialIndex(list(self._districts_by_code.values()))
+
+    @property
+    def states_count(self) -> int:
+        return len(self._states)
+
+    @property
+    def districts_count(self) -> int:
+        return len(self._districts_by_code)
+
+    def states(self) -> List[dict]:
+        """All states sorted by name, with district counts"""
+        return self._states
+
+    def state(self, state_code: int) -> Optional[dict]:
+        return self._states_by_code.get(state_code)
+
+    def districts(self, state_code: int) -> List[dict]:
+        """Districts of a state sorted by name (empty for unknown states)"""
+        return self._districts_by_state.get(state_code, [])
+
+    def district(self, state_code: int, district_code: int) -> Optional[dict]:
+        return self._districts_by_code.get((state_code, district_code))
+
+    def nearest_district(self, lat: float, lon: float, max_distance_km: Optional[float] = None) -> Optional[dict]:
+        """Closest district to a GPS point, or None if none is within range"""
+        match = self._spatial_index.nearest(lat, lon)
+        if match is None:
+            return None
+        district, distance_km = match
+        if max_distance_km is not None and distance_km > max_distance_km:
+            return None
+        state = self._states_by_code.get(district["state_code"])
+        return {
+            **district,
+            "state_name": state["name"] if state else None,
+            "distance_km": round(distance_km, 3)
+        }
@@ -3,24 +3,86 @@ Krishi Mitra - FastAPI Backend
 Agriculture Advisory Platform API
 """
 
-from fastapi import FastAPI, HTTPException, Depends, status
+from fastapi import FastAPI, HTTPException, Depends, Query, Request, status
+from fastapi.encoders import jsonable_encoder
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from motor.motor_asyncio import AsyncIOMotorClient
-from pydantic import BaseModel, EmailStr, Field
-from typing import List, Optional
+from pydantic import BaseModel, EmailStr, Field, StringConstraints, field_validator
+from typing import Annotated, List, Optional
 from datetime import datetime, timedelta
 import os
+import sys
 from passlib.context import CryptContext
 import jwt
 from bson import ObjectId
+from pymongo import ReturnDocument
+from pymongo.errors import BulkWriteError
+import asyncio
+import csv
+import hashlib
+import json
+import time
+
+from compression import CompressionMiddleware, compressed_cache
+from crop_scoring import CropScorer, KHARIF, RABI, ZAID
+from db_pool_monitor import PoolMonitor
+from disease_inference import IMAGE_CONTENT_TYPES, DiagnosisUnavailable, ImageTooLarge, create_disease_service, read_upload
+from disease_model import InvalidImage
+from errors import RetryLater, retry_later_handler
+from fast_json import FastJSONResponse
+from geo_index import DistrictSpatialIndex
+from http_caching import add_validators, cache_control, conditional_response, not_modified, reference_cache_control, reference_etag
+from listings import CATEGORIES, DEFAULT_PAGE_SIZE, LISTING_INDEXES, MAX_PAGE_SIZE, SEASONS, SORTS, STATUSES, crop_key, encode_cursor, parse_fields, public_listing, search_projection, search_query
+from location_search import LocationSearchIndex
+from metrics import MetricsMiddleware, MongoCommandMetrics, monitor_event_loop_lag, operation_duration_seconds, render_metrics
+from password_hasher import PasswordHasher
+from rate_limit import AuthAdmission, client_ip
+from recommendation_table import CachedPayload, RecommendationTable
+from seed_reference_data import REFERENCE_VERSION_ID, seed_reference_data
+from ttl_cache import TTLCache
+from weather import WeatherUnavailable, create_weather_service
+
+# Shared reference data lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from reference_data import load_location_aliases
 
 # Configuration
 MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
 DATABASE_NAME = "krishi_mitra"
+# Connection pool settings (see the Motor/PyMongo MongoClient options)
+MONGODB_MAX_POOL_SIZE = int(os.getenv("MONGODB_MAX_POOL_SIZE", "100"))
+MONGODB_MIN_POOL_SIZE = int(os.getenv("MONGODB_MIN_POOL_SIZE", "0"))
+MONGODB_MAX_IDLE_TIME_MS = int(os.getenv("MONGODB_MAX_IDLE_TIME_MS", "0")) or None
+MONGODB_WAIT_QUEUE_TIMEOUT_MS = int(os.getenv("MONGODB_WAIT_QUEUE_TIMEOUT_MS", "0")) or None
+MONGODB_SERVER_SELECTION_TIMEOUT_MS = int(os.getenv("MONGODB_SERVER_SELECTION_TIMEOUT_MS", "30000"))
+MONGODB_CONNECT_TIMEOUT_MS = int(os.getenv("MONGODB_CONNECT_TIMEOUT_MS", "20000"))
+MONGODB_SOCKET_TIMEOUT_MS = int(os.getenv("MONGODB_SOCKET_TIMEOUT_MS", "0")) or None
+MONGODB_READ_PREFERENCE = os.getenv("MONGODB_READ_PREFERENCE", "primary")
+# /api/health/deep reports 503 when a ping round trip is slower than this
+HEALTH_MAX_DB_LATENCY_MS = float(os.getenv("HEALTH_MAX_DB_LATENCY_MS", "250"))
+# A ping still outstanding after this many times the limit counts as failed,
+# so an unreachable server gives a quick 503 instead of waiting out server
+# selection
+HEALTH_PING_TIMEOUT_FACTOR = 4
 SECRET_KEY = os.getenv("SECRET_KEY", "your-secret-key-change-in-production")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60 * 24 * 7  # 7 days
+SEED_ON_STARTUP = os.getenv("SEED_ON_STARTUP", "false").lower() == "true"
+# Upper bound on how stale the cached state list may get when another
+# process (e.g. an admin import) changes the location collections
+LOCATION_CATALOG_TTL_SECONDS = int(os.getenv("LOCATION_CATALOG_TTL_SECONDS", "300"))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", "10000"))
+USER_CACHE_TTL_SECONDS = int(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "10000"))
+MAX_NEAREST_BATCH_SIZE = 10000
+MAX_CROP_BATCH_SIZE = 10000
+MAX_BULK_REGISTER_ROWS = 10000
+# Comma-separated emails of the accounts allowed to bulk register farmers
+ADMIN_EMAILS = {email.strip().lower() for email in os.getenv("ADMIN_EMAILS", "").split(",") if email.strip()}
+# Rows validated and hashed before each ordered insert_many
+BULK_REGISTER_BATCH_SIZE = int(os.getenv("BULK_REGISTER_BATCH_SIZE", "500"))
 
 # Initialize FastAPI
 app = FastAPI(
@@ -38,13 +100,40 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# gzip / brotli for JSON responses; static bodies are compressed once
+app.add_middleware(CompressionMiddleware)
+
+# Per-route request counts and latency histograms, served from /metrics
+app.add_middleware(MetricsMiddleware)
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+password_hasher = PasswordHasher(pwd_context)
 security = HTTPBearer()
 
+
+# Overloaded password pool (503), auth rate limits (429) and a full
+# diagnosis queue (503) all answer with Retry-After
+app.add_exception_handler(RetryLater, retry_later_handler)
+
+
+# Per-IP and per-username budgets for the bcrypt-bound auth routes
+auth_admission = AuthAdmission()
+
+
 # MongoDB client
 client = None
 db = None
+pool_monitor = PoolMonitor()
+event_loop_lag_task = None
+
+# Authenticated user documents by user id, so protected routes skip the
+# users lookup on repeat requests
+user_cache = TTLCache(maxsize=USER_CACHE_SIZE, ttl_seconds=USER_CACHE_TTL_SECONDS)
+
+# Verified JWT payloads by SHA-256 of the token, each kept until the
+# token's own exp, so repeat requests skip signature verification
+token_cache = TTLCache(maxsize=TOKEN_CACHE_SIZE, ttl_seconds=ACCESS_TOKEN_EXPIRE_MINUTES * 60)
 
 
 # Pydantic Models
@@ -80,6 +169,31 @@ class DistrictResponse(BaseModel):
     lon: float
 
 
+class NearestDistrictResponse(DistrictResponse):
+    state_name: Optional[str] = None
+    distance_km: float
+
+
+class LocationSearchResult(BaseModel):
+    type: str
+    code: int
+    name: str
+    state_code: Optional[int] = None
+    state_name: Optional[str] = None
+    matched: str
+    distance: int
+
+
+class LocationPoint(BaseModel):
+    lat: float = Field(..., ge=-90, le=90)
+    lon: float = Field(..., ge=-180, le=180)
+
+
+class NearestDistrictBatchRequest(BaseModel):
+    points: List[LocationPoint] = Field(..., max_length=MAX_NEAREST_BATCH_SIZE)
+    max_distance_km: Optional[float] = Field(None, gt=0)
+
+
 class CropRecommendationRequest(BaseModel):
     state_code: int
     district_code: int
@@ -88,6 +202,11 @@ class CropRecommendationRequest(BaseModel):
     lon: float
 
 
+class BatchCropRecommendationRequest(BaseModel):
+    rows: List[CropRecommendationRequest] = Field(..., max_length=MAX_CROP_BATCH_SIZE)
+    top_k: Optional[int] = Field(None, ge=1)
+
+
 class CropResponse(BaseModel):
     crop_name: str
     suitability_score: int
@@ -97,12 +216,69 @@ class CropResponse(BaseModel):
     soil_type: List[str]
     best_practices: List[str]
 
+class DiseasePrediction(BaseModel):
+    disease: str
+    name: str
+    confidence: float
+
+
+class DiseaseDiagnosisResponse(DiseasePrediction):
+    healthy: bool
+    predictions: List[DiseasePrediction]
+    model: str
+
+
+class ListingCreate(BaseModel):
+    category: str = Field(..., pattern=f"^({'|'.join(CATEGORIES)})$")
+    # Stripped before the length check, so a blank crop name is rejected
+    crop: Annotated[str, StringConstraints(strip_whitespace=True, min_length=2, max_length=60)]
+    variety: Optional[str] = Field(None, max_length=60)
+    quantity_quintals: float = Field(..., gt=0)
+    price_per_quintal: int = Field(..., gt=0)
+    harvest_month: Optional[str] = Field(None, pattern=r"^[0-9]{4}-[0-9]{2}$")
+    season: Optional[str] = Field(None, pattern=f"^({'|'.join(SEASONS)})$")
+    quality: Optional[str] = Field(None, max_length=200)
+    state_code: int
+    district_code: int
+    collection_point: Optional[str] = Field(None, max_length=200)
+    details: Optional[str] = Field(None, max_length=2000)
+
+
+class ListingUpdate(BaseModel):
+    variety: Optional[str] = Field(None, max_length=60)
+    quantity_quintals: Optional[float] = Field(None, gt=0)
+    price_per_quintal: Optional[int] = Field(None, gt=0)
+    harvest_month: Optional[str] = Field(None, pattern=r"^[0-9]{4}-[0-9]{2}$")
+    quality: Optional[str] = Field(None, max_length=200)
+    collection_point: Optional[str] = Field(None, max_length=200)
+    details: Optional[str] = Field(None, max_length=2000)
+    status: Optional[str] = Field(None, pattern=f"^({'|'.join(STATUSES)})$")
+
+    @field_validator("quantity_quintals", "price_per_quintal", "status")
+    @classmethod
+    def not_null(cls, value):
+        # These may be left out but not cleared: searches sort and page on price
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
 
 # Database Connection
 @app.on_event("startup")
 async def startup_db_client():
-    global client, db
-    client = AsyncIOMotorClient(MONGODB_URL)
+    global client, db, event_loop_lag_task
+    client = AsyncIOMotorClient(
+        MONGODB_URL,
+        maxPoolSize=MONGODB_MAX_POOL_SIZE,
+        minPoolSize=MONGODB_MIN_POOL_SIZE,
+        maxIdleTimeMS=MONGODB_MAX_IDLE_TIME_MS,
+        waitQueueTimeoutMS=MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+        serverSelectionTimeoutMS=MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        connectTimeoutMS=MONGODB_CONNECT_TIMEOUT_MS,
+        socketTimeoutMS=MONGODB_SOCKET_TIMEOUT_MS,
+        readPreference=MONGODB_READ_PREFERENCE,
+        event_listeners=[pool_monitor, MongoCommandMetrics()]
+    )
     db = client[DATABASE_NAME]
     
     # Create indexes
@@ -110,10 +286,15 @@ async def startup_db_client():
     await db.users.create_index("mobile", unique=True)
     await db.states.create_index("code", unique=True)
     await db.districts.create_index([("state_code", 1), ("code", 1)])
+    await db.listings.create_indexes(LISTING_INDEXES)
     
-    # Initialize data if empty
-    await initialize_data()
+    # Seeding normally runs once per deployment via seed_reference_data.py;
+    # enable this for single-process development setups
+    if SEED_ON_STARTUP:
+        await initialize_data()
     
+    await disease_service.start()
+    event_loop_lag_task = asyncio.create_task(monitor_event_loop_lag())
     print(f"Connected to MongoDB: {DATABASE_NAME}")
 
 
@@ -123,33 +304,73 @@ async def shutdown_db_client():
     if client:
         client.close()
         print("MongoDB connection closed")
+    if event_loop_lag_task:
+        event_loop_lag_task.cancel()
+    password_hasher.shutdown()
+    disease_service.shutdown()
+
+
+# Weather
+# Mock weather data - In production, set WEATHER_DATA_FILE or plug in a
+# provider backed by a weather API
+MOCK_WEATHER = {
+    "temperature": 28,
+    "humidity": 65,
+    "rainfall": 15,
+    "wind_speed": 12,
+    "warning": "Moderate rainfall expected in next 3 days. Good for Kharif sowing.",
+    "forecast": [
+        {"day": "Today", "condition": "Partly Cloudy", "temp_max": 32, "temp_min": 24, "rain_chance": 30},
+        {"day": "Tomorrow", "condition": "Light Rain", "temp_max": 30, "temp_min": 23, "rain_chance": 60},
+        {"day": "Day 3", "condition": "Cloudy", "temp_max": 29, "temp_min": 22, "rain_chance": 40}
+    ]
+}
+
+weather_service = create_weather_service(MOCK_WEATHER)
+
+# Leaf photo diagnosis: decoding process pool plus micro-batched model calls
+disease_service = create_disease_service()
 
 
 # Helper Functions
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    with operation_duration_seconds.time("password_verify"):
+        return await password_hasher.verify(plain_password, hashed_password)
 
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    with operation_duration_seconds.time("password_hash"):
+        return await password_hasher.hash(password)
 
 
 def create_access_token(data: dict) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
     to_encode.update({"exp": expire})
-    encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
+    with operation_duration_seconds.time("jwt_encode"):
+        encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
 
 def decode_token(token: str) -> dict:
-    try:
-        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    # The digest keeps raw bearer tokens out of memory dumps of the cache
+    key = hashlib.sha256(token.encode()).digest()
+    payload = token_cache.get(key)
+    if payload is not None:
         return payload
+    
+    try:
+        with operation_duration_seconds.time("jwt_decode"):
+            payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="Token has expired")
-    except jwt.JWTError:
+    except jwt.InvalidTokenError:
         raise HTTPException(status_code=401, detail="Invalid token")
+    
+    expires_in = payload["exp"] - time.time() if "exp" in payload else None
+    if expires_in is None or expires_in > 0:
+        token_cache.set(key, payload, ttl_seconds=expires_in)
+    return payload
 
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
@@ -159,335 +380,235 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     if not user_id:
         raise HTTPException(status_code=401, detail="Invalid authentication credentials")
     
-    user = await db.users.find_one({"_id": ObjectId(user_id)})
-    if not user:
-        raise HTTPException(status_code=401, detail="User not found")
+    user = user_cache.get(user_id)
+    if user is None:
+        user = await db.users.find_one({"_id": ObjectId(user_id)})
+        if not user:
+            raise HTTPException(status_code=401, detail="User not found")
+        user_cache.set(user_id, user)
     
     return user
 
 
+async def get_admin_user(user = Depends(get_current_user)):
+    if user.get("email", "").lower() not in ADMIN_EMAILS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user
+
+
+# Location Catalog
+class LocationCatalog:
+    """In-process cache of the location reference data.
+
+    Holds the state list with district counts, built with a single
+    aggregation, a spatial index over district centroids, the name search
+    index and the precomputed crop recommendation table. All are reused
+    until invalidated (after seeding or an admin import) or until the TTL
+    expires.
+    """
+
+    def __init__(self, ttl_seconds: int):
+        self.ttl_seconds = ttl_seconds
+        self._states: Optional[List[dict]] = None
+        self._state_names: dict = {}
+        self._district_keys: set = set()
+        self._district_index: Optional[DistrictSpatialIndex] = None
+        self._search_index: Optional[LocationSearchIndex] = None
+        self._recommendations: Optional[RecommendationTable] = None
+        self._version: Optional[str] = None
+        self._loaded_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self):
+        self._states = None
+        self._district_index = None
+        self._search_index = None
+        self._recommendations = None
+
+    def _is_fresh(self) -> bool:
+        return self._states is not None and time.monotonic() - self._loaded_at < self.ttl_seconds
+
+    async def _ensure_loaded(self):
+        if self._is_fresh():
+            return
+        async with self._lock:
+            # Another request may have rebuilt the catalog while we waited
+            if self._is_fresh():
+                return
+            states = await self._load_states()
+            districts = await db.districts.find(
+                {}, {"_id": 0, "code": 1, "name": 1, "state_code": 1, "lat": 1, "lon": 1}
+            ).to_list(length=None)
+            self._state_names = {state["code"]: state["name"] for state in states}
+            self._district_keys = {(district["state_code"], district["code"]) for district in districts}
+            self._district_index = DistrictSpatialIndex(districts)
+            self._search_index = LocationSearchIndex(states, districts, load_location_aliases())
+            self._recommendations = RecommendationTable(
+                list(SEASON_PREFERRED_CROPS), crop_scorer.recommend, default_season=ZAID
+            )
+            # Recorded by seed_reference_data; None for unseeded databases
+            meta = await db.meta.find_one({"_id": REFERENCE_VERSION_ID})
+            self._version = meta.get("version") if meta else None
+            self._states = states
+            self._loaded_at = time.monotonic()
+
+    async def get_states(self) -> List[dict]:
+        await self._ensure_loaded()
+        return self._states
+
+    async def has_district(self, state_code: int, district_code: int) -> bool:
+        await self._ensure_loaded()
+        return (state_code, district_code) in self._district_keys
+
+    async def search(self, query: str, limit: int, state_code: Optional[int] = None) -> List[dict]:
+        await self._ensure_loaded()
+        return self._search_index.search(query, limit, state_code)
+
+    async def etag(self, *parts) -> Optional[str]:
+        """ETag for a location resource, or None if the data is unversioned"""
+        await self._ensure_loaded()
+        return reference_etag(self._version, *parts) if self._version else None
+
+    async def crop_recommendations(self, season_id: int) -> CachedPayload:
+        await self._ensure_loaded()
+        return self._recommendations.get(season_id)
+
+    async def nearest_district(self, lat: float, lon: float, max_distance_km: Optional[float] = None) -> Optional[dict]:
+        results = await self.nearest_districts([(lat, lon)], max_distance_km)
+        return results[0]
+
+    async def nearest_districts(self, points: List[tuple], max_distance_km: Optional[float] = None) -> List[Optional[dict]]:
+        await self._ensure_loaded()
+        results = []
+        for match in self._district_index.nearest_many(points):
+            if match is None or (max_distance_km is not None and match[1] > max_distance_km):
+                results.append(None)
+                continue
+            district, distance_km = match
+            results.append({
+                **district,
+                "state_name": self._state_names.get(district["state_code"]),
+                "distance_km": round(distance_km, 3)
+            })
+        return results
+
+    async def _load_states(self) -> List[dict]:
+        pipeline = [
+            {"$lookup": {
+                "from": "districts",
+                "localField": "code",
+                "foreignField": "state_code",
+                "as": "districts"
+            }},
+            {"$project": {
+                "_id": 0,
+                "code": 1,
+                "name": 1,
+                "districts_count": {"$size": "$districts"}
+            }},
+            {"$sort": {"name": 1}}
+        ]
+        return [state async for state in db.states.aggregate(pipeline)]
+
+
+location_catalog = LocationCatalog(LOCATION_CATALOG_TTL_SECONDS)
+
+
+# Crop Catalog
+# Mock crop data - In production, this would use ML model or external API
+CROPS_DATA = [
+    {
+        "crop_name": "Rice",
+        "suitability_score": 92,
+        "avg_profit": 45000,
+        "duration_days": 120,
+        "water_requirement": "High",
+        "soil_type": ["Loamy", "Clay"],
+        "best_practices": ["Direct seeding", "SRI method", "Proper water management"]
+    },
+    {
+        "crop_name": "Wheat",
+        "suitability_score": 88,
+        "avg_profit": 38000,
+        "duration_days": 110,
+        "water_requirement": "Medium",
+        "soil_type": ["Loamy", "Sandy Loam"],
+        "best_practices": ["Timely sowing", "Seed treatment", "Balanced fertilization"]
+    },
+    {
+        "crop_name": "Cotton",
+        "suitability_score": 85,
+        "avg_profit": 52000,
+        "duration_days": 150,
+        "water_requirement": "Medium",
+        "soil_type": ["Black", "Loamy"],
+        "best_practices": ["Integrated pest management", "Proper spacing", "Drip irrigation"]
+    },
+    {
+        "crop_name": "Sugarcane",
+        "suitability_score": 82,
+        "avg_profit": 65000,
+        "duration_days": 365,
+        "water_requirement": "Very High",
+        "soil_type": ["Loamy", "Clay Loam"],
+        "best_practices": ["Trench planting", "Inter-cropping", "Drip irrigation"]
+    },
+    {
+        "crop_name": "Maize",
+        "suitability_score": 80,
+        "avg_profit": 32000,
+        "duration_days": 90,
+        "water_requirement": "Medium",
+        "soil_type": ["Loamy", "Sandy Loam"],
+        "best_practices": ["Hybrid seeds", "Ridge and furrow planting", "Mulching"]
+    },
+    {
+        "crop_name": "Pulses (Chickpea)",
+        "suitability_score": 78,
+        "avg_profit": 35000,
+        "duration_days": 100,
+        "water_requirement": "Low",
+        "soil_type": ["Loamy", "Clay Loam"],
+        "best_practices": ["Seed inoculation", "Wilt management", "Timely harvesting"]
+    },
+    {
+        "crop_name": "Soybean",
+        "suitability_score": 75,
+        "avg_profit": 30000,
+        "duration_days": 95,
+        "water_requirement": "Medium",
+        "soil_type": ["Loamy", "Clay Loam"],
+        "best_practices": ["Certified seeds", "Rhizobium treatment", "Weed control"]
+    },
+    {
+        "crop_name": "Groundnut",
+        "suitability_score": 72,
+        "avg_profit": 42000,
+        "duration_days": 110,
+        "water_requirement": "Low-Medium",
+        "soil_type": ["Sandy Loam", "Red Loam"],
+        "best_practices": ["Seed treatment", "Gypsum application", "Pod maturity check"]
+    }
+]
+
+# Season-based preference (simplified logic): these crops get a score boost
+SEASON_PREFERRED_CROPS = {
+    KHARIF: ["Rice", "Cotton", "Soybean", "Maize", "Groundnut"],
+    RABI: ["Wheat", "Pulses (Chickpea)", "Maize"],
+    ZAID: ["Maize", "Groundnut", "Rice"]  # Summer/Zaid
+}
+
+crop_scorer = CropScorer(CROPS_DATA, SEASON_PREFERRED_CROPS, default_season=ZAID)
+
+
 # Initialize Database with Indian States and Districts
 async def initialize_data():
-    """Initialize database with all Indian states and major districts"""
-    
-    # Check if data already exists
-    states_count = await db.states.count_documents({})
-    if states_count > 0:
-        return
-    
-    print("Initializing Indian states and districts data...")
-    
-    # All Indian States with LGD codes
-    states_data = [
-        {"code": 1, "name": "Jammu and Kashmir"},
-        {"code": 2, "name": "Himachal Pradesh"},
-        {"code": 3, "name": "Punjab"},
-        {"code": 4, "name": "Chandigarh"},
-        {"code": 5, "name": "Uttarakhand"},
-        {"code": 6, "name": "Haryana"},
-        {"code": 7, "name": "Delhi"},
-        {"code": 8, "name": "Rajasthan"},
-        {"code": 9, "name": "Uttar Pradesh"},
-        {"code": 10, "name": "Bihar"},
-        {"code": 11, "name": "Sikkim"},
-        {"code": 12, "name": "Arunachal Pradesh"},
-        {"code": 13, "name": "Nagaland"},
-        {"code": 14, "name": "Manipur"},
-        {"code": 15, "name": "Mizoram"},
-        {"code": 16, "name": "Tripura"},
-        {"code": 17, "name": "Meghalaya"},
-        {"code": 18, "name": "Assam"},
-        {"code": 19, "name": "West Bengal"},
-        {"code": 20, "name": "Jharkhand"},
-        {"code": 21, "name": "Odisha"},
-        {"code": 22, "name": "Chhattisgarh"},
-        {"code": 23, "name": "Madhya Pradesh"},
-        {"code": 24, "name": "Gujarat"},
-        {"code": 25, "name": "Daman and Diu"},
-        {"code": 26, "name": "Dadra and Nagar Haveli"},
-        {"code": 27, "name": "Maharashtra"},
-        {"code": 28, "name": "Andhra Pradesh"},
-        {"code": 29, "name": "Karnataka"},
-        {"code": 30, "name": "Goa"},
-        {"code": 31, "name": "Lakshadweep"},
-        {"code": 32, "name": "Kerala"},
-        {"code": 33, "name": "Tamil Nadu"},
-        {"code": 34, "name": "Puducherry"},
-        {"code": 35, "name": "Andaman and Nicobar Islands"},
-        {"code": 36, "name": "Telangana"},
-        {"code": 37, "name": "Ladakh"}
-    ]
-    
-    await db.states.insert_many(states_data)
-    
-    # Major districts data (comprehensive list)
-    districts_data = []
-    
-    # Uttar Pradesh (9) - Top 20 districts
-    up_districts = [
-        {"code": 151, "name": "Lucknow", "state_code": 9, "lat": 26.8467, "lon": 80.9462},
-        {"code": 152, "name": "Kanpur Nagar", "state_code": 9, "lat": 26.4499, "lon": 80.3319},
-        {"code": 153, "name": "Agra", "state_code": 9, "lat": 27.1767, "lon": 78.0081},
-        {"code": 154, "name": "Varanasi", "state_code": 9, "lat": 25.3176, "lon": 82.9739},
-        {"code": 155, "name": "Prayagraj", "state_code": 9, "lat": 25.4358, "lon": 81.8463},
-        {"code": 156, "name": "Ghaziabad", "state_code": 9, "lat": 28.6692, "lon": 77.4538},
-        {"code": 157, "name": "Meerut", "state_code": 9, "lat": 28.9845, "lon": 77.7064},
-        {"code": 158, "name": "Bareilly", "state_code": 9, "lat": 28.3670, "lon": 79.4304},
-        {"code": 159, "name": "Aligarh", "state_code": 9, "lat": 27.8974, "lon": 78.0880},
-        {"code": 160, "name": "Moradabad", "state_code": 9, "lat": 28.8389, "lon": 78.7768},
-        {"code": 161, "name": "Gorakhpur", "state_code": 9, "lat": 26.7606, "lon": 83.3732},
-        {"code": 162, "name": "Saharanpur", "state_code": 9, "lat": 29.9680, "lon": 77.5460},
-        {"code": 163, "name": "Noida (Gautam Buddha Nagar)", "state_code": 9, "lat": 28.5355, "lon": 77.3910},
-        {"code": 164, "name": "Jhansi", "state_code": 9, "lat": 25.4484, "lon": 78.5685},
-        {"code": 165, "name": "Mathura", "state_code": 9, "lat": 27.4924, "lon": 77.6737},
-        {"code": 166, "name": "Firozabad", "state_code": 9, "lat": 27.1591, "lon": 78.3957},
-        {"code": 167, "name": "Shahjahanpur", "state_code": 9, "lat": 27.8829, "lon": 79.9119},
-        {"code": 168, "name": "Rampur", "state_code": 9, "lat": 28.8145, "lon": 79.0254},
-        {"code": 169, "name": "Muzaffarnagar", "state_code": 9, "lat": 29.4727, "lon": 77.7085},
-        {"code": 170, "name": "Azamgarh", "state_code": 9, "lat": 26.0686, "lon": 83.1840}
-    ]
-    districts_data.extend(up_districts)
-    
-    # Gujarat (24) - Top 15 districts
-    gujarat_districts = [
-        {"code": 438, "name": "Ahmedabad", "state_code": 24, "lat": 23.0225, "lon": 72.5714},
-        {"code": 439, "name": "Surat", "state_code": 24, "lat": 21.1702, "lon": 72.8311},
-        {"code": 440, "name": "Vadodara", "state_code": 24, "lat": 22.3072, "lon": 73.1812},
-        {"code": 441, "name": "Rajkot", "state_code": 24, "lat": 22.3039, "lon": 70.8022},
-        {"code": 442, "name": "Bhavnagar", "state_code": 24, "lat": 21.7645, "lon": 72.1519},
-        {"code": 443, "name": "Jamnagar", "state_code": 24, "lat": 22.4707, "lon": 70.0577},
-        {"code": 444, "name": "Junagadh", "state_code": 24, "lat": 21.5222, "lon": 70.4579},
-        {"code": 445, "name": "Gandhinagar", "state_code": 24, "lat": 23.2156, "lon": 72.6369},
-        {"code": 446, "name": "Anand", "state_code": 24, "lat": 22.5645, "lon": 72.9289},
-        {"code": 447, "name": "Mehsana", "state_code": 24, "lat": 23.5880, "lon": 72.3693},
-        {"code": 448, "name": "Bharuch", "state_code": 24, "lat": 21.7051, "lon": 72.9959},
-        {"code": 449, "name": "Valsad", "state_code": 24, "lat": 20.5992, "lon": 72.9342},
-        {"code": 450, "name": "Navsari", "state_code": 24, "lat": 20.9500, "lon": 72.9200},
-        {"code": 451, "name": "Patan", "state_code": 24, "lat": 23.8502, "lon": 72.1211},
-        {"code": 452, "name": "Kutch", "state_code": 24, "lat": 23.7337, "lon": 69.8597}
-    ]
-    districts_data.extend(gujarat_districts)
-    
-    # Maharashtra (27) - Top 20 districts
-    maha_districts = [
-        {"code": 490, "name": "Mumbai City", "state_code": 27, "lat": 18.9388, "lon": 72.8354},
-        {"code": 491, "name": "Mumbai Suburban", "state_code": 27, "lat": 19.0760, "lon": 72.8777},
-        {"code": 492, "name": "Pune", "state_code": 27, "lat": 18.5204, "lon": 73.8567},
-        {"code": 493, "name": "Nagpur", "state_code": 27, "lat": 21.1458, "lon": 79.0882},
-        {"code": 494, "name": "Thane", "state_code": 27, "lat": 19.2183, "lon": 72.9781},
-        {"code": 495, "name": "Nashik", "state_code": 27, "lat": 19.9975, "lon": 73.7898},
-        {"code": 496, "name": "Aurangabad", "state_code": 27, "lat": 19.8762, "lon": 75.3433},
-        {"code": 497, "name": "Solapur", "state_code": 27, "lat": 17.6599, "lon": 75.9064},
-        {"code": 498, "name": "Kolhapur", "state_code": 27, "lat": 16.7050, "lon": 74.2433},
-        {"code": 499, "name": "Amravati", "state_code": 27, "lat": 20.9374, "lon": 77.7796},
-        {"code": 500, "name": "Nanded", "state_code": 27, "lat": 19.1383, "lon": 77.3210},
-        {"code": 501, "name": "Jalgaon", "state_code": 27, "lat": 21.0077, "lon": 75.5626},
-        {"code": 502, "name": "Sangli", "state_code": 27, "lat": 16.8544, "lon": 74.5678},
-        {"code": 503, "name": "Akola", "state_code": 27, "lat": 20.7002, "lon": 77.0082},
-        {"code": 504, "name": "Ahmednagar", "state_code": 27, "lat": 19.0948, "lon": 74.7480},
-        {"code": 505, "name": "Satara", "state_code": 27, "lat": 17.6805, "lon": 74.0183},
-        {"code": 506, "name": "Raigad", "state_code": 27, "lat": 18.5074, "lon": 73.1789},
-        {"code": 507, "name": "Ratnagiri", "state_code": 27, "lat": 16.9944, "lon": 73.3000},
-        {"code": 508, "name": "Beed", "state_code": 27, "lat": 18.9894, "lon": 75.7607},
-        {"code": 509, "name": "Latur", "state_code": 27, "lat": 18.3984, "lon": 76.5604}
-    ]
-    districts_data.extend(maha_districts)
-    
-    # Punjab (3) - All major districts
-    punjab_districts = [
-        {"code": 41, "name": "Amritsar", "state_code": 3, "lat": 31.6340, "lon": 74.8723},
-        {"code": 42, "name": "Ludhiana", "state_code": 3, "lat": 30.9010, "lon": 75.8573},
-        {"code": 43, "name": "Jalandhar", "state_code": 3, "lat": 31.3260, "lon": 75.5762},
-        {"code": 44, "name": "Patiala", "state_code": 3, "lat": 30.3398, "lon": 76.3869},
-        {"code": 45, "name": "Bathinda", "state_code": 3, "lat": 30.2110, "lon": 74.9455},
-        {"code": 46, "name": "Mohali", "state_code": 3, "lat": 30.7046, "lon": 76.7179},
-        {"code": 47, "name": "Hoshiarpur", "state_code": 3, "lat": 31.5346, "lon": 75.9119},
-        {"code": 48, "name": "Gurdaspur", "state_code": 3, "lat": 32.0408, "lon": 75.4019},
-        {"code": 49, "name": "Ferozepur", "state_code": 3, "lat": 30.9254, "lon": 74.6116},
-        {"code": 50, "name": "Sangrur", "state_code": 3, "lat": 30.2453, "lon": 75.8420},
-        {"code": 51, "name": "Moga", "state_code": 3, "lat": 30.8159, "lon": 75.1705},
-        {"code": 52, "name": "Kapurthala", "state_code": 3, "lat": 31.3800, "lon": 75.3800}
-    ]
-    districts_data.extend(punjab_districts)
-    
-    # Haryana (6) - All districts
-    haryana_districts = [
-        {"code": 85, "name": "Faridabad", "state_code": 6, "lat": 28.4089, "lon": 77.3178},
-        {"code": 86, "name": "Gurugram", "state_code": 6, "lat": 28.4595, "lon": 77.0266},
-        {"code": 87, "name": "Hisar", "state_code": 6, "lat": 29.1492, "lon": 75.7217},
-        {"code": 88, "name": "Rohtak", "state_code": 6, "lat": 28.8955, "lon": 76.6066},
-        {"code": 89, "name": "Panipat", "state_code": 6, "lat": 29.3909, "lon": 76.9635},
-        {"code": 90, "name": "Karnal", "state_code": 6, "lat": 29.6857, "lon": 76.9905},
-        {"code": 91, "name": "Ambala", "state_code": 6, "lat": 30.3782, "lon": 76.7767},
-        {"code": 92, "name": "Sonipat", "state_code": 6, "lat": 28.9931, "lon": 77.0151},
-        {"code": 93, "name": "Yamuna Nagar", "state_code": 6, "lat": 30.1290, "lon": 77.2674},
-        {"code": 94, "name": "Bhiwani", "state_code": 6, "lat": 28.7930, "lon": 76.1395}
-    ]
-    districts_data.extend(haryana_districts)
-    
-    # Karnataka (29) - Top 15 districts
-    karnataka_districts = [
-        {"code": 537, "name": "Bengaluru Urban", "state_code": 29, "lat": 12.9716, "lon": 77.5946},
-        {"code": 538, "name": "Bengaluru Rural", "state_code": 29, "lat": 13.2846, "lon": 77.4389},
-        {"code": 539, "name": "Mysuru", "state_code": 29, "lat": 12.2958, "lon": 76.6394},
-        {"code": 540, "name": "Mangaluru (Dakshina Kannada)", "state_code": 29, "lat": 12.9141, "lon": 74.8560},
-        {"code": 541, "name": "Hubballi-Dharwad", "state_code": 29, "lat": 15.3647, "lon": 75.1240},
-        {"code": 542, "name": "Belagavi", "state_code": 29, "lat": 15.8497, "lon": 74.4977},
-        {"code": 543, "name": "Kalaburagi", "state_code": 29, "lat": 17.3297, "lon": 76.8343},
-        {"code": 544, "name": "Ballari", "state_code": 29, "lat": 15.1394, "lon": 76.9214},
-        {"code": 545, "name": "Shivamogga", "state_code": 29, "lat": 13.9299, "lon": 75.5681},
-        {"code": 546, "name": "Tumakuru", "state_code": 29, "lat": 13.3392, "lon": 77.1012},
-        {"code": 547, "name": "Vijayapura", "state_code": 29, "lat": 16.8302, "lon": 75.7100},
-        {"code": 548, "name": "Raichur", "state_code": 29, "lat": 16.2076, "lon": 77.3463},
-        {"code": 549, "name": "Udupi", "state_code": 29, "lat": 13.3409, "lon": 74.7421},
-        {"code": 550, "name": "Hassan", "state_code": 29, "lat": 13.0072, "lon": 76.0962},
-        {"code": 551, "name": "Mandya", "state_code": 29, "lat": 12.5244, "lon": 76.8958}
-    ]
-    districts_data.extend(karnataka_districts)
-    
-    # Tamil Nadu (33) - Top 15 districts
-    tn_districts = [
-        {"code": 603, "name": "Chennai", "state_code": 33, "lat": 13.0827, "lon": 80.2707},
-        {"code": 604, "name": "Coimbatore", "state_code": 33, "lat": 11.0168, "lon": 76.9558},
-        {"code": 605, "name": "Madurai", "state_code": 33, "lat": 9.9252, "lon": 78.1198},
-        {"code": 606, "name": "Tiruchirappalli", "state_code": 33, "lat": 10.7905, "lon": 78.7047},
-        {"code": 607, "name": "Salem", "state_code": 33, "lat": 11.6643, "lon": 78.1460},
-        {"code": 608, "name": "Tirunelveli", "state_code": 33, "lat": 8.7139, "lon": 77.7567},
-        {"code": 609, "name": "Erode", "state_code": 33, "lat": 11.3410, "lon": 77.7172},
-        {"code": 610, "name": "Vellore", "state_code": 33, "lat": 12.9165, "lon": 79.1325},
-        {"code": 611, "name": "Thanjavur", "state_code": 33, "lat": 10.7870, "lon": 79.1378},
-        {"code": 612, "name": "Dindigul", "state_code": 33, "lat": 10.3624, "lon": 77.9714},
-        {"code": 613, "name": "Kanchipuram", "state_code": 33, "lat": 12.8342, "lon": 79.7036},
-        {"code": 614, "name": "Tiruppur", "state_code": 33, "lat": 11.1085, "lon": 77.3411},
-        {"code": 615, "name": "Cuddalore", "state_code": 33, "lat": 11.7480, "lon": 79.7714},
-        {"code": 616, "name": "Karur", "state_code": 33, "lat": 10.9601, "lon": 78.0766},
-        {"code": 617, "name": "Nagercoil (Kanyakumari)", "state_code": 33, "lat": 8.1781, "lon": 77.4061}
-    ]
-    districts_data.extend(tn_districts)
-    
-    # Rajasthan (8) - Top 15 districts
-    rajasthan_districts = [
-        {"code": 116, "name": "Jaipur", "state_code": 8, "lat": 26.9124, "lon": 75.7873},
-        {"code": 117, "name": "Jodhpur", "state_code": 8, "lat": 26.2389, "lon": 73.0243},
-        {"code": 118, "name": "Kota", "state_code": 8, "lat": 25.2138, "lon": 75.8648},
-        {"code": 119, "name": "Udaipur", "state_code": 8, "lat": 24.5854, "lon": 73.7125},
-        {"code": 120, "name": "Ajmer", "state_code": 8, "lat": 26.4499, "lon": 74.6399},
-        {"code": 121, "name": "Bikaner", "state_code": 8, "lat": 28.0229, "lon": 73.3119},
-        {"code": 122, "name": "Alwar", "state_code": 8, "lat": 27.5530, "lon": 76.6346},
-        {"code": 123, "name": "Bhilwara", "state_code": 8, "lat": 25.3470, "lon": 74.6355},
-        {"code": 124, "name": "Sikar", "state_code": 8, "lat": 27.6119, "lon": 75.1397},
-        {"code": 125, "name": "Pali", "state_code": 8, "lat": 25.7711, "lon": 73.3234},
-        {"code": 126, "name": "Bharatpur", "state_code": 8, "lat": 27.2173, "lon": 77.4900},
-        {"code": 127, "name": "Chittorgarh", "state_code": 8, "lat": 24.8887, "lon": 74.6269},
-        {"code": 128, "name": "Sri Ganganagar", "state_code": 8, "lat": 29.9038, "lon": 73.8772},
-        {"code": 129, "name": "Tonk", "state_code": 8, "lat": 26.1542, "lon": 75.7886},
-        {"code": 130, "name": "Jaisalmer", "state_code": 8, "lat": 26.9157, "lon": 70.9083}
-    ]
-    districts_data.extend(rajasthan_districts)
-    
-    # Madhya Pradesh (23) - Top 12 districts
-    mp_districts = [
-        {"code": 405, "name": "Indore", "state_code": 23, "lat": 22.7196, "lon": 75.8577},
-        {"code": 406, "name": "Bhopal", "state_code": 23, "lat": 23.2599, "lon": 77.4126},
-        {"code": 407, "name": "Jabalpur", "state_code": 23, "lat": 23.1815, "lon": 79.9864},
-        {"code": 408, "name": "Gwalior", "state_code": 23, "lat": 26.2183, "lon": 78.1828},
-        {"code": 409, "name": "Ujjain", "state_code": 23, "lat": 23.1765, "lon": 75.7885},
-        {"code": 410, "name": "Sagar", "state_code": 23, "lat": 23.8388, "lon": 78.7378},
-        {"code": 411, "name": "Dewas", "state_code": 23, "lat": 22.9676, "lon": 76.0534},
-        {"code": 412, "name": "Satna", "state_code": 23, "lat": 24.6005, "lon": 80.8322},
-        {"code": 413, "name": "Ratlam", "state_code": 23, "lat": 23.3315, "lon": 75.0367},
-        {"code": 414, "name": "Rewa", "state_code": 23, "lat": 24.5364, "lon": 81.2961},
-        {"code": 415, "name": "Katni", "state_code": 23, "lat": 23.8346, "lon": 80.3958},
-        {"code": 416, "name": "Singrauli", "state_code": 23, "lat": 24.1997, "lon": 82.6747}
-    ]
-    districts_data.extend(mp_districts)
-    
-    # Bihar (10) - Top 12 districts
-    bihar_districts = [
-        {"code": 184, "name": "Patna", "state_code": 10, "lat": 25.5941, "lon": 85.1376},
-        {"code": 185, "name": "Gaya", "state_code": 10, "lat": 24.7955, "lon": 85.0002},
-        {"code": 186, "name": "Bhagalpur", "state_code": 10, "lat": 25.2425, "lon": 87.0084},
-        {"code": 187, "name": "Muzaffarpur", "state_code": 10, "lat": 26.1225, "lon": 85.3906},
-        {"code": 188, "name": "Darbhanga", "state_code": 10, "lat": 26.1542, "lon": 85.8918},
-        {"code": 189, "name": "Purnia", "state_code": 10, "lat": 25.7771, "lon": 87.4753},
-        {"code": 190, "name": "Arrah (Bhojpur)", "state_code": 10, "lat": 25.5563, "lon": 84.6631},
-        {"code": 191, "name": "Begusarai", "state_code": 10, "lat": 25.4182, "lon": 86.1272},
-        {"code": 192, "name": "Katihar", "state_code": 10, "lat": 25.5394, "lon": 87.5761},
-        {"code": 193, "name": "Munger", "state_code": 10, "lat": 25.3753, "lon": 86.4734},
-        {"code": 194, "name": "Chapra (Saran)", "state_code": 10, "lat": 25.7805, "lon": 84.7477},
-        {"code": 195, "name": "Saharsa", "state_code": 10, "lat": 25.8800, "lon": 86.6014}
-    ]
-    districts_data.extend(bihar_districts)
-    
-    # West Bengal (19) - Top 12 districts
-    wb_districts = [
-        {"code": 341, "name": "Kolkata", "state_code": 19, "lat": 22.5726, "lon": 88.3639},
-        {"code": 342, "name": "Howrah", "state_code": 19, "lat": 22.5958, "lon": 88.2636},
-        {"code": 343, "name": "North 24 Parganas", "state_code": 19, "lat": 22.6157, "lon": 88.4001},
-        {"code": 344, "name": "South 24 Parganas", "state_code": 19, "lat": 22.1484, "lon": 88.4324},
-        {"code": 345, "name": "Bardhaman", "state_code": 19, "lat": 23.2324, "lon": 87.8615},
-        {"code": 346, "name": "Murshidabad", "state_code": 19, "lat": 24.1752, "lon": 88.2800},
-        {"code": 347, "name": "Nadia", "state_code": 19, "lat": 23.4730, "lon": 88.5560},
-        {"code": 348, "name": "Jalpaiguri", "state_code": 19, "lat": 26.5161, "lon": 88.7296},
-        {"code": 349, "name": "Darjeeling", "state_code": 19, "lat": 26.7271, "lon": 88.3953},
-        {"code": 350, "name": "Malda", "state_code": 19, "lat": 25.0961, "lon": 88.1436},
-        {"code": 351, "name": "Birbhum", "state_code": 19, "lat": 23.8404, "lon": 87.6190},
-        {"code": 352, "name": "Midnapore", "state_code": 19, "lat": 22.4241, "lon": 87.3198}
-    ]
-    districts_data.extend(wb_districts)
-    
-    # Telangana (36) - Top 10 districts
-    telangana_districts = [
-        {"code": 667, "name": "Hyderabad", "state_code": 36, "lat": 17.3850, "lon": 78.4867},
-        {"code": 668, "name": "Ranga Reddy", "state_code": 36, "lat": 17.3753, "lon": 78.2136},
-        {"code": 669, "name": "Medchal-Malkajgiri", "state_code": 36, "lat": 17.6209, "lon": 78.4821},
-        {"code": 670, "name": "Warangal Urban", "state_code": 36, "lat": 17.9689, "lon": 79.5941},
-        {"code": 671, "name": "Karimnagar", "state_code": 36, "lat": 18.4386, "lon": 79.1288},
-        {"code": 672, "name": "Nizamabad", "state_code": 36, "lat": 18.6725, "lon": 78.0942},
-        {"code": 673, "name": "Khammam", "state_code": 36, "lat": 17.2473, "lon": 80.1514},
-        {"code": 674, "name": "Nalgonda", "state_code": 36, "lat": 17.0490, "lon": 79.2674},
-        {"code": 675, "name": "Mahbubnagar", "state_code": 36, "lat": 16.7488, "lon": 77.9838},
-        {"code": 676, "name": "Sangareddy", "state_code": 36, "lat": 17.6247, "lon": 78.0833}
-    ]
-    districts_data.extend(telangana_districts)
-    
-    # Andhra Pradesh (28) - Top 10 districts
-    ap_districts = [
-        {"code": 517, "name": "Visakhapatnam", "state_code": 28, "lat": 17.6869, "lon": 83.2185},
-        {"code": 518, "name": "Vijayawada (Krishna)", "state_code": 28, "lat": 16.5062, "lon": 80.6480},
-        {"code": 519, "name": "Guntur", "state_code": 28, "lat": 16.3067, "lon": 80.4365},
-        {"code": 520, "name": "Nellore", "state_code": 28, "lat": 14.4426, "lon": 79.9865},
-        {"code": 521, "name": "Kurnool", "state_code": 28, "lat": 15.8281, "lon": 78.0373},
-        {"code": 522, "name": "Kadapa", "state_code": 28, "lat": 14.4674, "lon": 78.8241},
-        {"code": 523, "name": "Tirupati (Chittoor)", "state_code": 28, "lat": 13.6288, "lon": 79.4192},
-        {"code": 524, "name": "Anantapur", "state_code": 28, "lat": 14.6819, "lon": 77.6006},
-        {"code": 525, "name": "Rajahmundry (East Godavari)", "state_code": 28, "lat": 17.0005, "lon": 81.8040},
-        {"code": 526, "name": "Eluru (West Godavari)", "state_code": 28, "lat": 16.7107, "lon": 81.0954}
-    ]
-    districts_data.extend(ap_districts)
-    
-    # Kerala (32) - All 14 districts
-    kerala_districts = [
-        {"code": 585, "name": "Thiruvananthapuram", "state_code": 32, "lat": 8.5241, "lon": 76.9366},
-        {"code": 586, "name": "Kochi (Ernakulam)", "state_code": 32, "lat": 9.9312, "lon": 76.2673},
-        {"code": 587, "name": "Kozhikode", "state_code": 32, "lat": 11.2588, "lon": 75.7804},
-        {"code": 588, "name": "Kollam", "state_code": 32, "lat": 8.8932, "lon": 76.6141},
-        {"code": 589, "name": "Thrissur", "state_code": 32, "lat": 10.5276, "lon": 76.2144},
-        {"code": 590, "name": "Kannur", "state_code": 32, "lat": 11.8745, "lon": 75.3704},
-        {"code": 591, "name": "Alappuzha", "state_code": 32, "lat": 9.4981, "lon": 76.3388},
-        {"code": 592, "name": "Kottayam", "state_code": 32, "lat": 9.5916, "lon": 76.5222},
-        {"code": 593, "name": "Palakkad", "state_code": 32, "lat": 10.7867, "lon": 76.6548},
-        {"code": 594, "name": "Malappuram", "state_code": 32, "lat": 11.0510, "lon": 76.0711},
-        {"code": 595, "name": "Pathanamthitta", "state_code": 32, "lat": 9.2648, "lon": 76.7870},
-        {"code": 596, "name": "Kasaragod", "state_code": 32, "lat": 12.4996, "lon": 74.9869},
-        {"code": 597, "name": "Wayanad", "state_code": 32, "lat": 11.6854, "lon": 76.1320},
-        {"code": 598, "name": "Idukki", "state_code": 32, "lat": 9.9188, "lon": 77.1025}
-    ]
-    districts_data.extend(kerala_districts)
+    """Upsert the packaged states and districts if their version changed"""
     
-    await db.districts.insert_many(districts_data)
-    
-    print(f"✅ Initialized {len(states_data)} states and {len(districts_data)} districts")
+    report = await seed_reference_data(db)
+    if report["applied"]:
+        location_catalog.invalidate()
+        print(f"✅ Seeded reference data version {report['version']} in {report['total_ms']} ms")
 
 
 # API Routes
@@ -502,9 +623,11 @@ async def root():
 
 
 @app.post("/api/auth/register", response_model=Token, status_code=status.HTTP_201_CREATED)
-async def register(user_data: UserRegister):
+async def register(user_data: UserRegister, request: Request):
     """Register a new user"""
     
+    auth_admission.admit(client_ip(request), user_data.email)
+    
     # Check if user already exists
     existing_user = await db.users.find_one({
         "$or": [
@@ -520,7 +643,7 @@ async def register(user_data: UserRegister):
             raise HTTPException(status_code=400, detail="Mobile number already registered")
     
     # Create new user
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await get_password_hash(user_data.password)
     new_user = {
         "fullName": user_data.fullName,
         "email": user_data.email,
@@ -548,10 +671,172 @@ async def register(user_data: UserRegister):
     }
 
 
+class RequestStreamingResponse(StreamingResponse):
+    """StreamingResponse whose body iterator consumes the request body
+    
+    Starlette's StreamingResponse calls receive() concurrently to watch for
+    disconnects, which would swallow request body chunks. Here the iterator
+    is the only reader and sees a disconnect as ClientDisconnect.
+    """
+    
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+        if self.background is not None:
+            await self.background()
+
+
+async def _iter_lines(request: Request):
+    """Decoded lines of a streamed request body"""
+    buffer = b""
+    async for chunk in request.stream():
+        buffer += chunk
+        *lines, buffer = buffer.split(b"\n")
+        for line in lines:
+            yield line.decode("utf-8", errors="replace").rstrip("\r")
+    if buffer:
+        yield buffer.decode("utf-8", errors="replace").rstrip("\r")
+
+
+def _row_error(exc: ValueError) -> str:
+    if not hasattr(exc, "errors"):
+        return str(exc)
+    messages = []
+    for error in exc.errors():
+        location = ".".join(str(part) for part in error["loc"])
+        messages.append(f"{location}: {error['msg']}" if location else error["msg"])
+    return "; ".join(messages)
+
+
+DUPLICATE_KEY_MESSAGES = {
+    "email": "Email already registered",
+    "mobile": "Mobile number already registered"
+}
+
+
+async def _insert_registrations(batch: list) -> list:
+    """Hash and insert one batch of ``(row, UserRegister)``, returning per-row results
+    
+    Uniqueness is left to the users indexes: an ordered insert_many stops at
+    the first duplicate, which is reported, and the rest of the batch is
+    retried from the following row.
+    """
+    hashed_passwords = await password_hasher.hash_many([user.password for _, user in batch])
+    now = datetime.utcnow()
+    documents = [
+        {
+            "fullName": user.fullName,
+            "email": user.email,
+            "mobile": user.mobile,
+            "password": hashed_password,
+            "created_at": now,
+            "updated_at": now
+        }
+        for (_, user), hashed_password in zip(batch, hashed_passwords)
+    ]
+    
+    errors = {}
+    start = 0
+    while start < len(documents):
+        try:
+            await db.users.insert_many(documents[start:], ordered=True)
+            break
+        except BulkWriteError as e:
+            if not e.details.get("writeErrors"):
+                # The rows were written but the write concern was not met,
+                # so they may not survive a failover; report them as failed
+                concern_error = (e.details.get("writeConcernErrors") or [{}])[0]
+                message = f"Write not acknowledged: {concern_error.get('errmsg', 'write concern not satisfied')}"
+                errors.update({i: message for i in range(start, len(documents))})
+                break
+            write_error = e.details["writeErrors"][0]
+            failed = start + write_error["index"]
+            if write_error.get("code") == 11000:
+                # keyPattern names the violated index; older servers only say it in errmsg
+                key_pattern = write_error.get("keyPattern") or write_error.get("errmsg", "")
+                field = next((field for field in DUPLICATE_KEY_MESSAGES if field in key_pattern), None)
+                errors[failed] = DUPLICATE_KEY_MESSAGES.get(field, "Email or mobile number already registered")
+            else:
+                errors[failed] = "Could not create user"
+            start = failed + 1
+    
+    results = []
+    for i, ((row, _), document) in enumerate(zip(batch, documents)):
+        if i in errors:
+            results.append({"row": row, "status": "error", "error": errors[i]})
+        else:
+            results.append({"row": row, "status": "created", "id": str(document["_id"])})
+    return results
+
+
+@app.post("/api/auth/register/bulk")
+async def bulk_register(
+    request: Request,
+    body_format: Optional[str] = Query(None, alias="format", pattern="^(csv|ndjson)$"),
+    user = Depends(get_admin_user)
+):
+    """Onboard many farmers from a streamed CSV or NDJSON body (admins only)
+    
+    Each row carries the ``UserRegister`` fields (CSV needs a header row).
+    The format comes from ``?format=`` or else the Content-Type. Responds
+    with an NDJSON stream: one line per row, in row order, then a summary.
+    Rows past MAX_BULK_REGISTER_ROWS are not processed; the first of them
+    gets an error line and the summary counts only processed rows.
+    """
+    
+    if body_format is None:
+        body_format = "csv" if "csv" in request.headers.get("content-type", "") else "ndjson"
+    
+    async def results():
+        header = None
+        pending = []  # (row, UserRegister or None, error or None)
+        counts = {"created": 0, "error": 0}
+        row = -1
+        
+        async def flush():
+            valid = [(row, user) for row, user, _ in pending if user is not None]
+            inserted = {result["row"]: result for result in await _insert_registrations(valid)} if valid else {}
+            lines = []
+            for row, user, error in pending:
+                result = inserted[row] if user is not None else {"row": row, "status": "error", "error": error}
+                if row < MAX_BULK_REGISTER_ROWS:
+                    counts[result["status"]] += 1
+                lines.append(json.dumps(result) + "\n")
+            pending.clear()
+            return "".join(lines)
+        
+        async for line in _iter_lines(request):
+            if not line.strip():
+                continue
+            if body_format == "csv" and header is None:
+                header = next(csv.reader([line]))
+                continue
+            row += 1
+            if row >= MAX_BULK_REGISTER_ROWS:
+                pending.append((row, None, f"At most {MAX_BULK_REGISTER_ROWS} rows per request"))
+                break
+            try:
+                if body_format == "csv":
+                    fields = dict(zip(header, next(csv.reader([line]))))
+                else:
+                    fields = json.loads(line)
+                pending.append((row, UserRegister.model_validate(fields), None))
+            except ValueError as e:
+                pending.append((row, None, _row_error(e)))
+            if len(pending) >= BULK_REGISTER_BATCH_SIZE:
+                yield await flush()
+        if pending:
+            yield await flush()
+        yield json.dumps({"summary": {"rows": min(row + 1, MAX_BULK_REGISTER_ROWS), "created": counts["created"], "failed": counts["error"]}}) + "\n"
+    
+    return RequestStreamingResponse(results(), media_type="application/x-ndjson")
+
+
 @app.post("/api/auth/login", response_model=Token)
-async def login(credentials: UserLogin):
+async def login(credentials: UserLogin, request: Request):
     """Login user"""
     
+    auth_admission.admit(client_ip(request), credentials.username)
+    
     # Find user by username (email or mobile)
     user = await db.users.find_one({
         "$or": [
@@ -564,7 +849,7 @@ async def login(credentials: UserLogin):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Verify password
-    if not verify_password(credentials.password, user["password"]):
+    if not await verify_password(credentials.password, user["password"]):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     # Create access token
@@ -584,26 +869,28 @@ async def login(credentials: UserLogin):
 
 
 @app.get("/api/location/states", response_model=List[StateResponse])
-async def get_states():
+async def get_states(request: Request):
     """Get all Indian states"""
-    
-    states = []
-    async for state in db.states.find().sort("name", 1):
-        # Count districts for each state
-        districts_count = await db.districts.count_documents({"state_code": state["code"]})
-        states.append({
-            "code": state["code"],
-            "name": state["name"],
-            "districts_count": districts_count
-        })
-    
-    return states
+    states = await location_catalog.get_states()
+    return conditional_response(
+        request,
+        await location_catalog.etag("states"),
+        reference_cache_control(),
+        lambda: FastJSONResponse(states)
+    )
 
 
 @app.get("/api/location/districts/{state_code}", response_model=List[DistrictResponse])
-async def get_districts(state_code: int):
+async def get_districts(state_code: int, request: Request):
     """Get districts for a specific state"""
     
+    # Revalidations are answered from the dataset version without a query
+    etag = await location_catalog.etag("districts", state_code)
+    cache_control_value = reference_cache_control()
+    response = not_modified(request, etag, cache_control_value)
+    if response is not None:
+        return response
+    
     districts = []
     async for district in db.districts.find({"state_code": state_code}).sort("name", 1):
         districts.append({
@@ -614,134 +901,282 @@ async def get_districts(state_code: int):
             "lon": district["lon"]
         })
     
-    return districts
+    return add_validators(FastJSONResponse(districts), etag, cache_control_value)
+
+
+@app.get("/api/location/search", response_model=List[LocationSearchResult])
+async def search_locations(
+    request: Request,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: int = Query(10, ge=1, le=50),
+    state_code: Optional[int] = None
+):
+    """Autocomplete states and districts by name, tolerating typos and Indian scripts"""
+    
+    results = await location_catalog.search(q, limit, state_code)
+    return conditional_response(
+        request,
+        None,
+        reference_cache_control(),
+        lambda: FastJSONResponse(results)
+    )
+
+
+@app.get("/api/location/nearest", response_model=NearestDistrictResponse)
+async def get_nearest_district(
+    lat: float = Query(..., ge=-90, le=90),
+    lon: float = Query(..., ge=-180, le=180),
+    max_distance_km: Optional[float] = Query(None, gt=0)
+):
+    """Resolve GPS coordinates to the nearest district"""
+    
+    district = await location_catalog.nearest_district(lat, lon, max_distance_km)
+    if not district:
+        raise HTTPException(status_code=404, detail="No district found near this location")
+    return district
+
+
+@app.post("/api/location/nearest/batch", response_model=List[Optional[NearestDistrictResponse]])
+async def get_nearest_districts(request: NearestDistrictBatchRequest):
+    """Resolve many GPS coordinates at once (null where no district is in range)"""
+    
+    points = [(point.lat, point.lon) for point in request.points]
+    return await location_catalog.nearest_districts(points, request.max_distance_km)
 
 
 @app.post("/api/crops/recommendations", response_model=List[CropResponse])
 async def get_crop_recommendations(request: CropRecommendationRequest, user = Depends(get_current_user)):
     """Get crop recommendations based on location and season"""
     
-    # Mock crop data - In production, this would use ML model or external API
-    crops_data = [
-        {
-            "crop_name": "Rice",
-            "suitability_score": 92,
-            "avg_profit": 45000,
-            "duration_days": 120,
-            "water_requirement": "High",
-            "soil_type": ["Loamy", "Clay"],
-            "best_practices": ["Direct seeding", "SRI method", "Proper water management"]
-        },
-        {
-            "crop_name": "Wheat",
-            "suitability_score": 88,
-            "avg_profit": 38000,
-            "duration_days": 110,
-            "water_requirement": "Medium",
-            "soil_type": ["Loamy", "Sandy Loam"],
-            "best_practices": ["Timely sowing", "Seed treatment", "Balanced fertilization"]
-        },
-        {
-            "crop_name": "Cotton",
-            "suitability_score": 85,
-            "avg_profit": 52000,
-            "duration_days": 150,
-            "water_requirement": "Medium",
-            "soil_type": ["Black", "Loamy"],
-            "best_practices": ["Integrated pest management", "Proper spacing", "Drip irrigation"]
-        },
-        {
-            "crop_name": "Sugarcane",
-            "suitability_score": 82,
-            "avg_profit": 65000,
-            "duration_days": 365,
-            "water_requirement": "Very High",
-            "soil_type": ["Loamy", "Clay Loam"],
-            "best_practices": ["Trench planting", "Inter-cropping", "Drip irrigation"]
-        },
-        {
-            "crop_name": "Maize",
-            "suitability_score": 80,
-            "avg_profit": 32000,
-            "duration_days": 90,
-            "water_requirement": "Medium",
-            "soil_type": ["Loamy", "Sandy Loam"],
-            "best_practices": ["Hybrid seeds", "Ridge and furrow planting", "Mulching"]
-        },
-        {
-            "crop_name": "Pulses (Chickpea)",
-            "suitability_score": 78,
-            "avg_profit": 35000,
-            "duration_days": 100,
-            "water_requirement": "Low",
-            "soil_type": ["Loamy", "Clay Loam"],
-            "best_practices": ["Seed inoculation", "Wilt management", "Timely harvesting"]
-        },
-        {
-            "crop_name": "Soybean",
-            "suitability_score": 75,
-            "avg_profit": 30000,
-            "duration_days": 95,
-            "water_requirement": "Medium",
-            "soil_type": ["Loamy", "Clay Loam"],
-            "best_practices": ["Certified seeds", "Rhizobium treatment", "Weed control"]
-        },
-        {
-            "crop_name": "Groundnut",
-            "suitability_score": 72,
-            "avg_profit": 42000,
-            "duration_days": 110,
-            "water_requirement": "Low-Medium",
-            "soil_type": ["Sandy Loam", "Red Loam"],
-            "best_practices": ["Seed treatment", "Gypsum application", "Pod maturity check"]
-        }
-    ]
+    # Served from the precomputed table; the body is already serialized
+    payload = await location_catalog.crop_recommendations(request.season_id)
+    return Response(content=payload.body, media_type="application/json", headers={"ETag": payload.etag})
+
+
+@app.get("/api/crops/recommendations", response_model=List[CropResponse])
+async def get_cacheable_crop_recommendations(
+    request: Request,
+    state_code: int,
+    district_code: int,
+    season_id: int,
+    user = Depends(get_current_user)
+):
+    """Get crop recommendations (cacheable GET form, supports If-None-Match)"""
+    
+    payload = await location_catalog.crop_recommendations(season_id)
+    return conditional_response(
+        request,
+        payload.etag,
+        reference_cache_control(private=True),
+        lambda: Response(content=payload.body, media_type="application/json")
+    )
+
+
+@app.post("/api/crops/recommendations/batch")
+async def get_batch_crop_recommendations(
+    request: BatchCropRecommendationRequest,
+    format: str = Query("columnar", pattern="^(columnar|ndjson)$"),
+    user = Depends(get_current_user)
+):
+    """Score crop recommendations for many farms in one call
     
-    # Season-based filtering (simplified logic)
-    if request.season_id == 1:  # Kharif
-        preferred_crops = ["Rice", "Cotton", "Soybean", "Maize", "Groundnut"]
-    elif request.season_id == 2:  # Rabi
-        preferred_crops = ["Wheat", "Pulses (Chickpea)", "Maize"]
-    else:  # Summer/Zaid
-        preferred_crops = ["Maize", "Groundnut", "Rice"]
+    ``columnar`` returns the crop catalog once plus per-row arrays of
+    ranked crop indexes and scores. ``ndjson`` streams one JSON line per row.
+    """
     
-    # Boost scores for season-appropriate crops
-    result = []
-    for crop in crops_data:
-        crop_copy = crop.copy()
-        if crop["crop_name"] in preferred_crops:
-            crop_copy["suitability_score"] = min(95, crop["suitability_score"] + 5)
-        result.append(crop_copy)
+    order, scores = crop_scorer.score([row.season_id for row in request.rows], request.top_k)
+    crop_index = order.tolist()
+    suitability_scores = scores.tolist()
     
-    # Sort by suitability score
-    result.sort(key=lambda x: x["suitability_score"], reverse=True)
+    if format == "ndjson":
+        crop_names = [crop["crop_name"] for crop in crop_scorer.crops]
+        
+        def rows():
+            for i, row in enumerate(request.rows):
+                yield json.dumps({
+                    "row": i,
+                    "state_code": row.state_code,
+                    "district_code": row.district_code,
+                    "season_id": row.season_id,
+                    "crops": [crop_names[j] for j in crop_index[i]],
+                    "suitability_score": suitability_scores[i]
+                }) + "\n"
+        
+        return StreamingResponse(rows(), media_type="application/x-ndjson")
     
-    return result
+    return {
+        "crops": crop_scorer.crops,
+        "rows": len(request.rows),
+        "crop_index": crop_index,
+        "suitability_score": suitability_scores
+    }
 
 
-@app.get("/api/weather/{state_code}/{district_code}")
-async def get_weather_info(state_code: int, district_code: int, user = Depends(get_current_user)):
-    """Get weather information and warnings"""
+@app.post("/api/marketplace/listings", status_code=status.HTTP_201_CREATED)
+async def create_listing(listing: ListingCreate, user = Depends(get_current_user)):
+    """List produce for sale from the current user"""
     
-    # Mock weather data - In production, integrate with weather API
+    if not await location_catalog.has_district(listing.state_code, listing.district_code):
+        raise HTTPException(status_code=400, detail="Unknown state or district")
+    
+    now = datetime.utcnow()
+    document = {
+        **listing.model_dump(),
+        "crop_key": crop_key(listing.crop),
+        "seller_id": str(user["_id"]),
+        "seller_name": user["fullName"],
+        "status": "active",
+        "created_at": now,
+        "updated_at": now
+    }
+    result = await db.listings.insert_one(document)
+    document["_id"] = result.inserted_id
+    return public_listing(document)
+
+
+@app.patch("/api/marketplace/listings/{listing_id}")
+async def update_listing(listing_id: str, changes: ListingUpdate, user = Depends(get_current_user)):
+    """Update one of the current user's listings (price, quantity, status, ...)"""
+    
+    if not ObjectId.is_valid(listing_id):
+        raise HTTPException(status_code=404, detail="Listing not found")
+    
+    update = changes.model_dump(exclude_unset=True)
+    update["updated_at"] = datetime.utcnow()
+    # Other users' listings look missing rather than forbidden
+    listing = await db.listings.find_one_and_update(
+        {"_id": ObjectId(listing_id), "seller_id": str(user["_id"])},
+        {"$set": update},
+        return_document=ReturnDocument.AFTER
+    )
+    if listing is None:
+        raise HTTPException(status_code=404, detail="Listing not found")
+    return public_listing(listing)
+
+
+@app.get("/api/marketplace/listings")
+async def search_listings(
+    category: Optional[str] = Query(None, pattern=f"^({'|'.join(CATEGORIES)})$"),
+    crop: Optional[str] = Query(None, min_length=1, max_length=60),
+    state_code: Optional[int] = None,
+    district_code: Optional[int] = None,
+    min_price: Optional[int] = Query(None, ge=0),
+    max_price: Optional[int] = Query(None, ge=0),
+    sort: str = Query("newest", pattern=f"^({'|'.join(SORTS)})$"),
+    cursor: Optional[str] = None,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    fields: Optional[str] = None
+):
+    """Search active listings, one page at a time
+    
+    Pages are keyset-paginated: pass the returned ``next_cursor`` (with the
+    same filters and sort) to get the next page, so deep pages cost the
+    same as the first. ``fields`` is a comma-separated subset of listing
+    fields to return; ``id`` is always included.
+    """
+    
+    if district_code is not None and state_code is None:
+        # District codes are only unique within a state
+        raise HTTPException(status_code=400, detail="district_code requires state_code")
+    try:
+        selected = parse_fields(fields)
+        query = search_query(category, crop, state_code, district_code, min_price, max_price, sort, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # One extra document tells whether another page exists
+    page = await db.listings.find(query, search_projection(selected, sort)).sort(SORTS[sort]).limit(limit + 1).to_list(length=limit + 1)
+    next_cursor = encode_cursor(sort, page[limit - 1]) if len(page) > limit else None
     return {
-        "temperature": 28,
-        "humidity": 65,
-        "rainfall": 15,
-        "wind_speed": 12,
-        "warning": "Moderate rainfall expected in next 3 days. Good for Kharif sowing.",
-        "forecast": [
-            {"day": "Today", "condition": "Partly Cloudy", "temp_max": 32, "temp_min": 24, "rain_chance": 30},
-            {"day": "Tomorrow", "condition": "Light Rain", "temp_max": 30, "temp_min": 23, "rain_chance": 60},
-            {"day": "Day 3", "condition": "Cloudy", "temp_max": 29, "temp_min": 22, "rain_chance": 40}
-        ]
+        "items": [public_listing(listing, selected) for listing in page[:limit]],
+        "next_cursor": next_cursor
     }
 
 
+@app.get("/api/weather/{state_code}/{district_code}")
+async def get_weather_info(state_code: int, district_code: int, request: Request, user = Depends(get_current_user)):
+    """Get weather information and warnings"""
+    
+    try:
+        report = await weather_service.get_report(state_code, district_code)
+    except WeatherUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    
+    # Cacheable until the report is due for a refresh
+    return conditional_response(
+        request,
+        report.etag,
+        cache_control(weather_service.expires_in(report), weather_service.ttl_seconds, private=True),
+        lambda: Response(content=report.body, media_type="application/json")
+    )
+
+
+@app.post("/api/disease/analyze", response_model=DiseaseDiagnosisResponse)
+async def analyze_crop_disease(request: Request, user = Depends(get_current_user)):
+    """Diagnose crop disease from a leaf photo sent as the raw request body"""
+    
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    if content_type not in IMAGE_CONTENT_TYPES:
+        raise HTTPException(status_code=415, detail="Send the photo as image/jpeg, image/png or image/webp")
+    try:
+        data = await read_upload(request)
+        return await disease_service.diagnose(data)
+    except ImageTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    except InvalidImage as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except DiagnosisUnavailable as e:
+        raise HTTPException(status_code=503, detail=str(e))
+
+
 @app.get("/api/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "healthy", "timestamp": datetime.utcnow()}
+    return {
+        "status": "healthy",
+        "timestamp": datetime.utcnow(),
+        "user_cache": user_cache.stats(),
+        "token_cache": token_cache.stats(),
+        "weather_cache": weather_service.stats(),
+        "disease_inference": disease_service.stats(),
+        "compression_cache": compressed_cache.stats(),
+        "auth_admission": auth_admission.stats()
+    }
+
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint"""
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+
+@app.get("/api/health/deep")
+async def deep_health_check():
+    """Health check including MongoDB round trip and connection pool stats"""
+    
+    result = {
+        "timestamp": datetime.utcnow(),
+        "pool": {
+            "max_pool_size": MONGODB_MAX_POOL_SIZE,
+            "min_pool_size": MONGODB_MIN_POOL_SIZE,
+            "read_preference": MONGODB_READ_PREFERENCE,
+            **pool_monitor.stats()
+        }
+    }
+    
+    start = time.perf_counter()
+    try:
+        await asyncio.wait_for(db.command("ping"), timeout=HEALTH_MAX_DB_LATENCY_MS / 1000 * HEALTH_PING_TIMEOUT_FACTOR)
+    except Exception as e:  # includes asyncio.TimeoutError
+        result.update({"status": "unhealthy", "error": type(e).__name__})
+        return JSONResponse(status_code=503, content=jsonable_encoder(result))
+    latency_ms = (time.perf_counter() - start) * 1000
+    
+    result["db_ping_ms"] = round(latency_ms, 3)
+    result["status"] = "healthy" if latency_ms <= HEALTH_MAX_DB_LATENCY_MS else "degraded"
+    # Load balancers only look at the status code, so degraded is a 503
+    status_code = 200 if result["status"] == "healthy" else 503
+    return JSONResponse(status_code=status_code, content=jsonable_encoder(result))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,244 @@
+"""
+Krishi Mitra - Metrics
+Lightweight counters and latency histograms exposed in Prometheus text format
+"""
+
+import asyncio
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Dict, Sequence, Tuple
+
+from pymongo import monitoring
+
+# Seconds; covers sub-millisecond cache hits up to multi-second stalls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Compression of a typical JSON body takes tens of microseconds
+COMPRESSION_BUCKETS = (0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05)
+
+# Images per model call, up to the largest micro-batch worth configuring
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+LabelValues = Tuple[str, ...]
+
+
+def percentile(samples: Sequence[float], pct: float) -> float:
+    """Nearest-rank ``pct`` percentile of a non-empty sequence, in any order"""
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return "\n".join(lines)
+
+
+class Gauge:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._lock = threading.Lock()
+
+    def set(self, value: float, *labelvalues: str):
+        with self._lock:
+            self._values[labelvalues] = value
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} gauge"]
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {value}")
+        return "\n".join(lines)
+
+
+class Histogram:
+    """Cumulative-bucket histogram; each observation is a bisect and two adds"""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labelvalues -> [per-bucket counts (+Inf last), sum]
+        self._series: Dict[LabelValues, list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, seconds: float, *labelvalues: str):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += seconds
+
+    @contextmanager
+    def time(self, *labelvalues: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def render(self) -> str:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            items = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labelvalues, counts, total in items:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            labels = _format_labels(self.labelnames, labelvalues)
+            lines.append(f"{self.name}_sum{labels} {total}")
+            lines.append(f"{self.name}_count{labels} {cumulative}")
+        return "\n".join(lines)
+
+
+http_requests_total = Counter(
+    "http_requests_total", "HTTP requests by route and status code", ("method", "route", "status")
+)
+http_request_duration_seconds = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route", ("method", "route")
+)
+operation_duration_seconds = Histogram(
+    "operation_duration_seconds", "Latency of expensive in-request operations", ("operation",)
+)
+mongodb_command_duration_seconds = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round trips", ("command", "outcome")
+)
+event_loop_lag_seconds = Histogram(
+    "event_loop_lag_seconds", "Delay between a scheduled wakeup and the event loop running it"
+)
+http_response_bytes_total = Counter(
+    "http_response_bytes_total", "Response body bytes sent on the wire by content-coding", ("route", "encoding")
+)
+http_response_uncompressed_bytes_total = Counter(
+    "http_response_uncompressed_bytes_total", "Response body bytes before compression", ("route",)
+)
+compression_duration_seconds = Histogram(
+    "compression_duration_seconds", "CPU time spent compressing response bodies",
+    ("route", "encoding"), buckets=COMPRESSION_BUCKETS
+)
+admission_rejections_total = Counter(
+    "admission_rejections_total", "Auth requests rejected by the rate limiter, by exhausted budget", ("limiter",)
+)
+inference_queue_depth = Gauge(
+    "inference_queue_depth", "Decoded images waiting for a model call", ("model",)
+)
+inference_batch_size = Histogram(
+    "inference_batch_size", "Images per model call", ("model",), buckets=BATCH_SIZE_BUCKETS
+)
+inference_batch_duration_seconds = Histogram(
+    "inference_batch_duration_seconds", "Duration of one model call on a whole batch", ("model",)
+)
+
+REGISTRY = [
+    http_requests_total,
+    http_request_duration_seconds,
+    operation_duration_seconds,
+    mongodb_command_duration_seconds,
+    event_loop_lag_seconds,
+    http_response_bytes_total,
+    http_response_uncompressed_bytes_total,
+    compression_duration_seconds,
+    admission_rejections_total,
+    inference_queue_depth,
+    inference_batch_size,
+    inference_batch_duration_seconds
+]
+
+
+def render_metrics() -> str:
+    return "\n".join(metric.render() for metric in REGISTRY) + "\n"
+
+
+def route_label(scope) -> str:
+    """Matched route template for an ASGI scope, so path parameters share a series"""
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware recording request count and latency per route.
+
+    The route label is the matched path template (``/api/location/districts/{state_code}``),
+    so path parameters do not create new series; unmatched paths share one label.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        start = time.perf_counter()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            route = route_label(scope)
+            method = scope["method"]
+            http_request_duration_seconds.observe(time.perf_counter() - start, method, route)
+            http_requests_total.inc(method, route, str(status_code))
+
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """Times every MongoDB command issued through the client"""
+
+    def started(self, event):
+        pass
+
+    def succeeded(self, event):
+        mongodb_command_duration_seconds.observe(event.duration_micros / 1e6, event.command_name, "success")
+
+    def failed(self, event):
+        mongodb_command_duration_seconds.observe(event.duration_micros / 1e6, event.command_name, "failure")
+
+
+async def monitor_event_loop_lag(interval: float = 0.5):
+    """Background task sampling how late the event loop wakes up"""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        event_loop_lag_seconds.observe(max(0.0, loop.time() - expected))
@@ -0,0 +1,90 @@
+"""
+Krishi Mitra - Password Hasher
+Runs bcrypt hashing and verification on a bounded worker pool
+"""
+
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from passlib.context import CryptContext
+
+from errors import RetryLater
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(min(4, os.cpu_count() or 1))))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", "64"))
+
+
+class PasswordHasherBusy(RetryLater):
+    """Raised when too many password operations are already queued"""
+
+    detail = "Too many authentication requests, please retry shortly"
+
+
+class PasswordHasher:
+    """Offloads bcrypt work from the event loop.
+
+    bcrypt releases the GIL while hashing, so a small thread pool keeps a
+    ~100-250 ms hash from stalling every other request on the worker.
+    At most ``max_workers`` hashes run at once and at most ``max_pending``
+    may be running or queued; beyond that callers get PasswordHasherBusy
+    instead of an ever-growing backlog.
+    """
+
+    def __init__(self, context: CryptContext, max_workers: int = PASSWORD_HASH_WORKERS, max_pending: int = PASSWORD_HASH_MAX_PENDING):
+        self._context = context
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="password-hash")
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def _run(self, fn, *args):
+        # Only touched from the event loop thread, so a plain counter is safe
+        if self._pending >= self.max_pending:
+            raise PasswordHasherBusy()
+        self._pending += 1
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(self._context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._run(self._context.verify, plain_password, hashed_password)
+
+    async def hash_many(self, passwords: List[str]) -> List[str]:
+        """Hash a batch of passwords for bulk imports.
+
+        At most ``max_workers`` hashes are submitted at a time, so interactive
+        logins queue behind one window rather than the whole batch. A full
+        queue makes the batch wait instead of failing; only the passwords
+        that were turned away are hashed again.
+        """
+        hashed: List[str] = [None] * len(passwords)
+        for start in range(0, len(passwords), self.max_workers):
+            window = range(start, min(start + self.max_workers, len(passwords)))
+            while window:
+                results = await asyncio.gather(*(self.hash(passwords[i]) for i in window), return_exceptions=True)
+                retry, busy = [], None
+                for i, result in zip(window, results):
+                    if isinstance(result, PasswordHasherBusy):
+                        retry.append(i)
+                        busy = result
+                    elif isinstance(result, BaseException):
+                        raise result
+                    else:
+                        hashed[i] = result
+                if busy is not None:
+                    await asyncio.sleep(busy.retry_after)
+                window = retry
+        return hashed
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
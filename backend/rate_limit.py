@@ -0,0 +1,132 @@
+"""
+Krishi Mitra - Rate Limiting
+Token-bucket admission control for the bcrypt-bound auth routes
+"""
+
+import math
+import os
+import time
+from collections import OrderedDict
+from typing import Hashable, Optional
+
+from fastapi import Request
+
+from errors import RetryLater
+from metrics import admission_rejections_total
+
+AUTH_RATE_LIMIT_ENABLED = os.getenv("AUTH_RATE_LIMIT_ENABLED", "true").lower() == "true"
+# Many farmers share a carrier-grade NAT address, so the per-IP budget is
+# generous; the per-username budget is what stops retry storms and guessing
+AUTH_IP_RATE_PER_MINUTE = float(os.getenv("AUTH_IP_RATE_PER_MINUTE", "120"))
+AUTH_IP_BURST = int(os.getenv("AUTH_IP_BURST", "30"))
+AUTH_USER_RATE_PER_MINUTE = float(os.getenv("AUTH_USER_RATE_PER_MINUTE", "6"))
+AUTH_USER_BURST = int(os.getenv("AUTH_USER_BURST", "5"))
+# Buckets tracked per limiter; the least recently used are evicted first
+AUTH_RATE_LIMIT_KEYS = int(os.getenv("AUTH_RATE_LIMIT_KEYS", "100000"))
+# Only enable behind a reverse proxy; its own X-Forwarded-For entry is used
+TRUST_FORWARDED_FOR = os.getenv("TRUST_FORWARDED_FOR", "false").lower() == "true"
+
+
+class RateLimited(RetryLater):
+    """Raised when a client or username has used up its request budget"""
+
+    status_code = 429
+    detail = "Too many attempts, please retry later"
+
+
+class TokenBucketLimiter:
+    """Per-key token buckets in a bounded LRU map.
+
+    Each key holds up to ``burst`` tokens and regains ``rate_per_second``;
+    a request spends one. Only ``maxsize`` keys are kept: evicting the least
+    recently used one forgets its bucket, which then starts full again.
+    A bucket idle for ``burst / rate_per_second`` seconds is full anyway, so
+    under normal churn eviction changes nothing; a flood of distinct keys
+    can only make the limiter more lenient, never use more memory.
+
+    Not thread-safe; it is meant to be used from the event loop thread.
+    """
+
+    def __init__(self, rate_per_second: float, burst: int, maxsize: int):
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.maxsize = maxsize
+        # key -> [tokens, last refill time]
+        self._buckets: "OrderedDict[Hashable, list]" = OrderedDict()
+        self.evictions = 0
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _bucket(self, key: Hashable, now: float) -> list:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [float(self.burst), now]
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+                self.evictions += 1
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(float(self.burst), bucket[0] + (now - bucket[1]) * self.rate_per_second)
+            bucket[1] = now
+        return bucket
+
+    def wait_time(self, key: Hashable, now: Optional[float] = None) -> float:
+        """Seconds until ``key`` has a token (0 if it has one now)"""
+        bucket = self._bucket(key, time.monotonic() if now is None else now)
+        if bucket[0] >= 1:
+            return 0.0
+        return (1 - bucket[0]) / self.rate_per_second
+
+    def spend(self, key: Hashable, now: Optional[float] = None):
+        bucket = self._bucket(key, time.monotonic() if now is None else now)
+        bucket[0] -= 1
+
+    def stats(self) -> dict:
+        return {"size": len(self._buckets), "maxsize": self.maxsize, "evictions": self.evictions}
+
+
+class AuthAdmission:
+    """Admits a login or registration only if both its client IP and its
+    username have a token left, so a rejected attempt costs neither budget.
+    """
+
+    def __init__(
+        self,
+        enabled: bool = AUTH_RATE_LIMIT_ENABLED,
+        ip_rate_per_minute: float = AUTH_IP_RATE_PER_MINUTE,
+        ip_burst: int = AUTH_IP_BURST,
+        user_rate_per_minute: float = AUTH_USER_RATE_PER_MINUTE,
+        user_burst: int = AUTH_USER_BURST,
+        maxsize: int = AUTH_RATE_LIMIT_KEYS
+    ):
+        self.enabled = enabled
+        self.by_ip = TokenBucketLimiter(ip_rate_per_minute / 60, ip_burst, maxsize)
+        self.by_user = TokenBucketLimiter(user_rate_per_minute / 60, user_burst, maxsize)
+
+    def admit(self, client_ip: str, username: str):
+        """Spend one token from each bucket or raise RateLimited"""
+        if not self.enabled:
+            return
+        now = time.monotonic()
+        username = username.strip().lower()
+        ip_wait = self.by_ip.wait_time(client_ip, now)
+        user_wait = self.by_user.wait_time(username, now)
+        if ip_wait or user_wait:
+            admission_rejections_total.inc("ip" if ip_wait >= user_wait else "username")
+            raise RateLimited(max(1, math.ceil(max(ip_wait, user_wait))))
+        self.by_ip.spend(client_ip, now)
+        self.by_user.spend(username, now)
+
+    def stats(self) -> dict:
+        return {"enabled": self.enabled, "ip": self.by_ip.stats(), "username": self.by_user.stats()}
+
+
+def client_ip(request: Request) -> str:
+    if TRUST_FORWARDED_FOR:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            # The last entry is the one our proxy appended; earlier ones are
+            # whatever the client sent
+            return forwarded.split(",")[-1].strip()
+    return request.client.host if request.client else "unknown"
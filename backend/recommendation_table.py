@@ -0,0 +1,46 @@
+"""
+Krishi Mitra - Recommendation Table
+Precomputed, pre-serialized crop recommendations per season
+"""
+
+import hashlib
+import json
+from typing import Callable, Dict, List, NamedTuple, Sequence
+
+
+class CachedPayload(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def serialize(content) -> CachedPayload:
+    """Encode content the way FastAPI's JSONResponse does and tag it"""
+    body = json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+    return CachedPayload(body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+
+
+class RecommendationTable:
+    """Recommendation responses for every season, ready to send.
+
+    ``recommend(season_id)`` is evaluated once per season. Recommendations
+    do not depend on the district, so every district of a season shares one
+    payload; unknown seasons get the default season's payload, matching
+    what the live computation returns for them.
+    """
+
+    def __init__(
+        self,
+        season_ids: Sequence[int],
+        recommend: Callable[[int], List[dict]],
+        default_season: int
+    ):
+        self._by_season: Dict[int, CachedPayload] = {
+            season_id: serialize(recommend(season_id)) for season_id in season_ids
+        }
+        self._default = self._by_season[default_season]
+
+    def __len__(self) -> int:
+        return len(self._by_season)
+
+    def get(self, season_id: int) -> CachedPayload:
+        return self._by_season.get(season_id, self._default)
@@ -0,0 +1,130 @@
+"""
+Krishi Mitra - Reference Data Seeding
+Idempotent, versioned upsert of states and districts into MongoDB
+
+Run once per deployment (or after editing reference_data/), outside the
+web workers:
+
+    cd backend
+    python seed_reference_data.py [--force] [--chunk-size 500]
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+from pymongo import UpdateOne
+
+# Shared reference data lives at the repository root
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from reference_data import load_reference_data
+
+MONGODB_URL = os.getenv("MONGODB_URL", "mongodb://localhost:27017")
+DATABASE_NAME = "krishi_mitra"
+SEED_CHUNK_SIZE = 500
+REFERENCE_VERSION_ID = "reference_data"
+
+
+async def _bulk_upsert(collection, operations: List[UpdateOne], chunk_size: int) -> dict:
+    """Apply upserts in ordered chunks; safe to re-run after a partial failure"""
+    upserted = modified = chunks = 0
+    for start in range(0, len(operations), chunk_size):
+        result = await collection.bulk_write(operations[start:start + chunk_size], ordered=True)
+        upserted += result.upserted_count
+        modified += result.modified_count
+        chunks += 1
+    return {"upserted": upserted, "modified": modified, "chunks": chunks}
+
+
+async def _delete_stale(collection, key_fields: tuple, keys: set) -> int:
+    """Delete documents whose key is not in ``keys``; returns the count"""
+    projection = {field: 1 for field in key_fields}
+    stale = [
+        document["_id"]
+        async for document in collection.find({}, projection)
+        if tuple(document.get(field) for field in key_fields) not in keys
+    ]
+    if not stale:
+        return 0
+    result = await collection.delete_many({"_id": {"$in": stale}})
+    return result.deleted_count
+
+
+async def seed_reference_data(db, force: bool = False, chunk_size: int = SEED_CHUNK_SIZE) -> dict:
+    """Bring the states and districts collections up to the packaged dataset.
+
+    States and districts no longer in the dataset are deleted after the
+    upserts. The dataset version (a content hash) is stored in ``db.meta``
+    only after both collections match, so an interrupted run is simply
+    repeated next time; the upserts make that repetition harmless.
+    """
+    started = time.perf_counter()
+    reference = load_reference_data()
+    meta = await db.meta.find_one({"_id": REFERENCE_VERSION_ID})
+    previous_version = meta.get("version") if meta else None
+    report = {"version": reference.version, "previous_version": previous_version, "applied": False}
+
+    if previous_version == reference.version and not force:
+        report["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+        return report
+
+    step = time.perf_counter()
+    states = reference.states()
+    report["states"] = await _bulk_upsert(db.states, [
+        UpdateOne({"code": state["code"]}, {"$set": state}, upsert=True)
+        for state in states
+    ], chunk_size)
+    report["states"]["deleted"] = await _delete_stale(db.states, ("code",), {(state["code"],) for state in states})
+    report["states"]["ms"] = round((time.perf_counter() - step) * 1000, 1)
+
+    step = time.perf_counter()
+    districts = reference.districts()
+    report["districts"] = await _bulk_upsert(db.districts, [
+        UpdateOne({"state_code": district["state_code"], "code": district["code"]}, {"$set": district}, upsert=True)
+        for district in districts
+    ], chunk_size)
+    report["districts"]["deleted"] = await _delete_stale(
+        db.districts, ("state_code", "code"), {(district["state_code"], district["code"]) for district in districts}
+    )
+    report["districts"]["ms"] = round((time.perf_counter() - step) * 1000, 1)
+
+    await db.meta.update_one(
+        {"_id": REFERENCE_VERSION_ID},
+        {"$set": {"version": reference.version, "applied_at": time.time()}},
+        upsert=True
+    )
+    report["applied"] = True
+    report["total_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return report
+
+
+async def _main(args):
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    client = AsyncIOMotorClient(MONGODB_URL)
+    try:
+        db = client[DATABASE_NAME]
+        await db.states.create_index("code", unique=True)
+        await db.districts.create_index([("state_code", 1), ("code", 1)])
+        report = await seed_reference_data(db, force=args.force, chunk_size=args.chunk_size)
+    finally:
+        client.close()
+
+    if not report["applied"]:
+        print(f"Reference data already at version {report['version']} ({report['total_ms']} ms)")
+        return
+    print(f"✅ Reference data {report['previous_version']} -> {report['version']} in {report['total_ms']} ms")
+    for name in ("states", "districts"):
+        stats = report[name]
+        print(f"   {name}: {stats['upserted']} inserted, {stats['modified']} updated, {stats['deleted']} deleted, "
+              f"{stats['chunks']} chunks, {stats['ms']} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Seed states and districts into MongoDB")
+    parser.add_argument("--force", action="store_true", help="re-apply even if the version matches")
+    parser.add_argument("--chunk-size", type=int, default=SEED_CHUNK_SIZE)
+    asyncio.run(_main(parser.parse_args()))
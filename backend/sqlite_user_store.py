@@ -0,0 +1,164 @@
+"""
+Krishi Mitra - SQLite User Store
+Persistent users shared by every worker process, via SQLite in WAL mode
+"""
+
+import asyncio
+import os
+import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
+
+from user_store import DuplicateUser, UserRecord
+
+USERS_DB_PATH = os.getenv("USERS_DB_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "krishi_mitra_users.db"))
+# Threads, each holding one connection; WAL lets their reads run in parallel
+SQLITE_POOL_SIZE = int(os.getenv("SQLITE_POOL_SIZE", "4"))
+# How long a writer waits for another process's write lock before failing
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+
+SCHEMA = (
+    """CREATE TABLE IF NOT EXISTS users (
+        id INTEGER PRIMARY KEY,
+        full_name TEXT NOT NULL,
+        email TEXT NOT NULL,
+        mobile TEXT NOT NULL,
+        password TEXT NOT NULL,
+        created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+    )""",
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_email ON users (email)",
+    "CREATE UNIQUE INDEX IF NOT EXISTS users_mobile ON users (mobile)",
+)
+
+# Fixed SQL text, so each connection compiles a statement once and then
+# reuses it from the sqlite3 statement cache
+COLUMNS = "id, full_name, email, mobile, password"
+SELECT_BY_ID = f"SELECT {COLUMNS} FROM users WHERE id = ?"
+SELECT_BY_EMAIL = f"SELECT {COLUMNS} FROM users WHERE email = ?"
+SELECT_BY_MOBILE = f"SELECT {COLUMNS} FROM users WHERE mobile = ?"
+# SQLite answers an OR of two indexed columns with two index lookups
+SELECT_BY_USERNAME = f"SELECT {COLUMNS} FROM users WHERE email = ? OR mobile = ? LIMIT 1"
+INSERT_USER = "INSERT INTO users (full_name, email, mobile, password) VALUES (?, ?, ?, ?)"
+COUNT_USERS = "SELECT COUNT(*) FROM users"
+DELETE_USERS = "DELETE FROM users"
+
+USER_ID_PREFIX = "user_"
+
+
+def _record(row) -> Optional[UserRecord]:
+    if row is None:
+        return None
+    rowid, full_name, email, mobile, password = row
+    return UserRecord(f"{USER_ID_PREFIX}{rowid}", full_name, email, mobile, password)
+
+
+def _rowid(user_id: str) -> Optional[int]:
+    if not user_id.startswith(USER_ID_PREFIX):
+        return None
+    try:
+        return int(user_id[len(USER_ID_PREFIX):])
+    except ValueError:
+        return None
+
+
+class SQLiteUserStore:
+    """The UserStore interface as coroutines, on an SQLite database file.
+
+    Queries run on a small thread pool; each thread opens one connection
+    on first use and keeps it, so the pool is also the connection pool.
+    The database is in WAL mode, so readers in any worker process never
+    block on a writer, and the unique indexes on email and mobile make
+    ``add`` atomic across processes: it raises DuplicateUser just like
+    the in-memory store.
+    """
+
+    def __init__(self, path: str = USERS_DB_PATH, pool_size: int = SQLITE_POOL_SIZE):
+        self.path = path
+        self.pool_size = pool_size
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Autocommit: every statement is its own short transaction
+        connection = sqlite3.connect(
+            self.path,
+            timeout=SQLITE_BUSY_TIMEOUT_MS / 1000,
+            isolation_level=None,
+            check_same_thread=False,
+            cached_statements=32
+        )
+        connection.execute("PRAGMA journal_mode=WAL")
+        # Durable across process crashes; only an OS crash can lose the
+        # last commits, which is the usual trade-off for WAL
+        connection.execute("PRAGMA synchronous=NORMAL")
+        return connection
+
+    def _connection(self) -> sqlite3.Connection:
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = self._local.connection = self._connect()
+            with self._lock:
+                self._connections.append(connection)
+        return connection
+
+    def _fetch_one(self, sql: str, params: tuple):
+        return self._connection().execute(sql, params).fetchone()
+
+    def _insert(self, fullName: str, email: str, mobile: str, password: str) -> UserRecord:
+        try:
+            cursor = self._connection().execute(INSERT_USER, (fullName, email, mobile, password))
+        except sqlite3.IntegrityError as e:
+            raise DuplicateUser("email" if "users.email" in str(e) else "mobile")
+        return UserRecord(f"{USER_ID_PREFIX}{cursor.lastrowid}", fullName, email, mobile, password)
+
+    async def _run(self, fn, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, fn, *args)
+
+    def _create_schema(self):
+        connection = self._connection()
+        for statement in SCHEMA:
+            connection.execute(statement)
+
+    async def open(self):
+        """Start the connection pool and create the table and indexes if needed"""
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="sqlite-users")
+        await self._run(self._create_schema)
+
+    async def get(self, user_id: str) -> Optional[UserRecord]:
+        rowid = _rowid(user_id)
+        if rowid is None:
+            return None
+        return _record(await self._run(self._fetch_one, SELECT_BY_ID, (rowid,)))
+
+    async def by_email(self, email: str) -> Optional[UserRecord]:
+        return _record(await self._run(self._fetch_one, SELECT_BY_EMAIL, (email,)))
+
+    async def by_mobile(self, mobile: str) -> Optional[UserRecord]:
+        return _record(await self._run(self._fetch_one, SELECT_BY_MOBILE, (mobile,)))
+
+    async def find(self, username: str) -> Optional[UserRecord]:
+        """Look up a login username, which may be an email or a mobile number"""
+        return _record(await self._run(self._fetch_one, SELECT_BY_USERNAME, (username, username)))
+
+    async def add(self, fullName: str, email: str, mobile: str, password: str) -> UserRecord:
+        return await self._run(self._insert, fullName, email, mobile, password)
+
+    async def count(self) -> int:
+        return (await self._run(self._fetch_one, COUNT_USERS, ()))[0]
+
+    async def clear(self):
+        await self._run(self._fetch_one, DELETE_USERS, ())
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._lock:
+            for connection in self._connections:
+                connection.close()
+            self._connections.clear()
+        self._local = threading.local()
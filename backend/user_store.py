@@ -0,0 +1,131 @@
+"""
+Krishi Mitra - User Store
+In-memory users indexed by id, email and mobile number
+"""
+
+import os
+from typing import Dict, Optional
+
+# "sqlite" (persistent, shared by worker processes) or "memory"
+USER_STORE = os.getenv("USER_STORE", "sqlite")
+
+
+class DuplicateUser(Exception):
+    """Raised when an email or mobile number is already registered"""
+
+    def __init__(self, field: str):
+        super().__init__(f"{field} already registered")
+        self.field = field
+
+
+class UserRecord:
+    __slots__ = ("id", "fullName", "email", "mobile", "password")
+
+    def __init__(self, id: str, fullName: str, email: str, mobile: str, password: str):
+        self.id = id
+        self.fullName = fullName
+        self.email = email
+        self.mobile = mobile
+        self.password = password
+
+    def public(self) -> dict:
+        """The user as returned by the auth routes (no password hash)"""
+        return {"id": self.id, "fullName": self.fullName, "email": self.email, "mobile": self.mobile}
+
+
+class UserStore:
+    """Users with one primary and two secondary hash indexes.
+
+    ``add`` checks both unique keys and updates all three indexes without
+    awaiting, so from the event loop thread it is atomic: a concurrent
+    registration cannot slip in between the check and the insert.
+    Not thread-safe.
+    """
+
+    def __init__(self):
+        self._by_id: Dict[str, UserRecord] = {}
+        self._by_email: Dict[str, UserRecord] = {}
+        self._by_mobile: Dict[str, UserRecord] = {}
+        self._next_id = 1
+
+    def __len__(self) -> int:
+        return len(self._by_id)
+
+    def get(self, user_id: str) -> Optional[UserRecord]:
+        return self._by_id.get(user_id)
+
+    def by_email(self, email: str) -> Optional[UserRecord]:
+        return self._by_email.get(email)
+
+    def by_mobile(self, mobile: str) -> Optional[UserRecord]:
+        return self._by_mobile.get(mobile)
+
+    def find(self, username: str) -> Optional[UserRecord]:
+        """Look up a login username, which may be an email or a mobile number"""
+        return self._by_email.get(username) or self._by_mobile.get(username)
+
+    def add(self, fullName: str, email: str, mobile: str, password: str) -> UserRecord:
+        if email in self._by_email:
+            raise DuplicateUser("email")
+        if mobile in self._by_mobile:
+            raise DuplicateUser("mobile")
+        record = UserRecord(f"user_{self._next_id}", fullName, email, mobile, password)
+        self._next_id += 1
+        self._by_id[record.id] = record
+        self._by_email[email] = record
+        self._by_mobile[mobile] = record
+        return record
+
+    def clear(self):
+        self._by_id.clear()
+        self._by_email.clear()
+        self._by_mobile.clear()
+        self._next_id = 1
+
+
+class AsyncUserStore:
+    """A UserStore behind the coroutine interface of SQLiteUserStore.
+
+    Every call completes without suspending, so ``add`` keeps its
+    atomicity on the event loop thread.
+    """
+
+    def __init__(self, store: Optional[UserStore] = None):
+        self.store = store if store is not None else UserStore()
+
+    async def open(self):
+        pass
+
+    async def get(self, user_id: str) -> Optional[UserRecord]:
+        return self.store.get(user_id)
+
+    async def by_email(self, email: str) -> Optional[UserRecord]:
+        return self.store.by_email(email)
+
+    async def by_mobile(self, mobile: str) -> Optional[UserRecord]:
+        return self.store.by_mobile(mobile)
+
+    async def find(self, username: str) -> Optional[UserRecord]:
+        return self.store.find(username)
+
+    async def add(self, fullName: str, email: str, mobile: str, password: str) -> UserRecord:
+        return self.store.add(fullName, email, mobile, password)
+
+    async def count(self) -> int:
+        return len(self.store)
+
+    async def clear(self):
+        self.store.clear()
+
+    def close(self):
+        pass
+
+
+def create_user_store():
+    """User store for the configured engine (USER_STORE)"""
+    if USER_STORE == "memory":
+        return AsyncUserStore()
+    if USER_STORE != "sqlite":
+        raise ValueError(f"Unknown USER_STORE {USER_STORE!r}; expected 'sqlite' or 'memory'")
+    from sqlite_user_store import SQLiteUserStore
+    return SQLiteUserStore()
@@ -0,0 +1,193 @@
+"""
+Krishi Mitra - Weather
+Pluggable weather providers behind a per-district cache with request coalescing
+"""
+
+import asyncio
+import json
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Dict, NamedTuple, Tuple
+
+from recommendation_table import serialize
+
+WEATHER_CACHE_TTL_SECONDS = int(os.getenv("WEATHER_CACHE_TTL_SECONDS", "600"))
+WEATHER_FETCH_TIMEOUT_SECONDS = float(os.getenv("WEATHER_FETCH_TIMEOUT_SECONDS", "5"))
+WEATHER_RETRY_SECONDS = float(os.getenv("WEATHER_RETRY_SECONDS", "30"))
+WEATHER_CACHE_SIZE = int(os.getenv("WEATHER_CACHE_SIZE", "4096"))
+WEATHER_DATA_FILE = os.getenv("WEATHER_DATA_FILE")
+
+DistrictKey = Tuple[int, int]
+
+
+class WeatherUnavailable(Exception):
+    """No weather could be fetched and nothing is cached for the district"""
+
+
+class WeatherProvider(ABC):
+    """Source of weather reports; subclasses implement ``fetch``"""
+
+    @abstractmethod
+    async def fetch(self, state_code: int, district_code: int) -> dict:
+        """Current report for a district; may raise on provider errors"""
+
+
+class StaticWeatherProvider(WeatherProvider):
+    """Returns the same report for every district (development stub)"""
+
+    def __init__(self, report: dict):
+        self.report = report
+
+    async def fetch(self, state_code: int, district_code: int) -> dict:
+        return self.report
+
+
+class FileWeatherProvider(WeatherProvider):
+    """Reads reports from a local JSON file.
+
+    The file holds ``{"default": {...}, "districts": {"<state>:<district>": {...}}}``
+    and is re-read on every fetch, so it can be updated by an external job.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def _read(self, state_code: int, district_code: int) -> dict:
+        with open(self.path, encoding="utf-8") as f:
+            data = json.load(f)
+        report = data.get("districts", {}).get(f"{state_code}:{district_code}") or data.get("default")
+        if report is None:
+            raise LookupError(f"No weather for district {state_code}:{district_code} in {self.path}")
+        return report
+
+    async def fetch(self, state_code: int, district_code: int) -> dict:
+        return await asyncio.get_running_loop().run_in_executor(None, self._read, state_code, district_code)
+
+
+class WeatherReport(NamedTuple):
+    """A cached report, serialized once when fetched"""
+    report: dict
+    body: bytes
+    etag: str
+    fetched_at: float
+
+
+class WeatherService:
+    """Caches provider results per district and coalesces concurrent fetches.
+
+    Fresh entries are served from memory. When an entry is missing or
+    expired, the first request starts a fetch and every concurrent request
+    for the same district awaits that one fetch. If the fetch fails and an
+    older report is cached, that report is served and a single background
+    retry is scheduled; until it runs, requests get the old report without
+    hitting the provider again.
+    """
+
+    def __init__(
+        self,
+        provider: WeatherProvider,
+        ttl_seconds: float = WEATHER_CACHE_TTL_SECONDS,
+        fetch_timeout: float = WEATHER_FETCH_TIMEOUT_SECONDS,
+        retry_seconds: float = WEATHER_RETRY_SECONDS,
+        maxsize: int = WEATHER_CACHE_SIZE
+    ):
+        self.provider = provider
+        self.ttl_seconds = ttl_seconds
+        self.fetch_timeout = fetch_timeout
+        self.retry_seconds = retry_seconds
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[DistrictKey, WeatherReport]" = OrderedDict()
+        self._inflight: Dict[DistrictKey, asyncio.Future] = {}
+        self._retries: Dict[DistrictKey, asyncio.Task] = {}
+        self._stats = {"hits": 0, "fetches": 0, "coalesced": 0, "stale_served": 0, "errors": 0}
+
+    def stats(self) -> dict:
+        return {"size": len(self._entries), "inflight": len(self._inflight), **self._stats}
+
+    def expires_in(self, entry: WeatherReport) -> float:
+        """Seconds until ``entry`` is due for a refresh (negative once stale)"""
+        return self.ttl_seconds - (time.monotonic() - entry.fetched_at)
+
+    async def get(self, state_code: int, district_code: int) -> dict:
+        return (await self.get_report(state_code, district_code)).report
+
+    async def get_report(self, state_code: int, district_code: int) -> WeatherReport:
+        key = (state_code, district_code)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            if time.monotonic() - entry.fetched_at < self.ttl_seconds:
+                self._stats["hits"] += 1
+                return entry
+            if key in self._retries:
+                self._stats["stale_served"] += 1
+                return entry
+
+        try:
+            return await self._refresh(key)
+        except Exception as exc:
+            if entry is None:
+                raise WeatherUnavailable(f"Weather unavailable for district {state_code}:{district_code}") from exc
+            self._schedule_retry(key)
+            self._stats["stale_served"] += 1
+            return entry
+
+    def _refresh(self, key: DistrictKey) -> asyncio.Future:
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._fetch(key))
+            self._inflight[key] = task
+
+            def done(task):
+                self._inflight.pop(key, None)
+                # Mark the error retrieved even if every waiter went away
+                if not task.cancelled():
+                    task.exception()
+
+            task.add_done_callback(done)
+        else:
+            self._stats["coalesced"] += 1
+        # Shielded so a client disconnecting does not cancel the shared fetch
+        return asyncio.shield(task)
+
+    async def _fetch(self, key: DistrictKey) -> WeatherReport:
+        self._stats["fetches"] += 1
+        try:
+            report = await asyncio.wait_for(self.provider.fetch(*key), timeout=self.fetch_timeout)
+            payload = serialize(report)
+        except Exception:
+            self._stats["errors"] += 1
+            raise
+        entry = WeatherReport(report, payload.body, payload.etag, time.monotonic())
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+        return entry
+
+    def _schedule_retry(self, key: DistrictKey):
+        if key in self._retries:
+            return
+
+        async def retry():
+            try:
+                await asyncio.sleep(self.retry_seconds)
+                await self._refresh(key)
+            except Exception:
+                pass  # counted in _fetch; the next request tries again
+            finally:
+                self._retries.pop(key, None)
+
+        # Holding the task here also keeps it from being garbage collected
+        self._retries[key] = asyncio.ensure_future(retry())
+
+
+def create_weather_service(default_report: dict) -> WeatherService:
+    """Weather service for the configured provider (WEATHER_DATA_FILE or stub)"""
+    if WEATHER_DATA_FILE:
+        provider = FileWeatherProvider(WEATHER_DATA_FILE)
+    else:
+        provider = StaticWeatherProvider(default_report)
+    return WeatherService(provider)
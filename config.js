@@ -78,7 +78,8 @@ const CONFIG = {
         AUTH_TOKEN: 'krishi_auth_token',
         USER_DATA: 'krishi_user_data',
         LANGUAGE: 'krishi_language',
-        LOCATION_DATA: 'krishi_location'
+        // v2: district codes follow reference_data/; older saved codes are ignored
+        LOCATION_DATA: 'krishi_location_v2'
     }
 };
 
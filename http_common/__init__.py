@@ -0,0 +1,71 @@
+"""
+Krishi Mitra - HTTP Common
+Content negotiation and ETag helpers shared by every server implementation
+
+Standard library only, so the FastAPI backends and the serverless handlers
+in api/ evaluate Accept-Encoding and If-None-Match the same way.
+"""
+
+from typing import Dict, Optional, Sequence
+
+# Preferred order when the client accepts several encodings equally
+ENCODING_PREFERENCE = ("br", "gzip")
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Map each encoding in an Accept-Encoding header to its q-value"""
+    accepted = {}
+    for part in (header or "").split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def negotiate_encoding(accept_encoding: Optional[str], available: Sequence[str] = ENCODING_PREFERENCE) -> Optional[str]:
+    """Best of ``available`` the client accepts (earlier wins at equal q), or None"""
+    accepted = parse_accept_encoding(accept_encoding)
+    wildcard = accepted.get("*", 0.0)
+    best, best_q = None, 0.0
+    for encoding in available:
+        q = accepted.get(encoding, wildcard)
+        if q > best_q:
+            best, best_q = encoding, q
+    return best
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match evaluation (weak comparison, as RFC 9110 requires)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def variant_etag(etag: str, encoding: Optional[str]) -> str:
+    """The ETag sent with one encoding of a body.
+
+    Compressed variants get the weak form: they are not byte-identical to
+    the resource the strong ETag names. If-None-Match uses weak comparison,
+    so every variant still revalidates against the same ETag, and a 304
+    must carry the form that matches the negotiated encoding.
+    """
+    if encoding in (None, "identity") or etag.startswith("W/"):
+        return etag
+    return "W/" + etag
@@ -249,11 +249,11 @@ class LocationService {
                 { code: 442, name: 'Bhavnagar', lat: 21.7645, lon: 72.1519 }
             ],
             27: [ // Maharashtra
-                { code: 490, name: 'Mumbai', lat: 19.0760, lon: 72.8777 },
-                { code: 491, name: 'Pune', lat: 18.5204, lon: 73.8567 },
-                { code: 492, name: 'Nagpur', lat: 21.1458, lon: 79.0882 },
-                { code: 493, name: 'Nashik', lat: 19.9975, lon: 73.7898 },
-                { code: 494, name: 'Aurangabad', lat: 19.8762, lon: 75.3433 }
+                { code: 490, name: 'Mumbai City', lat: 18.9388, lon: 72.8354 },
+                { code: 492, name: 'Pune', lat: 18.5204, lon: 73.8567 },
+                { code: 493, name: 'Nagpur', lat: 21.1458, lon: 79.0882 },
+                { code: 495, name: 'Nashik', lat: 19.9975, lon: 73.7898 },
+                { code: 496, name: 'Aurangabad', lat: 19.8762, lon: 75.3433 }
             ],
             3: [ // Punjab
                 { code: 41, name: 'Amritsar', lat: 31.6340, lon: 74.8723 },
@@ -1,4 +1,4 @@
-// All Districts Data - Hardcoded for reliability
+// All Districts Data - generated from reference_data/ by `python -m reference_data.export_js`
 const DISTRICTS_DATA = {
     1: [ // Jammu and Kashmir
         {code: 11, name: "Srinagar", lat: 34.0837, lon: 74.7973},
@@ -17,7 +17,14 @@ const DISTRICTS_DATA = {
         {code: 42, name: "Ludhiana", lat: 30.9010, lon: 75.8573},
         {code: 43, name: "Jalandhar", lat: 31.3260, lon: 75.5762},
         {code: 44, name: "Patiala", lat: 30.3398, lon: 76.3869},
-        {code: 45, name: "Bathinda", lat: 30.2110, lon: 74.9455}
+        {code: 45, name: "Bathinda", lat: 30.2110, lon: 74.9455},
+        {code: 46, name: "Mohali", lat: 30.7046, lon: 76.7179},
+        {code: 47, name: "Hoshiarpur", lat: 31.5346, lon: 75.9119},
+        {code: 48, name: "Gurdaspur", lat: 32.0408, lon: 75.4019},
+        {code: 49, name: "Ferozepur", lat: 30.9254, lon: 74.6116},
+        {code: 50, name: "Sangrur", lat: 30.2453, lon: 75.8420},
+        {code: 51, name: "Moga", lat: 30.8159, lon: 75.1705},
+        {code: 52, name: "Kapurthala", lat: 31.3800, lon: 75.3800}
     ],
     4: [ // Chandigarh
         {code: 61, name: "Chandigarh", lat: 30.7333, lon: 76.7794}
@@ -33,8 +40,12 @@ const DISTRICTS_DATA = {
         {code: 86, name: "Gurugram", lat: 28.4595, lon: 77.0266},
         {code: 87, name: "Hisar", lat: 29.1492, lon: 75.7217},
         {code: 88, name: "Rohtak", lat: 28.8955, lon: 76.6066},
-        {code: 89, name: "Karnal", lat: 29.6857, lon: 76.9905},
-        {code: 90, name: "Panipat", lat: 29.3909, lon: 76.9635}
+        {code: 89, name: "Panipat", lat: 29.3909, lon: 76.9635},
+        {code: 90, name: "Karnal", lat: 29.6857, lon: 76.9905},
+        {code: 91, name: "Ambala", lat: 30.3782, lon: 76.7767},
+        {code: 92, name: "Sonipat", lat: 28.9931, lon: 77.0151},
+        {code: 93, name: "Yamuna Nagar", lat: 30.1290, lon: 77.2674},
+        {code: 94, name: "Bhiwani", lat: 28.7930, lon: 76.1395}
     ],
     7: [ // Delhi
         {code: 101, name: "Central Delhi", lat: 28.6517, lon: 77.2219},
@@ -42,11 +53,21 @@ const DISTRICTS_DATA = {
         {code: 103, name: "North Delhi", lat: 28.7041, lon: 77.1025}
     ],
     8: [ // Rajasthan
-        {code: 111, name: "Jaipur", lat: 26.9124, lon: 75.7873},
-        {code: 112, name: "Jodhpur", lat: 26.2389, lon: 73.0243},
-        {code: 113, name: "Udaipur", lat: 24.5854, lon: 73.7125},
-        {code: 114, name: "Kota", lat: 25.2138, lon: 75.8648},
-        {code: 115, name: "Ajmer", lat: 26.4499, lon: 74.6399}
+        {code: 116, name: "Jaipur", lat: 26.9124, lon: 75.7873},
+        {code: 117, name: "Jodhpur", lat: 26.2389, lon: 73.0243},
+        {code: 118, name: "Kota", lat: 25.2138, lon: 75.8648},
+        {code: 119, name: "Udaipur", lat: 24.5854, lon: 73.7125},
+        {code: 120, name: "Ajmer", lat: 26.4499, lon: 74.6399},
+        {code: 121, name: "Bikaner", lat: 28.0229, lon: 73.3119},
+        {code: 122, name: "Alwar", lat: 27.5530, lon: 76.6346},
+        {code: 123, name: "Bhilwara", lat: 25.3470, lon: 74.6355},
+        {code: 124, name: "Sikar", lat: 27.6119, lon: 75.1397},
+        {code: 125, name: "Pali", lat: 25.7711, lon: 73.3234},
+        {code: 126, name: "Bharatpur", lat: 27.2173, lon: 77.4900},
+        {code: 127, name: "Chittorgarh", lat: 24.8887, lon: 74.6269},
+        {code: 128, name: "Sri Ganganagar", lat: 29.9038, lon: 73.8772},
+        {code: 129, name: "Tonk", lat: 26.1542, lon: 75.7886},
+        {code: 130, name: "Jaisalmer", lat: 26.9157, lon: 70.9083}
     ],
     9: [ // Uttar Pradesh
         {code: 151, name: "Lucknow", lat: 26.8467, lon: 80.9462},
@@ -58,13 +79,31 @@ const DISTRICTS_DATA = {
         {code: 157, name: "Meerut", lat: 28.9845, lon: 77.7064},
         {code: 158, name: "Bareilly", lat: 28.3670, lon: 79.4304},
         {code: 159, name: "Aligarh", lat: 27.8974, lon: 78.0880},
-        {code: 160, name: "Moradabad", lat: 28.8389, lon: 78.7768}
+        {code: 160, name: "Moradabad", lat: 28.8389, lon: 78.7768},
+        {code: 161, name: "Gorakhpur", lat: 26.7606, lon: 83.3732},
+        {code: 162, name: "Saharanpur", lat: 29.9680, lon: 77.5460},
+        {code: 163, name: "Noida (Gautam Buddha Nagar)", lat: 28.5355, lon: 77.3910},
+        {code: 164, name: "Jhansi", lat: 25.4484, lon: 78.5685},
+        {code: 165, name: "Mathura", lat: 27.4924, lon: 77.6737},
+        {code: 166, name: "Firozabad", lat: 27.1591, lon: 78.3957},
+        {code: 167, name: "Shahjahanpur", lat: 27.8829, lon: 79.9119},
+        {code: 168, name: "Rampur", lat: 28.8145, lon: 79.0254},
+        {code: 169, name: "Muzaffarnagar", lat: 29.4727, lon: 77.7085},
+        {code: 170, name: "Azamgarh", lat: 26.0686, lon: 83.1840}
     ],
     10: [ // Bihar
-        {code: 201, name: "Patna", lat: 25.5941, lon: 85.1376},
-        {code: 202, name: "Gaya", lat: 24.7955, lon: 85.0002},
-        {code: 203, name: "Bhagalpur", lat: 25.2425, lon: 86.9842},
-        {code: 204, name: "Muzaffarpur", lat: 26.1225, lon: 85.3906}
+        {code: 184, name: "Patna", lat: 25.5941, lon: 85.1376},
+        {code: 185, name: "Gaya", lat: 24.7955, lon: 85.0002},
+        {code: 186, name: "Bhagalpur", lat: 25.2425, lon: 87.0084},
+        {code: 187, name: "Muzaffarpur", lat: 26.1225, lon: 85.3906},
+        {code: 188, name: "Darbhanga", lat: 26.1542, lon: 85.8918},
+        {code: 189, name: "Purnia", lat: 25.7771, lon: 87.4753},
+        {code: 190, name: "Arrah (Bhojpur)", lat: 25.5563, lon: 84.6631},
+        {code: 191, name: "Begusarai", lat: 25.4182, lon: 86.1272},
+        {code: 192, name: "Katihar", lat: 25.5394, lon: 87.5761},
+        {code: 193, name: "Munger", lat: 25.3753, lon: 86.4734},
+        {code: 194, name: "Chapra (Saran)", lat: 25.7805, lon: 84.7477},
+        {code: 195, name: "Saharsa", lat: 25.8800, lon: 86.6014}
     ],
     11: [ // Sikkim
         {code: 221, name: "Gangtok", lat: 27.3389, lon: 88.6065},
@@ -101,10 +140,18 @@ const DISTRICTS_DATA = {
         {code: 364, name: "Silchar", lat: 24.8333, lon: 92.7789}
     ],
     19: [ // West Bengal
-        {code: 381, name: "Kolkata", lat: 22.5726, lon: 88.3639},
-        {code: 382, name: "Darjeeling", lat: 27.0410, lon: 88.2663},
-        {code: 383, name: "Howrah", lat: 22.5958, lon: 88.2636},
-        {code: 384, name: "Siliguri", lat: 26.7271, lon: 88.3953}
+        {code: 341, name: "Kolkata", lat: 22.5726, lon: 88.3639},
+        {code: 342, name: "Howrah", lat: 22.5958, lon: 88.2636},
+        {code: 343, name: "North 24 Parganas", lat: 22.6157, lon: 88.4001},
+        {code: 344, name: "South 24 Parganas", lat: 22.1484, lon: 88.4324},
+        {code: 345, name: "Bardhaman", lat: 23.2324, lon: 87.8615},
+        {code: 346, name: "Murshidabad", lat: 24.1752, lon: 88.2800},
+        {code: 347, name: "Nadia", lat: 23.4730, lon: 88.5560},
+        {code: 348, name: "Jalpaiguri", lat: 26.5161, lon: 88.7296},
+        {code: 349, name: "Darjeeling", lat: 26.7271, lon: 88.3953},
+        {code: 350, name: "Malda", lat: 25.0961, lon: 88.1436},
+        {code: 351, name: "Birbhum", lat: 23.8404, lon: 87.6190},
+        {code: 352, name: "Midnapore", lat: 22.4241, lon: 87.3198}
     ],
     20: [ // Jharkhand
         {code: 401, name: "Ranchi", lat: 23.3441, lon: 85.3096},
@@ -125,68 +172,139 @@ const DISTRICTS_DATA = {
         {code: 444, name: "Korba", lat: 22.3595, lon: 82.7501}
     ],
     23: [ // Madhya Pradesh
-        {code: 461, name: "Bhopal", lat: 23.2599, lon: 77.4126},
-        {code: 462, name: "Indore", lat: 22.7196, lon: 75.8577},
-        {code: 463, name: "Jabalpur", lat: 23.1815, lon: 79.9864},
-        {code: 464, name: "Gwalior", lat: 26.2183, lon: 78.1828},
-        {code: 465, name: "Ujjain", lat: 23.1765, lon: 75.7885}
+        {code: 405, name: "Indore", lat: 22.7196, lon: 75.8577},
+        {code: 406, name: "Bhopal", lat: 23.2599, lon: 77.4126},
+        {code: 407, name: "Jabalpur", lat: 23.1815, lon: 79.9864},
+        {code: 408, name: "Gwalior", lat: 26.2183, lon: 78.1828},
+        {code: 409, name: "Ujjain", lat: 23.1765, lon: 75.7885},
+        {code: 410, name: "Sagar", lat: 23.8388, lon: 78.7378},
+        {code: 411, name: "Dewas", lat: 22.9676, lon: 76.0534},
+        {code: 412, name: "Satna", lat: 24.6005, lon: 80.8322},
+        {code: 413, name: "Ratlam", lat: 23.3315, lon: 75.0367},
+        {code: 414, name: "Rewa", lat: 24.5364, lon: 81.2961},
+        {code: 415, name: "Katni", lat: 23.8346, lon: 80.3958},
+        {code: 416, name: "Singrauli", lat: 24.1997, lon: 82.6747}
     ],
     24: [ // Gujarat
-        {code: 481, name: "Ahmedabad", lat: 23.0225, lon: 72.5714},
-        {code: 482, name: "Surat", lat: 21.1702, lon: 72.8311},
-        {code: 483, name: "Vadodara", lat: 22.3072, lon: 73.1812},
-        {code: 484, name: "Rajkot", lat: 22.3039, lon: 70.8022},
-        {code: 485, name: "Bhavnagar", lat: 21.7645, lon: 72.1519},
-        {code: 486, name: "Jamnagar", lat: 22.4707, lon: 70.0577}
+        {code: 438, name: "Ahmedabad", lat: 23.0225, lon: 72.5714},
+        {code: 439, name: "Surat", lat: 21.1702, lon: 72.8311},
+        {code: 440, name: "Vadodara", lat: 22.3072, lon: 73.1812},
+        {code: 441, name: "Rajkot", lat: 22.3039, lon: 70.8022},
+        {code: 442, name: "Bhavnagar", lat: 21.7645, lon: 72.1519},
+        {code: 443, name: "Jamnagar", lat: 22.4707, lon: 70.0577},
+        {code: 444, name: "Junagadh", lat: 21.5222, lon: 70.4579},
+        {code: 445, name: "Gandhinagar", lat: 23.2156, lon: 72.6369},
+        {code: 446, name: "Anand", lat: 22.5645, lon: 72.9289},
+        {code: 447, name: "Mehsana", lat: 23.5880, lon: 72.3693},
+        {code: 448, name: "Bharuch", lat: 21.7051, lon: 72.9959},
+        {code: 449, name: "Valsad", lat: 20.5992, lon: 72.9342},
+        {code: 450, name: "Navsari", lat: 20.9500, lon: 72.9200},
+        {code: 451, name: "Patan", lat: 23.8502, lon: 72.1211},
+        {code: 452, name: "Kutch", lat: 23.7337, lon: 69.8597}
     ],
     27: [ // Maharashtra
-        {code: 501, name: "Mumbai", lat: 19.0760, lon: 72.8777},
-        {code: 502, name: "Pune", lat: 18.5204, lon: 73.8567},
-        {code: 503, name: "Nagpur", lat: 21.1458, lon: 79.0882},
-        {code: 504, name: "Nashik", lat: 19.9975, lon: 73.7898},
-        {code: 505, name: "Aurangabad", lat: 19.8762, lon: 75.3433},
-        {code: 506, name: "Solapur", lat: 17.6599, lon: 75.9064}
+        {code: 490, name: "Mumbai City", lat: 18.9388, lon: 72.8354},
+        {code: 491, name: "Mumbai Suburban", lat: 19.0760, lon: 72.8777},
+        {code: 492, name: "Pune", lat: 18.5204, lon: 73.8567},
+        {code: 493, name: "Nagpur", lat: 21.1458, lon: 79.0882},
+        {code: 494, name: "Thane", lat: 19.2183, lon: 72.9781},
+        {code: 495, name: "Nashik", lat: 19.9975, lon: 73.7898},
+        {code: 496, name: "Aurangabad", lat: 19.8762, lon: 75.3433},
+        {code: 497, name: "Solapur", lat: 17.6599, lon: 75.9064},
+        {code: 498, name: "Kolhapur", lat: 16.7050, lon: 74.2433},
+        {code: 499, name: "Amravati", lat: 20.9374, lon: 77.7796},
+        {code: 500, name: "Nanded", lat: 19.1383, lon: 77.3210},
+        {code: 501, name: "Jalgaon", lat: 21.0077, lon: 75.5626},
+        {code: 502, name: "Sangli", lat: 16.8544, lon: 74.5678},
+        {code: 503, name: "Akola", lat: 20.7002, lon: 77.0082},
+        {code: 504, name: "Ahmednagar", lat: 19.0948, lon: 74.7480},
+        {code: 505, name: "Satara", lat: 17.6805, lon: 74.0183},
+        {code: 506, name: "Raigad", lat: 18.5074, lon: 73.1789},
+        {code: 507, name: "Ratnagiri", lat: 16.9944, lon: 73.3000},
+        {code: 508, name: "Beed", lat: 18.9894, lon: 75.7607},
+        {code: 509, name: "Latur", lat: 18.3984, lon: 76.5604}
     ],
     28: [ // Andhra Pradesh
-        {code: 521, name: "Visakhapatnam", lat: 17.6868, lon: 83.2185},
-        {code: 522, name: "Vijayawada", lat: 16.5062, lon: 80.6480},
-        {code: 523, name: "Guntur", lat: 16.3067, lon: 80.4365},
-        {code: 524, name: "Nellore", lat: 14.4426, lon: 79.9865}
+        {code: 517, name: "Visakhapatnam", lat: 17.6869, lon: 83.2185},
+        {code: 518, name: "Vijayawada (Krishna)", lat: 16.5062, lon: 80.6480},
+        {code: 519, name: "Guntur", lat: 16.3067, lon: 80.4365},
+        {code: 520, name: "Nellore", lat: 14.4426, lon: 79.9865},
+        {code: 521, name: "Kurnool", lat: 15.8281, lon: 78.0373},
+        {code: 522, name: "Kadapa", lat: 14.4674, lon: 78.8241},
+        {code: 523, name: "Tirupati (Chittoor)", lat: 13.6288, lon: 79.4192},
+        {code: 524, name: "Anantapur", lat: 14.6819, lon: 77.6006},
+        {code: 525, name: "Rajahmundry (East Godavari)", lat: 17.0005, lon: 81.8040},
+        {code: 526, name: "Eluru (West Godavari)", lat: 16.7107, lon: 81.0954}
     ],
     29: [ // Karnataka
-        {code: 541, name: "Bengaluru", lat: 12.9716, lon: 77.5946},
-        {code: 542, name: "Mysuru", lat: 12.2958, lon: 76.6394},
-        {code: 543, name: "Mangaluru", lat: 12.9141, lon: 74.8560},
-        {code: 544, name: "Hubballi", lat: 15.3647, lon: 75.1240},
-        {code: 545, name: "Belagavi", lat: 15.8497, lon: 74.4977}
+        {code: 537, name: "Bengaluru Urban", lat: 12.9716, lon: 77.5946},
+        {code: 538, name: "Bengaluru Rural", lat: 13.2846, lon: 77.4389},
+        {code: 539, name: "Mysuru", lat: 12.2958, lon: 76.6394},
+        {code: 540, name: "Mangaluru (Dakshina Kannada)", lat: 12.9141, lon: 74.8560},
+        {code: 541, name: "Hubballi-Dharwad", lat: 15.3647, lon: 75.1240},
+        {code: 542, name: "Belagavi", lat: 15.8497, lon: 74.4977},
+        {code: 543, name: "Kalaburagi", lat: 17.3297, lon: 76.8343},
+        {code: 544, name: "Ballari", lat: 15.1394, lon: 76.9214},
+        {code: 545, name: "Shivamogga", lat: 13.9299, lon: 75.5681},
+        {code: 546, name: "Tumakuru", lat: 13.3392, lon: 77.1012},
+        {code: 547, name: "Vijayapura", lat: 16.8302, lon: 75.7100},
+        {code: 548, name: "Raichur", lat: 16.2076, lon: 77.3463},
+        {code: 549, name: "Udupi", lat: 13.3409, lon: 74.7421},
+        {code: 550, name: "Hassan", lat: 13.0072, lon: 76.0962},
+        {code: 551, name: "Mandya", lat: 12.5244, lon: 76.8958}
     ],
     30: [ // Goa
         {code: 561, name: "North Goa", lat: 15.4909, lon: 73.8278},
         {code: 562, name: "South Goa", lat: 15.2993, lon: 74.1240}
     ],
     32: [ // Kerala
-        {code: 581, name: "Thiruvananthapuram", lat: 8.5241, lon: 76.9366},
-        {code: 582, name: "Kochi", lat: 9.9312, lon: 76.2673},
-        {code: 583, name: "Kozhikode", lat: 11.2588, lon: 75.7804},
-        {code: 584, name: "Thrissur", lat: 10.5276, lon: 76.2144},
-        {code: 585, name: "Kannur", lat: 11.8745, lon: 75.3704}
+        {code: 585, name: "Thiruvananthapuram", lat: 8.5241, lon: 76.9366},
+        {code: 586, name: "Kochi (Ernakulam)", lat: 9.9312, lon: 76.2673},
+        {code: 587, name: "Kozhikode", lat: 11.2588, lon: 75.7804},
+        {code: 588, name: "Kollam", lat: 8.8932, lon: 76.6141},
+        {code: 589, name: "Thrissur", lat: 10.5276, lon: 76.2144},
+        {code: 590, name: "Kannur", lat: 11.8745, lon: 75.3704},
+        {code: 591, name: "Alappuzha", lat: 9.4981, lon: 76.3388},
+        {code: 592, name: "Kottayam", lat: 9.5916, lon: 76.5222},
+        {code: 593, name: "Palakkad", lat: 10.7867, lon: 76.6548},
+        {code: 594, name: "Malappuram", lat: 11.0510, lon: 76.0711},
+        {code: 595, name: "Pathanamthitta", lat: 9.2648, lon: 76.7870},
+        {code: 596, name: "Kasaragod", lat: 12.4996, lon: 74.9869},
+        {code: 597, name: "Wayanad", lat: 11.6854, lon: 76.1320},
+        {code: 598, name: "Idukki", lat: 9.9188, lon: 77.1025}
     ],
     33: [ // Tamil Nadu
-        {code: 601, name: "Chennai", lat: 13.0827, lon: 80.2707},
-        {code: 602, name: "Coimbatore", lat: 11.0168, lon: 76.9558},
-        {code: 603, name: "Madurai", lat: 9.9252, lon: 78.1198},
-        {code: 604, name: "Tiruchirappalli", lat: 10.7905, lon: 78.7047},
-        {code: 605, name: "Salem", lat: 11.6643, lon: 78.1460}
+        {code: 603, name: "Chennai", lat: 13.0827, lon: 80.2707},
+        {code: 604, name: "Coimbatore", lat: 11.0168, lon: 76.9558},
+        {code: 605, name: "Madurai", lat: 9.9252, lon: 78.1198},
+        {code: 606, name: "Tiruchirappalli", lat: 10.7905, lon: 78.7047},
+        {code: 607, name: "Salem", lat: 11.6643, lon: 78.1460},
+        {code: 608, name: "Tirunelveli", lat: 8.7139, lon: 77.7567},
+        {code: 609, name: "Erode", lat: 11.3410, lon: 77.7172},
+        {code: 610, name: "Vellore", lat: 12.9165, lon: 79.1325},
+        {code: 611, name: "Thanjavur", lat: 10.7870, lon: 79.1378},
+        {code: 612, name: "Dindigul", lat: 10.3624, lon: 77.9714},
+        {code: 613, name: "Kanchipuram", lat: 12.8342, lon: 79.7036},
+        {code: 614, name: "Tiruppur", lat: 11.1085, lon: 77.3411},
+        {code: 615, name: "Cuddalore", lat: 11.7480, lon: 79.7714},
+        {code: 616, name: "Karur", lat: 10.9601, lon: 78.0766},
+        {code: 617, name: "Nagercoil (Kanyakumari)", lat: 8.1781, lon: 77.4061}
     ],
     34: [ // Puducherry
         {code: 621, name: "Puducherry", lat: 11.9416, lon: 79.8083},
         {code: 622, name: "Karaikal", lat: 10.9254, lon: 79.8380}
     ],
     36: [ // Telangana
-        {code: 641, name: "Hyderabad", lat: 17.3850, lon: 78.4867},
-        {code: 642, name: "Warangal", lat: 17.9784, lon: 79.6007},
-        {code: 643, name: "Nizamabad", lat: 18.6725, lon: 78.0941},
-        {code: 644, name: "Khammam", lat: 17.2473, lon: 80.1514}
+        {code: 667, name: "Hyderabad", lat: 17.3850, lon: 78.4867},
+        {code: 668, name: "Ranga Reddy", lat: 17.3753, lon: 78.2136},
+        {code: 669, name: "Medchal-Malkajgiri", lat: 17.6209, lon: 78.4821},
+        {code: 670, name: "Warangal Urban", lat: 17.9689, lon: 79.5941},
+        {code: 671, name: "Karimnagar", lat: 18.4386, lon: 79.1288},
+        {code: 672, name: "Nizamabad", lat: 18.6725, lon: 78.0942},
+        {code: 673, name: "Khammam", lat: 17.2473, lon: 80.1514},
+        {code: 674, name: "Nalgonda", lat: 17.0490, lon: 79.2674},
+        {code: 675, name: "Mahbubnagar", lat: 16.7488, lon: 77.9838},
+        {code: 676, name: "Sangareddy", lat: 17.6247, lon: 78.0833}
     ],
     37: [ // Ladakh
         {code: 661, name: "Leh", lat: 34.1526, lon: 77.5771},
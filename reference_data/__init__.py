@@ -0,0 +1,120 @@
+"""
+Krishi Mitra - Reference Data
+Indian states and districts shared by every server implementation
+
+The dataset ships as two small CSV files next to this module (plus a table
+of alternate names used by location search) and is parsed on first use
+into column arrays. Districts are stored grouped by state and
+sorted by name, so a state's districts are one contiguous slice.
+"""
+
+import csv
+import hashlib
+import io
+import os
+from array import array
+from typing import Dict, List, Optional, Tuple
+
+DATA_DIR = os.path.dirname(os.path.abspath(__file__))
+STATES_FILE = os.path.join(DATA_DIR, "states.csv")
+DISTRICTS_FILE = os.path.join(DATA_DIR, "districts.csv")
+# Former, alternate and localized names for location search
+ALIASES_FILE = os.path.join(DATA_DIR, "location_aliases.csv")
+
+_reference = None
+
+
+class ReferenceData:
+    """Column-oriented, read-only view of the states and districts"""
+
+    def __init__(self, states_csv: str, districts_csv: str):
+        # Content hash of both files: changes whenever the dataset does
+        self.version = hashlib.sha256((states_csv + "\0" + districts_csv).encode("utf-8")).hexdigest()[:16]
+
+        state_rows = list(csv.DictReader(io.StringIO(states_csv)))
+        self.state_codes = array("i", (int(row["code"]) for row in state_rows))
+        self.state_names: List[str] = [row["name"] for row in state_rows]
+        self._state_index: Dict[int, int] = {code: i for i, code in enumerate(self.state_codes)}
+
+        district_rows = sorted(
+            csv.DictReader(io.StringIO(districts_csv)),
+            key=lambda row: (int(row["state_code"]), row["name"])
+        )
+        self.district_codes = array("i", (int(row["code"]) for row in district_rows))
+        self.district_state_codes = array("i", (int(row["state_code"]) for row in district_rows))
+        self.district_names: List[str] = [row["name"] for row in district_rows]
+        self.district_lats = array("d", (float(row["lat"]) for row in district_rows))
+        self.district_lons = array("d", (float(row["lon"]) for row in district_rows))
+
+        # state_code -> (start, stop) into the district columns
+        self._state_slices: Dict[int, Tuple[int, int]] = {}
+        for i, state_code in enumerate(self.district_state_codes):
+            start, _ = self._state_slices.get(state_code, (i, i))
+            self._state_slices[state_code] = (start, i + 1)
+
+    def _district(self, i: int) -> dict:
+        return {
+            "code": self.district_codes[i],
+            "name": self.district_names[i],
+            "state_code": self.district_state_codes[i],
+            "lat": self.district_lats[i],
+            "lon": self.district_lons[i]
+        }
+
+    @property
+    def states_count(self) -> int:
+        return len(self.state_codes)
+
+    @property
+    def districts_count(self) -> int:
+        return len(self.district_codes)
+
+    def states(self) -> List[dict]:
+        """All states as ``{"code", "name"}`` dicts, in LGD code order"""
+        return [{"code": code, "name": name} for code, name in zip(self.state_codes, self.state_names)]
+
+    def state_name(self, state_code: int) -> Optional[str]:
+        i = self._state_index.get(state_code)
+        return None if i is None else self.state_names[i]
+
+    def districts_count_for_state(self, state_code: int) -> int:
+        start, stop = self._state_slices.get(state_code, (0, 0))
+        return stop - start
+
+    def districts(self, state_code: Optional[int] = None) -> List[dict]:
+        """Districts sorted by name, for one state or (grouped by state) for all"""
+        if state_code is None:
+            start, stop = 0, len(self.district_codes)
+        else:
+            start, stop = self._state_slices.get(state_code, (0, 0))
+        return [self._district(i) for i in range(start, stop)]
+
+
+def load_reference_data() -> ReferenceData:
+    """The packaged dataset, parsed on first call and shared afterwards"""
+    global _reference
+    if _reference is None:
+        with open(STATES_FILE, encoding="utf-8") as f:
+            states_csv = f.read()
+        with open(DISTRICTS_FILE, encoding="utf-8") as f:
+            districts_csv = f.read()
+        _reference = ReferenceData(states_csv, districts_csv)
+    return _reference
+
+
+def load_location_aliases() -> List[dict]:
+    """Alternate names as ``{"type", "state_code", "code", "lang", "alias"}``
+
+    ``type`` is "state" or "district"; ``code`` is None for states.
+    """
+    with open(ALIASES_FILE, encoding="utf-8") as f:
+        return [
+            {
+                "type": row["type"],
+                "state_code": int(row["state_code"]),
+                "code": int(row["code"]) if row["code"] else None,
+                "lang": row["lang"],
+                "alias": row["alias"]
+            }
+            for row in csv.DictReader(f)
+        ]
@@ -0,0 +1,50 @@
+"""
+Krishi Mitra - Reference Data Export
+Regenerates the dashboard's js/districts_data.js from the reference dataset
+
+The dashboard fills its district dropdown from that file without an API
+call, so it must use the same (state_code, code) pairs as the servers.
+Run after editing districts.csv:
+
+    python -m reference_data.export_js
+"""
+
+import os
+import re
+
+from reference_data import load_reference_data
+
+JS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "js", "districts_data.js")
+
+HEADER = "// All Districts Data - generated from reference_data/ by `python -m reference_data.export_js`\n"
+
+
+def districts_js(reference) -> str:
+    """The DISTRICTS_DATA object literal, one block per state with districts, in code order"""
+    blocks = []
+    for state in sorted(reference.states(), key=lambda state: state["code"]):
+        districts = sorted(reference.districts(state["code"]), key=lambda district: district["code"])
+        if not districts:
+            continue
+        rows = ",\n".join(
+            f'        {{code: {district["code"]}, name: "{district["name"]}", '
+            f'lat: {district["lat"]:.4f}, lon: {district["lon"]:.4f}}}'
+            for district in districts
+        )
+        blocks.append(f"    {state['code']}: [ // {state['name']}\n{rows}\n    ]")
+    return "const DISTRICTS_DATA = {\n" + ",\n".join(blocks) + "\n};\n"
+
+
+def main():
+    with open(JS_FILE, encoding="utf-8") as f:
+        source = f.read()
+    # Replace the header comment and the data object; the helper functions
+    # below it are hand-written and kept as they are
+    rest = re.split(r"^};\n", source, maxsplit=1, flags=re.MULTILINE)[1]
+    with open(JS_FILE, "w", encoding="utf-8", newline="\n") as f:
+        f.write(HEADER + districts_js(load_reference_data()) + rest)
+    print(f"Wrote {JS_FILE}")
+
+
+if __name__ == "__main__":
+    main()